@@ -0,0 +1,71 @@
+from config import (SCREEN_WIDTH, SCREEN_HEIGHT, WORLD_WIDTH, WORLD_HEIGHT, RENDER_SCALE, MIN_ZOOM, MAX_ZOOM)
+
+class Camera:
+    # Maps world coordinates onto the render target. The target is the window size times render_scale, so a
+    # scale below 1 draws fewer pixels and is stretched up to the window when presented. The visible world
+    # rectangle is kept alongside, so callers can skip anything outside it using positions they already have.
+    def __init__(self, center=(WORLD_WIDTH / 2, WORLD_HEIGHT / 2), window_size=(SCREEN_WIDTH, SCREEN_HEIGHT),
+                 zoom=1.0, render_scale=RENDER_SCALE):
+        self.home = tuple(center)
+        self.center = list(center)
+        self.zoom = zoom
+        self.render_scale = render_scale
+        self.resize(window_size)
+
+    @classmethod
+    def for_surface(cls, surface):
+        # Draws world coordinates 1:1 onto the surface, as everything did before there was a camera
+        width, height = surface.get_size()
+        return cls((width / 2, height / 2), (width, height), render_scale=1.0)
+
+    def resize(self, window_size):
+        self.window_size = (max(1, window_size[0]), max(1, window_size[1]))
+        self.view_size = (max(1, int(self.window_size[0] * self.render_scale)),
+                          max(1, int(self.window_size[1] * self.render_scale)))
+        self.update()
+
+    def update(self):
+        self.scale = self.zoom * self.render_scale
+        self.offset_x = self.view_size[0] / 2 - self.center[0] * self.scale
+        self.offset_y = self.view_size[1] / 2 - self.center[1] * self.scale
+        half_width = self.view_size[0] / 2 / self.scale
+        half_height = self.view_size[1] / 2 / self.scale
+        self.left = self.center[0] - half_width
+        self.right = self.center[0] + half_width
+        self.top = self.center[1] - half_height
+        self.bottom = self.center[1] + half_height
+
+    def to_view(self, pos):
+        return (int(pos[0] * self.scale + self.offset_x), int(pos[1] * self.scale + self.offset_y))
+
+    def length(self, distance):
+        return max(1, int(distance * self.scale))
+
+    def visible(self, pos, radius=0):
+        return (self.left - radius <= pos[0] <= self.right + radius and
+                self.top - radius <= pos[1] <= self.bottom + radius)
+
+    def to_world(self, window_pos):
+        return ((window_pos[0] * self.render_scale - self.offset_x) / self.scale,
+                (window_pos[1] * self.render_scale - self.offset_y) / self.scale)
+
+    def pan(self, dx, dy):
+        # dx, dy in window pixels; the centre stays on the battlefield
+        self.center[0] = min(WORLD_WIDTH, max(0, self.center[0] - dx / self.zoom))
+        self.center[1] = min(WORLD_HEIGHT, max(0, self.center[1] - dy / self.zoom))
+        self.update()
+
+    def zoom_by(self, factor, window_pos=None):
+        # Zooms about window_pos (the cursor), keeping the world point under it where it is
+        anchor = self.center if window_pos is None else self.to_world(window_pos)
+        zoom = min(MAX_ZOOM, max(MIN_ZOOM, self.zoom * factor))
+        ratio = self.zoom / zoom
+        self.center = [anchor[0] - (anchor[0] - self.center[0]) * ratio,
+                       anchor[1] - (anchor[1] - self.center[1]) * ratio]
+        self.zoom = zoom
+        self.update()
+
+    def reset(self):
+        self.center = list(self.home)
+        self.zoom = 1.0
+        self.update()
@@ -0,0 +1,67 @@
+import os
+import json
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'catalog.json')
+
+class DefenseSpec:
+    def __init__(self, entry):
+        self.name = entry['name']
+        self.title = entry.get('title', self.name)
+        self.label = entry.get('label', self.title)
+        self.kind = entry['kind']
+        self.cost = entry['cost']
+        self.color = tuple(entry['color'])
+        self.button = {key: tuple(value) for key, value in entry.get('button', {}).items()}
+        self.max_level = entry.get('max_level', 1)
+
+        upgrade = entry.get('upgrade', {})
+        multipliers = upgrade.get('multipliers', {})
+        self.levels = []
+        for level in range(self.max_level):
+            stats = {stat: value * multipliers[stat] ** level if level and stat in multipliers else value
+                     for stat, value in entry['stats'].items()}
+            stats['upgrade_cost'] = (round(upgrade['cost'] * upgrade.get('cost_growth', 1) ** level)
+                                     if 'cost' in upgrade and level + 1 < self.max_level else None)
+            self.levels.append(stats)
+
+    def level_stats(self, level):
+        return self.levels[min(level, self.max_level) - 1]
+
+class EnemySpec:
+    def __init__(self, entry):
+        self.name = entry['name']
+        self.kind = entry['kind']
+        self.color = tuple(entry['color'])
+        self.stats = dict(entry['stats'])
+        self.min_wave = entry.get('min_wave', 1)
+        weight = entry.get('spawn_weight', {})
+        self.weight_base = weight.get('base', 100)
+        self.weight_per_wave = weight.get('per_wave', 0)
+        self.weight_min = weight.get('min', 0)
+        self.weight_max = weight.get('max', float('inf'))
+
+    def spawn_weight(self, wave):
+        return max(self.weight_min, min(self.weight_max, self.weight_base + self.weight_per_wave * wave))
+
+class Catalog:
+    def __init__(self, path=CATALOG_PATH):
+        with open(path) as f:
+            data = json.load(f)
+        self.defenses = [DefenseSpec(entry) for entry in data['defenses']]
+        self.enemies = [EnemySpec(entry) for entry in data['enemies']]
+        self.defense_by_name = {spec.name: spec for spec in self.defenses}
+        self.enemy_by_name = {spec.name: spec for spec in self.enemies}
+
+    def defense(self, name):
+        return self.defense_by_name[name]
+
+    def enemy(self, name):
+        return self.enemy_by_name[name]
+
+_catalog = None
+
+def get_catalog():
+    global _catalog
+    if _catalog is None:
+        _catalog = Catalog()
+    return _catalog
@@ -1,9 +1,14 @@
+import time
 import pygame
 
 # Screen dimensions
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 800
 
+# Battlefield size in world units; the window shows all or part of it through the camera
+WORLD_WIDTH = SCREEN_WIDTH
+WORLD_HEIGHT = SCREEN_HEIGHT
+
 # Colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -20,8 +25,43 @@ PLANET_RADIUS = 50
 MAX_ORBITAL_RADIUS = 350
 RESOURCE_START = 500
 BACKGROUND_COLOR = (10, 10, 40)
+STATS_DB_PATH = 'data/game_stats.db'
+ARCHIVE_DB_PATH = 'data/game_stats_archive.db'
+
+# Camera: the world is drawn at RENDER_SCALE times the window resolution and stretched to fit
+RENDER_SCALE = 1.0
+MIN_ZOOM = 0.25
+MAX_ZOOM = 4.0
+ZOOM_STEP = 1.25
+PAN_SPEED = 600
+
+# Simulation timing
+TICK_MS = 1000 / FPS
+TIME_SCALES = [1, 2, 4, 16, None]
+MAX_SUBSTEPS_PER_FRAME = 64
+MAX_SUBSTEPS_UNLIMITED = 1000
+SIM_FRAME_BUDGET_MS = 12
+# Enemies well outside the fight (beyond every defense's range, projectile reach and the view) are moved in
+# batches of up to this many ticks instead of every tick; 1 turns batching off
+ENEMY_LOD_TICKS = 8
+ENEMY_LOD_MARGIN = 40
+# Game-time spacing of the resource/health/enemy/score/wave samples stored with each session
+TIMESERIES_INTERVAL_MS = 250
+
+def wall_clock_ms():
+    # pygame.time.get_ticks() reads 0 until SDL's timer is started, which init_display() no longer does
+    return time.perf_counter() * 1000
 
-pygame.init()
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Orbital Defense")
-clock = pygame.time.Clock()
\ No newline at end of file
+def init_display(caption="Orbital Defense", resizable=False):
+    # Only the display and font modules are needed; pygame.init() would also bring up audio, joystick, etc.
+    if not pygame.display.get_init():
+        pygame.display.init()
+    if not pygame.font.get_init():
+        pygame.font.init()
+    screen = pygame.display.get_surface()
+    if screen is None or (not resizable and screen.get_size() != (SCREEN_WIDTH, SCREEN_HEIGHT)):
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.RESIZABLE if resizable else 0)
+    elif resizable and not screen.get_flags() & pygame.RESIZABLE:
+        screen = pygame.display.set_mode(screen.get_size(), pygame.RESIZABLE)
+    pygame.display.set_caption(caption)
+    return screen
@@ -0,0 +1,246 @@
+import os
+import csv
+import gzip
+import json
+import zlib
+import argparse
+import sqlite3
+from datetime import datetime, timedelta
+from config import STATS_DB_PATH, ARCHIVE_DB_PATH
+from stats_sinks import SQLiteStatsSink
+from stats_export import StatsExporter, SESSION_CSV_COLUMNS
+
+ENEMY_COLUMNS = ['enemy_type', 'survival_time', 'damage_dealt', 'penetration_depth']
+PLACEMENT_COLUMNS = ['defense_type', 'orbital_radius', 'angle', 'upgrade_level', 'damage_dealt', 'shots_fired',
+                     'shots_hit']
+SESSION_COLUMNS = ['id', 'date', 'duration', 'waves_completed', 'score', 'resources_collected',
+                   'enemies_defeated', 'accuracy']
+
+class StatsMaintenance:
+    def __init__(self, db_path=STATS_DB_PATH, archive_path=ARCHIVE_DB_PATH, csv_dir='data', batch_sessions=20,
+                 vacuum_pages=256, log=print):
+        self.db_path = db_path
+        self.archive_path = archive_path
+        self.csv_dir = csv_dir
+        self.batch_sessions = batch_sessions
+        self.vacuum_pages = vacuum_pages
+        self.log = log
+
+    def connect(self):
+        # Brings an older database up to the current schema (rollup tables, indexes, new columns)
+        sink = SQLiteStatsSink(self.db_path)
+        sink.init_db()
+        sink.conn.close()
+        # Autocommit, so every step below is its own short transaction; a game writing at the same time waits
+        # on the busy timeout instead of failing
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode = WAL")
+        return conn
+
+    def connect_archive(self):
+        os.makedirs(os.path.dirname(self.archive_path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.archive_path)
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS game_sessions (
+            id INTEGER PRIMARY KEY,
+            date TEXT,
+            duration INTEGER,
+            waves_completed INTEGER,
+            score INTEGER,
+            resources_collected INTEGER,
+            enemies_defeated INTEGER,
+            accuracy REAL
+        )
+        ''')
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS defense_placements (
+            session_id INTEGER,
+            defense_type TEXT,
+            orbital_radius REAL,
+            angle REAL,
+            upgrade_level INTEGER,
+            damage_dealt INTEGER,
+            shots_fired INTEGER,
+            shots_hit INTEGER
+        )
+        ''')
+        # One zlib-compressed JSON array of rows per session
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS enemy_data (
+            session_id INTEGER PRIMARY KEY,
+            columns TEXT,
+            row_count INTEGER,
+            rows BLOB
+        )
+        ''')
+        conn.commit()
+        return conn
+
+    def expired_sessions(self, conn, cutoff):
+        return [row[0] for row in conn.execute('''
+        SELECT id FROM game_sessions
+        WHERE date < ? AND complete = 1 AND id NOT IN (SELECT session_id FROM archived_sessions)
+        ORDER BY id
+        ''', (cutoff,))]
+
+    def discard_abandoned_sessions(self, conn, cutoff):
+        # A game that spilled enemy rows and then crashed or was killed never completes its session row;
+        # past the cutoff it can no longer be a game in progress
+        session_ids = [row[0] for row in conn.execute(
+            "SELECT id FROM game_sessions WHERE date < ? AND complete = 0", (cutoff,))]
+        if not session_ids:
+            return 0
+        marks = ', '.join('?' * len(session_ids))
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(f"DELETE FROM enemy_data WHERE session_id IN ({marks})", session_ids)
+            conn.execute(f"DELETE FROM game_sessions WHERE id IN ({marks})", session_ids)
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        return len(session_ids)
+
+    def archive_batch(self, conn, archive, session_ids):
+        marks = ', '.join('?' * len(session_ids))
+
+        sessions = conn.execute(f"SELECT {', '.join(SESSION_COLUMNS)} FROM game_sessions WHERE id IN ({marks})",
+                                session_ids).fetchall()
+        placements = conn.execute(f'''
+        SELECT session_id, {', '.join(PLACEMENT_COLUMNS)} FROM defense_placements WHERE session_id IN ({marks})
+        ''', session_ids).fetchall()
+        enemy_rows = {session_id: [] for session_id in session_ids}
+        for row in conn.execute(f'''
+        SELECT session_id, {', '.join(ENEMY_COLUMNS)} FROM enemy_data WHERE session_id IN ({marks})
+        ''', session_ids):
+            enemy_rows[row[0]].append(row[1:])
+
+        # The archive is committed before anything is removed, so an interrupted run loses nothing and simply
+        # archives the same sessions again next time
+        archive.execute(f"DELETE FROM defense_placements WHERE session_id IN ({marks})", session_ids)
+        archive.executemany(f"INSERT OR REPLACE INTO game_sessions VALUES ({', '.join('?' * len(SESSION_COLUMNS))})",
+                            sessions)
+        archive.executemany(f'''
+        INSERT INTO defense_placements (session_id, {', '.join(PLACEMENT_COLUMNS)})
+        VALUES ({', '.join('?' * (len(PLACEMENT_COLUMNS) + 1))})
+        ''', placements)
+        archive.executemany('''
+        INSERT OR REPLACE INTO enemy_data (session_id, columns, row_count, rows) VALUES (?, ?, ?, ?)
+        ''', [(session_id, json.dumps(ENEMY_COLUMNS), len(rows), zlib.compress(json.dumps(rows).encode(), 9))
+              for session_id, rows in enemy_rows.items()])
+        archive.commit()
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(f'''
+            INSERT OR REPLACE INTO enemy_rollups (session_id, enemy_type, enemy_count, total_survival_time,
+                total_damage_dealt, total_penetration_depth)
+            SELECT session_id, enemy_type, COUNT(*), SUM(survival_time), SUM(damage_dealt), SUM(penetration_depth)
+            FROM enemy_data WHERE session_id IN ({marks})
+            GROUP BY session_id, enemy_type
+            ''', session_ids)
+            conn.execute(f"DELETE FROM enemy_data WHERE session_id IN ({marks})", session_ids)
+            archived_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            conn.executemany("INSERT OR REPLACE INTO archived_sessions (session_id, archived_at) VALUES (?, ?)",
+                             [(session_id, archived_at) for session_id in session_ids])
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        return sum(len(rows) for rows in enemy_rows.values())
+
+    def archive_sessions(self, conn, cutoff):
+        session_ids = self.expired_sessions(conn, cutoff)
+        if not session_ids:
+            return 0, 0
+        archive = self.connect_archive()
+        rows = 0
+        try:
+            for start in range(0, len(session_ids), self.batch_sessions):
+                rows += self.archive_batch(conn, archive, session_ids[start:start + self.batch_sessions])
+        finally:
+            archive.close()
+        return len(session_ids), rows
+
+    def archive_session_csvs(self, cutoff):
+        # Per-game CSVs older than the cutoff are appended to a gzip file per month, then removed
+        pattern = os.path.join(self.csv_dir, 'game_session_*.csv')
+        archive_dir = os.path.join(self.csv_dir, 'archive')
+        by_month = {}
+        for source, metrics in StatsExporter().iter_session_csvs(pattern):
+            date = metrics.get('Date', '')
+            if date and date < cutoff:
+                by_month.setdefault(date[:7], []).append((source, metrics))
+
+        archived = 0
+        for month, entries in sorted(by_month.items()):
+            os.makedirs(archive_dir, exist_ok=True)
+            path = os.path.join(archive_dir, f'game_session_summaries_{month}.csv.gz')
+            is_new = not os.path.exists(path)
+            with gzip.open(path, 'at', newline='') as f:
+                writer = csv.writer(f)
+                if is_new:
+                    writer.writerow(['Source'] + SESSION_CSV_COLUMNS)
+                for source, metrics in entries:
+                    writer.writerow([os.path.basename(source)] + [metrics.get(column, '') for column in SESSION_CSV_COLUMNS])
+            for source, _ in entries:
+                os.remove(source)
+            archived += len(entries)
+        return archived
+
+    def incremental_vacuum(self, conn):
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            self.log("Incremental vacuum is off for this database; run once with --enable-incremental-vacuum")
+            return 0
+        freed = 0
+        # A few hundred pages per step keeps each write lock short
+        while conn.execute("PRAGMA freelist_count").fetchone()[0] > 0:
+            before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            conn.execute(f"PRAGMA incremental_vacuum({self.vacuum_pages})").fetchall()
+            after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if after >= before:
+                break
+            freed += before - after
+        return freed
+
+    def enable_incremental_vacuum(self, conn):
+        # Switching an existing database over needs one full VACUUM, which locks it while it runs
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+
+    def run(self, keep_days, enable_incremental_vacuum=False):
+        cutoff = (datetime.now() - timedelta(days=keep_days)).strftime('%Y-%m-%d %H:%M:%S')
+        conn = self.connect()
+        try:
+            sessions, rows = self.archive_sessions(conn, cutoff)
+            self.log(f"Archived {sessions} sessions ({rows} enemy rows) older than {cutoff} -> {self.archive_path}")
+            self.log(f"Discarded {self.discard_abandoned_sessions(conn, cutoff)} unfinished sessions older than {cutoff}")
+            self.log(f"Archived {self.archive_session_csvs(cutoff)} per-game CSV files")
+            if enable_incremental_vacuum:
+                self.enable_incremental_vacuum(conn)
+            pages = self.incremental_vacuum(conn)
+            self.log(f"Reclaimed {pages} free pages")
+            conn.execute("ANALYZE")
+        finally:
+            conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old sessions out of the stats database and compact it")
+    parser.add_argument('--db', default=STATS_DB_PATH)
+    parser.add_argument('--archive', default=ARCHIVE_DB_PATH)
+    parser.add_argument('--csv-dir', default='data')
+    parser.add_argument('--keep-days', type=int, default=30, help="sessions newer than this stay in full detail")
+    parser.add_argument('--batch-sessions', type=int, default=20, help="sessions archived per transaction")
+    parser.add_argument('--enable-incremental-vacuum', action='store_true',
+                        help="convert an older database to incremental vacuum (one full VACUUM)")
+    args = parser.parse_args()
+    if args.keep_days < 1:
+        parser.error("--keep-days must be at least 1, so a game still in progress is never archived")
+    if args.batch_sessions < 1:
+        parser.error("--batch-sessions must be at least 1")
+
+    StatsMaintenance(args.db, args.archive, args.csv_dir, args.batch_sessions).run(
+        args.keep_days, args.enable_incremental_vacuum)
+
+if __name__ == "__main__":
+    main()
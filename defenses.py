@@ -1,34 +1,41 @@
 import pygame
 from game_objects import Defense
 from projectiles import Projectile
-from config import RED, GREEN, YELLOW
+from catalog import get_catalog
+from config import YELLOW
 
 class LaserTurret(Defense):
-    def __init__(self, position, orbital_radius, cost=150, damage=25, fire_rate=1.5):
-        super().__init__(position, orbital_radius, cost, damage, fire_rate)
-        self.range = 200
+    def __init__(self, position, orbital_radius, spec=None):
+        super().__init__(position, orbital_radius, spec or get_catalog().defense('LaserTurret'))
         self.rotation_speed = 0.1
         self.charge_time = 0.5
-        self.color = RED
+
+    def apply_level_stats(self, stats):
+        super().apply_level_stats(stats)
+        self.range = stats.get('range', 200)
+        self.projectile_speed = stats.get('projectile_speed', 10)
         
     def _fire_at_target(self, target):
         aim_angle = self.calculate_aim(target)
-        projectile = Projectile(self.position, aim_angle, self.damage, speed=10, color=self.color)
+        projectile = Projectile(self.position, aim_angle, self.damage, speed=self.projectile_speed, color=self.color,
+                                source_type=self.type_name, owner_id=self.defense_id)
         return projectile
         
     def charge_laser(self):
         pass
         
-    def render(self, surface):
-        pygame.draw.circle(surface, self.color, (int(self.position[0]), int(self.position[1])), self.size)
+    def render(self, surface, camera, detail=True):
+        pygame.draw.circle(surface, self.color, camera.to_view(self.position), camera.length(self.size))
 
 class ResourceCollector(Defense):
-    def __init__(self, position, orbital_radius, cost=100):
-        super().__init__(position, orbital_radius, cost, 0, 0)
-        self.collection_rate = 10
-        self.storage_capacity = 100
+    def __init__(self, position, orbital_radius, spec=None):
+        super().__init__(position, orbital_radius, spec or get_catalog().defense('ResourceCollector'))
         self.current_storage = 0
-        self.color = GREEN
+
+    def apply_level_stats(self, stats):
+        super().apply_level_stats(stats)
+        self.collection_rate = stats.get('collection_rate', 10)
+        self.storage_capacity = stats.get('storage_capacity', 100)
         
     def collect_resources(self, dt):
         amount = self.collection_rate * dt / 1000
@@ -42,12 +49,25 @@ class ResourceCollector(Defense):
         return resources
         
     def upgrade_capacity(self):
-        self.storage_capacity *= 1.5
-        self.collection_rate *= 1.2
+        return self.upgrade()
+
+    def snapshot(self):
+        return (self.position[0], self.position[1], self.size, self.color, self.current_storage / self.storage_capacity)
         
-    def render(self, surface):
-        pygame.draw.circle(surface, self.color, (int(self.position[0]), int(self.position[1])), self.size)
+    def render(self, surface, camera, detail=True):
+        center = camera.to_view(self.position)
+        pygame.draw.circle(surface, self.color, center, camera.length(self.size))
+        if not detail:
+            return
         fill_percent = self.current_storage / self.storage_capacity
-        fill_radius = int(self.size * fill_percent)
+        fill_radius = int(self.size * fill_percent * camera.scale)
         if fill_radius > 0:
-            pygame.draw.circle(surface, YELLOW, (int(self.position[0]), int(self.position[1])), fill_radius)
\ No newline at end of file
+            pygame.draw.circle(surface, YELLOW, center, fill_radius)
+
+DEFENSE_KINDS = {
+    'turret': LaserTurret,
+    'collector': ResourceCollector,
+}
+
+def create_defense(spec, position, orbital_radius):
+    return DEFENSE_KINDS[spec.kind](position, orbital_radius, spec)
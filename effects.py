@@ -0,0 +1,140 @@
+import math
+import time
+from collections import deque
+import pygame
+from config import CYAN
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAX_PARTICLES = 2048
+EFFECTS_BUDGET_MS = 2.0
+SPRITE_SIZES = (1, 2, 3)
+
+class EffectsSystem:
+    def __init__(self, capacity=MAX_PARTICLES, budget_ms=EFFECTS_BUDGET_MS):
+        self.capacity = capacity
+        self.budget_ms = budget_ms
+        # The simulation (possibly on another thread) only queues events; particles are owned by the renderer
+        self.events = deque()
+        self.cost_ms = 0.0
+        self.update_ms = 0.0
+        self.emit_scale = 1.0
+        self.head = 0
+        self.palette = []
+        self.palette_ids = {}
+        self.sprites = {}
+        # Visual randomness only, so the game's seeded RNG is never touched
+        self.rng = np.random.default_rng()
+
+        self.x = np.zeros(capacity, np.float32)
+        self.y = np.zeros(capacity, np.float32)
+        self.vx = np.zeros(capacity, np.float32)
+        self.vy = np.zeros(capacity, np.float32)
+        self.life = np.zeros(capacity, np.float32)
+        self.max_life = np.ones(capacity, np.float32)
+        self.color = np.zeros(capacity, np.uint8)
+
+    @classmethod
+    def create(cls, *args, **kwargs):
+        return cls(*args, **kwargs) if np is not None else None
+
+    def explosion(self, position, color):
+        self.events.append(('burst', position[0], position[1], color, 40, 2.5, 600))
+
+    def spark(self, position, color):
+        self.events.append(('burst', position[0], position[1], color, 8, 1.5, 250))
+
+    def shield_flash(self, position, radius):
+        self.events.append(('ring', position[0], position[1], CYAN, 48, radius + 10, 400))
+
+    def _color_id(self, color):
+        color = tuple(color)
+        color_id = self.palette_ids.get(color)
+        if color_id is None:
+            color_id = len(self.palette)
+            self.palette.append(color)
+            self.palette_ids[color] = color_id
+        return color_id
+
+    def _slots(self, count):
+        # Ring buffer: once full, new particles overwrite the oldest ones, which keeps the cap hard
+        slots = (self.head + np.arange(count)) % self.capacity
+        self.head = (self.head + count) % self.capacity
+        return slots
+
+    def _emit(self, kind, x, y, color, count, spread, life_ms):
+        count = min(self.capacity, max(1, int(count * self.emit_scale)))
+        slots = self._slots(count)
+        angles = self.rng.uniform(0, 2 * math.pi, count).astype(np.float32)
+        if kind == 'ring':
+            self.x[slots] = x + np.cos(angles) * spread
+            self.y[slots] = y + np.sin(angles) * spread
+            speeds = np.full(count, 0.03, np.float32)
+        else:
+            self.x[slots] = x
+            self.y[slots] = y
+            speeds = self.rng.uniform(0.2, 1.0, count).astype(np.float32) * spread * 0.06
+        self.vx[slots] = np.cos(angles) * speeds
+        self.vy[slots] = np.sin(angles) * speeds
+        lifetimes = self.rng.uniform(0.6, 1.0, count).astype(np.float32) * life_ms
+        self.life[slots] = lifetimes
+        self.max_life[slots] = lifetimes
+        self.color[slots] = self._color_id(color)
+
+    def update(self, dt_ms):
+        start = time.perf_counter()
+        while self.events:
+            self._emit(*self.events.popleft())
+
+        alive = self.life > 0
+        drag = 0.998 ** dt_ms
+        self.x[alive] += self.vx[alive] * dt_ms
+        self.y[alive] += self.vy[alive] * dt_ms
+        self.vx[alive] *= drag
+        self.vy[alive] *= drag
+        self.life[alive] -= dt_ms
+        self.update_ms = (time.perf_counter() - start) * 1000
+
+    def clear(self):
+        # With detail off nothing is drawn, so pending effects and live particles are dropped rather than
+        # simulated; emit_scale, which only render() can measure, stays where it was
+        self.events.clear()
+        self.life[:] = 0
+
+    def _sprite(self, color_id, size):
+        sprite = self.sprites.get((color_id, size))
+        if sprite is None:
+            sprite = pygame.Surface((size * 2, size * 2))
+            sprite.fill(self.palette[color_id])
+            self.sprites[(color_id, size)] = sprite
+        return sprite
+
+    def render(self, surface, camera):
+        start = time.perf_counter()
+        width, height = surface.get_size()
+        xs = self.x * camera.scale + camera.offset_x
+        ys = self.y * camera.scale + camera.offset_y
+        alive = np.flatnonzero((self.life > 0) & (xs > -4) & (xs < width + 4) & (ys > -4) & (ys < height + 4))
+        if len(alive):
+            fade = self.life[alive] / self.max_life[alive]
+            sizes = np.minimum((fade * len(SPRITE_SIZES)).astype(np.int32), len(SPRITE_SIZES) - 1)
+            xs = xs[alive].astype(np.int32)
+            ys = ys[alive].astype(np.int32)
+            colors = self.color[alive]
+            surface.blits([(self._sprite(c, SPRITE_SIZES[s]), (x - SPRITE_SIZES[s], y - SPRITE_SIZES[s]))
+                           for c, s, x, y in zip(colors.tolist(), sizes.tolist(), xs.tolist(), ys.tolist())],
+                          doreturn=False)
+
+        cost = self.update_ms + (time.perf_counter() - start) * 1000
+        self.cost_ms += (cost - self.cost_ms) * 0.1
+        # Over budget: emit fewer particles per effect until the cost comes back down
+        if self.cost_ms > self.budget_ms:
+            self.emit_scale = max(0.1, self.emit_scale * 0.9)
+        elif self.cost_ms < self.budget_ms * 0.5:
+            self.emit_scale = min(1.0, self.emit_scale + 0.01)
+
+    def active_particles(self):
+        return int(np.count_nonzero(self.life > 0))
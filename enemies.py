@@ -2,21 +2,32 @@ import math
 import random
 import pygame
 from game_objects import GameObject
-from config import SCREEN_WIDTH, SCREEN_HEIGHT, PLANET_RADIUS, PURPLE, CYAN
+from catalog import get_catalog
+from config import WORLD_WIDTH, WORLD_HEIGHT, PLANET_RADIUS
+
+# Spawn distance and speeds are round numbers, so enemies often arrive exactly on the planet's edge; the
+# tolerance keeps which tick that lands on from depending on how the steps were rounded
+HIT_TOLERANCE = 1e-6
 
 class Enemy(GameObject):
-    def __init__(self, position, health, speed, damage, reward):
+    def __init__(self, position, spec, rng=None, spawn_time=0):
         super().__init__(position)
-        self.health = health
-        self.speed = speed
-        self.damage = damage
-        self.reward = reward
+        self.rng = rng or random
+        self.spec = spec
+        self.type_name = spec.name
+        self.health = spec.stats['health']
+        self.speed = spec.stats['speed']
+        self.damage = spec.stats['damage']
+        self.reward = spec.stats['reward']
         self.movement_pattern = "direct"
         self.radius = 15
         self.destroyed = False
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = spawn_time
         self.closest_approach = float('inf')
-        self.color = PURPLE
+        self.color = spec.color
+        # Tick the position is current as of, and the tick the next update is due when moved in batches
+        self.lod_tick = 0
+        self.lod_due = 0
         
     def move(self, planet_pos):
         dx = planet_pos[0] - self.position[0]
@@ -29,7 +40,25 @@ class Enemy(GameObject):
             self.position[0] += dx / distance * self.speed
             self.position[1] += dy / distance * self.speed
             
-        return distance <= PLANET_RADIUS + self.radius
+        return distance <= PLANET_RADIUS + self.radius + HIT_TOLERANCE
+
+    def advance(self, planet_pos, ticks):
+        # Same result as calling move() ticks times: the path runs straight at the planet, so the steps add
+        # up to one and the closest approach is the distance before the last of them
+        if ticks <= 1:
+            return self.move(planet_pos)
+        dx = planet_pos[0] - self.position[0]
+        dy = planet_pos[1] - self.position[1]
+        distance = math.sqrt(dx*dx + dy*dy)
+        last = distance - (ticks - 1) * self.speed
+
+        self.closest_approach = min(self.closest_approach, last)
+
+        if distance > 0:
+            self.position[0] += dx / distance * self.speed * ticks
+            self.position[1] += dy / distance * self.speed * ticks
+
+        return last <= PLANET_RADIUS + self.radius + HIT_TOLERANCE
         
     def attack(self, planet):
         damage_dealt = planet.take_damage(self.damage)
@@ -42,37 +71,63 @@ class Enemy(GameObject):
     def check_destroyed(self):
         self.destroyed = self.health <= 0
         return self.destroyed
+
+    def snapshot(self):
+        return (self.position[0], self.position[1], self.radius, self.color)
         
-    def render(self, surface):
-        pygame.draw.circle(surface, self.color, (int(self.position[0]), int(self.position[1])), self.radius)
+    def render(self, surface, camera):
+        pygame.draw.circle(surface, self.color, camera.to_view(self.position), camera.length(self.radius))
 
 class BasicEnemy(Enemy):
-    def __init__(self, position):
-        super().__init__(position, health=50, speed=1, damage=10, reward=25)
-        self.direct_speed = 1
-        self.color = PURPLE
+    def __init__(self, position, rng=None, spec=None, spawn_time=0):
+        super().__init__(position, spec or get_catalog().enemy('BasicEnemy'), rng, spawn_time)
+        self.direct_speed = self.speed
         
     def approach_direct(self, planet_pos):
         return self.move(planet_pos)
 
 class FastEnemy(Enemy):
-    def __init__(self, position):
-        super().__init__(position, health=30, speed=2.5, damage=5, reward=35)
-        self.evasion_chance = 0.2
-        self.color = CYAN
+    def __init__(self, position, rng=None, spec=None, spawn_time=0):
+        super().__init__(position, spec or get_catalog().enemy('FastEnemy'), rng, spawn_time)
+        self.evasion_chance = self.spec.stats.get('evasion_chance', 0.2)
+        # Its own stream, seeded from the game's, so when its draws happen doesn't shift anyone else's
+        self.rng = random.Random(self.rng.getrandbits(64))
         
     def evade_defenses(self):
-        if random.random() < self.evasion_chance:
-            angle = random.uniform(-math.pi/4, math.pi/4)
-            dx = self.position[0] - SCREEN_WIDTH//2
-            dy = self.position[1] - SCREEN_HEIGHT//2
-            current_angle = math.atan2(dy, dx)
-            new_angle = current_angle + angle
-            distance = math.sqrt(dx*dx + dy*dy)
-            
-            self.position[0] = SCREEN_WIDTH//2 + math.cos(new_angle) * distance
-            self.position[1] = SCREEN_HEIGHT//2 + math.sin(new_angle) * distance
+        if self.rng.random() < self.evasion_chance:
+            self.turn(self.rng.uniform(-math.pi/4, math.pi/4))
+
+    def turn(self, angle):
+        dx = self.position[0] - WORLD_WIDTH//2
+        dy = self.position[1] - WORLD_HEIGHT//2
+        current_angle = math.atan2(dy, dx)
+        new_angle = current_angle + angle
+        distance = math.sqrt(dx*dx + dy*dy)
+
+        self.position[0] = WORLD_WIDTH//2 + math.cos(new_angle) * distance
+        self.position[1] = WORLD_HEIGHT//2 + math.sin(new_angle) * distance
             
     def move(self, planet_pos):
         self.evade_defenses()
-        return super().move(planet_pos)
\ No newline at end of file
+        return super().move(planet_pos)
+
+    def advance(self, planet_pos, ticks):
+        if ticks <= 1:
+            return self.move(planet_pos)
+        # Evading turns about the planet and moving heads straight at it, so the turns of every tick can be
+        # drawn in order and made as one before the straight steps
+        angle = 0
+        for _ in range(ticks):
+            if self.rng.random() < self.evasion_chance:
+                angle += self.rng.uniform(-math.pi/4, math.pi/4)
+        if angle:
+            self.turn(angle)
+        return super().advance(planet_pos, ticks)
+
+ENEMY_KINDS = {
+    'direct': BasicEnemy,
+    'evasive': FastEnemy,
+}
+
+def create_enemy(spec, position, rng=None, spawn_time=0):
+    return ENEMY_KINDS[spec.kind](position, rng, spec, spawn_time)
@@ -0,0 +1,14 @@
+import pygame
+
+_fonts = {}
+
+def get_font(size, name=None):
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        # SysFont scans every installed font on first use; the default font needs no lookup
+        font = pygame.font.Font(None, size) if name is None else pygame.font.SysFont(name, size)
+        _fonts[key] = font
+    return font
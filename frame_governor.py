@@ -0,0 +1,81 @@
+import time
+import pygame
+from config import FPS
+
+# Each level keeps everything the previous one dropped and gives up a little more
+QUALITY_LEVELS = [
+    {'name': 'full', 'orbit_rings': True, 'help_overlay': True, 'detail': True, 'render_interval': 1},
+    {'name': 'reduced', 'orbit_rings': False, 'help_overlay': False, 'detail': True, 'render_interval': 1},
+    {'name': 'low', 'orbit_rings': False, 'help_overlay': False, 'detail': False, 'render_interval': 1},
+    {'name': 'skip 1/2', 'orbit_rings': False, 'help_overlay': False, 'detail': False, 'render_interval': 2},
+    {'name': 'skip 2/3', 'orbit_rings': False, 'help_overlay': False, 'detail': False, 'render_interval': 3},
+]
+
+class FrameGovernor:
+    def __init__(self, target_fps=FPS, degrade_after=10, restore_after=120):
+        self.target_fps = target_fps
+        self.budget_ms = 1000 / target_fps
+        self.degrade_after = degrade_after
+        self.restore_after = restore_after
+        self.clock = pygame.time.Clock()
+        self.level = 0
+        self.frame_cost_ms = 0.0
+        self.last_frame_ms = 0.0
+        self.frame_index = 0
+        self.frames_rendered = 0
+        self.frames_skipped = 0
+        self.over_budget_frames = 0
+        self.under_budget_frames = 0
+        self.frame_start = time.perf_counter()
+
+    @property
+    def quality(self):
+        return QUALITY_LEVELS[self.level]
+
+    def should_render(self):
+        return self.frame_index % self.quality['render_interval'] == 0
+
+    def begin_frame(self):
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self, rendered=True):
+        cost = (time.perf_counter() - self.frame_start) * 1000
+        self.last_frame_ms = cost
+        if rendered:
+            self.frames_rendered += 1
+            # Smoothed so a single hitch doesn't flip the quality level. Skipped frames only cost the sim
+            # step and would pull the average under budget, restoring a level that can't keep up.
+            self.frame_cost_ms += (cost - self.frame_cost_ms) * 0.1
+            self._adjust()
+        else:
+            self.frames_skipped += 1
+        self.frame_index += 1
+        self.clock.tick(self.target_fps)
+
+    def _adjust(self):
+        if self.frame_cost_ms > self.budget_ms * 0.9:
+            self.over_budget_frames += 1
+            self.under_budget_frames = 0
+        elif self.frame_cost_ms < self.budget_ms * 0.5:
+            self.under_budget_frames += 1
+            self.over_budget_frames = 0
+        else:
+            self.over_budget_frames = 0
+            self.under_budget_frames = 0
+
+        if self.over_budget_frames >= self.degrade_after and self.level < len(QUALITY_LEVELS) - 1:
+            self.level += 1
+            self.over_budget_frames = 0
+        elif self.under_budget_frames >= self.restore_after and self.level > 0:
+            self.level -= 1
+            self.under_budget_frames = 0
+
+    def snapshot(self):
+        return {
+            'quality_level': self.level,
+            'quality': self.quality['name'],
+            'frame_cost_ms': self.frame_cost_ms,
+            'fps': self.clock.get_fps(),
+            'frames_rendered': self.frames_rendered,
+            'frames_skipped': self.frames_skipped,
+        }
@@ -1,65 +1,183 @@
 import pygame
 import sys
 import math
-from config import SCREEN_WIDTH, SCREEN_HEIGHT, PLANET_RADIUS, MAX_ORBITAL_RADIUS, BACKGROUND_COLOR, WHITE, GREEN, RED
+import time
+import random
+import queue
+import threading
+import struct
+from config import (WORLD_WIDTH, WORLD_HEIGHT, PLANET_RADIUS, MAX_ORBITAL_RADIUS, BACKGROUND_COLOR, WHITE, GREEN, RED,
+                    TICK_MS, TIME_SCALES, MAX_SUBSTEPS_PER_FRAME, MAX_SUBSTEPS_UNLIMITED, SIM_FRAME_BUDGET_MS,
+                    RENDER_SCALE, ZOOM_STEP, PAN_SPEED, ENEMY_LOD_TICKS, ENEMY_LOD_MARGIN, init_display,
+                    wall_clock_ms)
 from game_objects import Planet
-from defenses import LaserTurret, ResourceCollector
+from defenses import ResourceCollector, create_defense
+from catalog import get_catalog
 from ui_manager import UIManager
 from game_stats import GameStats
+from stats_sinks import NullStatsSink
 from wave_manager import WaveManager
+from snapshots import UIState, WorldSnapshot, SnapshotBuffer, draw_world
+from frame_governor import FrameGovernor, QUALITY_LEVELS
+from effects import EffectsSystem
+from tracer import get_tracer
+from perf_metrics import PerfRecorder
+from live_analytics import LiveAnalytics
+from placement_index import PlacementIndex
+from camera import Camera
 
 class GameController:
-    def __init__(self):
-        self.planet = Planet([SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2])
+    def __init__(self, seed=None, headless=False, clock=wall_clock_ms, stats_sink=None, threaded=False,
+                 render_scale=RENDER_SCALE):
+        self.headless = headless
+        self.threaded = threaded
+        self.clock = clock
+        self.rng = random.Random(seed)
+        self.planet = Planet([WORLD_WIDTH // 2, WORLD_HEIGHT // 2])
         self.defenses = []
+        self.placement_index = PlacementIndex(self.planet.position)
         self.active_enemies = []
         self.projectiles = []
-        self.wave_manager = WaveManager()
-        self.stats = GameStats()
+        self.wave_manager = WaveManager(self.rng, clock=self.get_game_time)
         self.game_time = 0
-        self.selected_defense_type = LaserTurret
+        self.sim_tick = 0
+        self.enemy_lod = ENEMY_LOD_TICKS
+        self.lod_radius = None
+        self.world_radius = math.hypot(WORLD_WIDTH / 2, WORLD_HEIGHT / 2)
+        self.defense_reach = self.world_radius
+        self.enemies_behind = False
+        if stats_sink is None and headless:
+            stats_sink = NullStatsSink()
+        self.stats = GameStats(clock=self.get_game_time, sink=stats_sink)
+        self.time_scale_index = 0
+        self.sim_accumulator = 0
+        self.achieved_speed = 1.0
+        self.speed_window_wall = 0
+        self.speed_window_sim = 0
+        self.catalog = get_catalog()
+        self.selected_defense_type = self.catalog.defenses[0]
         self.game_over = False
         self.placement_mode = False
         self.wave_in_progress = False
-        self.ui_manager = UIManager(self)
+        if not headless:
+            init_display(resizable=True)
+        self.camera = Camera(self.planet.position, render_scale=render_scale)
+        if not headless:
+            self.camera.resize(pygame.display.get_surface().get_size())
+        self.view = None
+        self.last_input_time = None
+        self.ui_manager = None if headless else UIManager(self)
+        self.governor = None if headless else FrameGovernor()
+        self.effects = None if headless else EffectsSystem.create()
+        self.last_render_time = None
+        self.tracer = get_tracer()
+        self.perf = None if headless else PerfRecorder()
+        self.stats.perf = self.perf
+        self.stats.live = None if headless else LiveAnalytics(self.get_game_time)
+        self.show_analytics = False
+        self.analytics_summary = None
+        self.analytics_refreshed = None
+        self.wave_trace_start = 0
+        self.stream = None
         self.show_help = True
+        self.snapshots = SnapshotBuffer()
+        self.input_queue = queue.Queue()
+        self.sim_stop = threading.Event()
+        self.sim_thread = None
         
     def start_game(self):
-        self.game_time = pygame.time.get_ticks()
         self.stats.session_start_time = self.game_time
+        if self.perf is not None:
+            self.perf.attach_gc()
+
+    def get_game_time(self):
+        return self.game_time
+
+    @property
+    def time_scale(self):
+        return TIME_SCALES[self.time_scale_index]
+
+    def change_time_scale(self, step):
+        self.time_scale_index = max(0, min(len(TIME_SCALES) - 1, self.time_scale_index + step))
+        self.sim_accumulator = 0
         
     def process_input(self):
         for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.end_game()
-                pygame.quit()
-                sys.exit()
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                self.quit_game()
+
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_h:
+                self.show_help = not self.show_help
+
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_a:
+                self.show_analytics = not self.show_analytics
+
+            elif event.type in (pygame.VIDEORESIZE, pygame.WINDOWSIZECHANGED):
+                self.camera.resize(pygame.display.get_surface().get_size())
+
+            elif event.type == pygame.MOUSEWHEEL:
+                self.camera.zoom_by(ZOOM_STEP ** event.y, pygame.mouse.get_pos())
+
+            elif event.type == pygame.KEYDOWN and event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+                self.camera.zoom_by(ZOOM_STEP)
+
+            elif event.type == pygame.KEYDOWN and event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                self.camera.zoom_by(1 / ZOOM_STEP)
+
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_HOME:
+                self.camera.reset()
+
+            elif event.type == pygame.MOUSEMOTION and (event.buttons[1] or event.buttons[2]):
+                self.camera.pan(*event.rel)
+
+            else:
+                if event.type == pygame.MOUSEBUTTONDOWN:
+                    # Converted here, against the view the player actually clicked on
+                    event = pygame.event.Event(event.type, button=event.button, pos=self.camera.to_world(event.pos))
+                if self.sim_thread is not None:
+                    # Anything that touches game state is applied by the simulation thread
+                    self.input_queue.put(event)
+                else:
+                    self.handle_event(event)
+
+        now = self.clock()
+        if self.last_input_time is not None:
+            keys = pygame.key.get_pressed()
+            step = PAN_SPEED * (now - self.last_input_time) / 1000
+            dx = (keys[pygame.K_LEFT] - keys[pygame.K_RIGHT]) * step
+            dy = (keys[pygame.K_UP] - keys[pygame.K_DOWN]) * step
+            if dx or dy:
+                self.camera.pan(dx, dy)
+        self.last_input_time = now
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_SPACE and not self.wave_in_progress:
+                self.start_next_wave()
+
+            elif event.key == pygame.K_LEFTBRACKET:
+                self.change_time_scale(-1)
+
+            elif event.key == pygame.K_RIGHTBRACKET:
+                self.change_time_scale(1)
                 
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    self.end_game()
-                    pygame.quit()
-                    sys.exit()
-                    
-                elif event.key == pygame.K_SPACE and not self.wave_in_progress:
-                    self.wave_manager.start_wave()
-                    self.wave_in_progress = True
-                    
-                elif event.key == pygame.K_1:
-                    self.selected_defense_type = LaserTurret
-                    
-                elif event.key == pygame.K_2:
-                    self.selected_defense_type = ResourceCollector
-                    
-                elif event.key == pygame.K_p:
-                    self.placement_mode = not self.placement_mode
+            elif pygame.K_1 <= event.key <= pygame.K_9:
+                index = event.key - pygame.K_1
+                if index < len(self.catalog.defenses):
+                    self.selected_defense_type = self.catalog.defenses[index]
+                
+            elif event.key == pygame.K_p:
+                self.placement_mode = not self.placement_mode
+                
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == 1:
+                self.handle_click(event.pos)
 
-                elif event.key == pygame.K_h:
-                    self.show_help = not self.show_help
-                    
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:
-                    self.handle_click(pygame.mouse.get_pos())
+    def quit_game(self):
+        self.stop_simulation_thread()
+        self.end_game()
+        pygame.quit()
+        sys.exit()
                     
     def handle_click(self, pos):
         if self.placement_mode:
@@ -68,21 +186,112 @@ class GameController:
             distance = math.sqrt(dx*dx + dy*dy)
             
             if PLANET_RADIUS + 20 <= distance <= MAX_ORBITAL_RADIUS:
-                defense_cost = self.selected_defense_type(pos, distance).cost
-                if self.planet.resources >= defense_cost:
-                    defense = self.selected_defense_type(pos, distance)
-                    self.defenses.append(defense)
-                    self.planet.resources -= defense_cost
-                    self.stats.update_stats("defense_placed", defense=defense)
+                self.place_defense(self.selected_defense_type, pos, distance)
+
+    def place_defense(self, defense_type, pos, distance):
+        if self.planet.resources >= defense_type.cost:
+            defense = create_defense(defense_type, pos, distance)
+            if self.placement_index.overlaps(defense.position, defense.size):
+                return None
+            defense.defense_id = len(self.defenses)
+            self.defenses.append(defense)
+            self.placement_index.add(defense)
+            # Projectiles fly until just past the world edge; see enemy_lod_radius()
+            self.defense_reach = max(self.defense_reach, distance + getattr(defense, 'range', 0),
+                                     self.world_radius + 2 * getattr(defense, 'projectile_speed', 0))
+            self.planet.resources -= defense_type.cost
+            self.stats.update_stats("defense_placed", defense=defense)
+            return defense
+        return None
+
+    def place_defense_at(self, defense_type, orbital_radius, angle):
+        if not PLANET_RADIUS + 20 <= orbital_radius <= MAX_ORBITAL_RADIUS:
+            return None
+        pos = [self.planet.position[0] + math.cos(angle) * orbital_radius,
+               self.planet.position[1] + math.sin(angle) * orbital_radius]
+        return self.place_defense(defense_type, pos, orbital_radius)
+
+    def start_next_wave(self):
+        if not self.wave_in_progress:
+            self.wave_manager.start_wave(self.game_time)
+            self.wave_in_progress = True
+            self.wave_trace_start = self.tracer.now()
+            self.tracer.instant("wave start", "wave", wave=self.wave_manager.current_wave)
             
+    def advance_simulation(self, elapsed_ms):
+        scale = self.time_scale
+        if scale is None:
+            target_steps = MAX_SUBSTEPS_UNLIMITED
+        else:
+            self.sim_accumulator += elapsed_ms * scale
+            target_steps = min(int(self.sim_accumulator // TICK_MS), MAX_SUBSTEPS_PER_FRAME)
+
+        frame_start = time.perf_counter()
+        steps = 0
+        while steps < target_steps and not self.game_over:
+            self.update_game_state()
+            steps += 1
+            if (time.perf_counter() - frame_start) * 1000 >= SIM_FRAME_BUDGET_MS:
+                break
+
+        if scale is not None:
+            self.sim_accumulator -= steps * TICK_MS
+            if self.sim_accumulator >= TICK_MS:
+                # Drop the backlog instead of spiralling when the frame can't keep up
+                self.sim_accumulator = TICK_MS
+
+        self.speed_window_wall += elapsed_ms
+        self.speed_window_sim += steps * TICK_MS
+        if self.speed_window_wall >= 500:
+            self.achieved_speed = self.speed_window_sim / self.speed_window_wall
+            self.speed_window_wall = 0
+            self.speed_window_sim = 0
+        return steps
+
     def update_game_state(self):
-        current_time = pygame.time.get_ticks()
+        self.sim_tick += 1
+        current_time = self.sim_tick * TICK_MS
         dt = current_time - self.game_time
         self.game_time = current_time
         
         if self.planet.check_game_over():
             self.game_over = True
-            
+
+        tracer = self.tracer
+        if tracer.enabled:
+            tick_start = tracer.now()
+            with tracer.span("targeting"):
+                self.update_defenses(current_time, dt)
+            with tracer.span("collisions"):
+                self.update_projectiles()
+            with tracer.span("enemy movement"):
+                self.update_enemies()
+            with tracer.span("spawning"):
+                self.update_wave(current_time)
+            tracer.complete("update_game_state", tick_start, args={'tick': self.sim_tick,
+                                                                   'enemies': len(self.active_enemies),
+                                                                   'projectiles': len(self.projectiles)})
+        else:
+            self.update_defenses(current_time, dt)
+            self.update_projectiles()
+            self.update_enemies()
+            self.update_wave(current_time)
+
+        timeseries = self.stats.timeseries
+        if current_time >= timeseries.next_time:
+            timeseries.sample(self.planet.resources, self.planet.health, len(self.active_enemies),
+                              self.stats.player_score, self.wave_manager.current_wave)
+
+        if self.stream is not None:
+            try:
+                self.stream.publish(self)
+            except (struct.error, OSError) as e:
+                # Spectating is optional; a broken stream must never take the game down with it
+                print(f"Spectator stream stopped: {e}")
+                self.stream.close()
+                self.stream = None
+
+    def update_defenses(self, current_time, dt):
         for defense in self.defenses:
             if isinstance(defense, ResourceCollector):
                 collected = defense.collect_resources(dt)
@@ -91,88 +300,323 @@ class GameController:
                     self.planet.add_resources(transferred)
                     self.stats.update_stats("resources_collected", transferred)
             else:
+                if self.enemies_behind and defense.ready(current_time):
+                    self.settle_enemies()
                 projectile = defense.fire(current_time, self.active_enemies)
                 if projectile:
                     self.projectiles.append(projectile)
-                    self.stats.update_stats("shot_fired")
-        
+                    self.stats.update_stats("shot_fired", owner_id=defense.defense_id)
+
+    def update_projectiles(self):
         for projectile in self.projectiles[:]:
             projectile.update()
             hit_enemy = projectile.check_collision(self.active_enemies)
             
             if hit_enemy:
-                self.stats.update_stats("shot_hit")
+                self.stats.update_stats("shot_hit", projectile=projectile)
+                if self.effects is not None:
+                    self.effects.spark(projectile.position, projectile.color)
                 
             if projectile.destroyed:
+                if not hit_enemy:
+                    self.stats.update_stats("shot_missed")
                 self.projectiles.remove(projectile)
-                
+
+    def enemy_lod_radius(self):
+        # Past this distance from the planet an enemy is out of every defense's range, beyond where any
+        # projectile can reach (they are dropped just past the world edge) and off screen
+        reach = self.defense_reach
+        if not self.headless:
+            camera = self.camera
+            x, y = self.planet.position
+            reach = max(reach, math.hypot(max(x - camera.left, camera.right - x),
+                                          max(y - camera.top, camera.bottom - y)))
+        return reach + ENEMY_LOD_MARGIN
+
+    def settle_enemies(self):
+        # Targeting reads every enemy's position, so enemies moved in batches catch up to the last tick first
+        tick = self.sim_tick - 1
+        for enemy in self.active_enemies:
+            if enemy.lod_tick < tick:
+                enemy.advance(self.planet.position, tick - enemy.lod_tick)
+                enemy.lod_tick = tick
+        self.enemies_behind = False
+
+    def update_enemies(self):
+        # Enemies far from the fight are moved every few ticks by the ticks they missed, which ends up exactly
+        # where moving them every tick would; nothing out there can hit them or be hit by them in between
+        tick = self.sim_tick
+        planet_pos = self.planet.position
+        lod_radius = self.enemy_lod_radius() if self.enemy_lod > 1 and self.active_enemies else None
+        if lod_radius is None or self.lod_radius is None or lod_radius > self.lod_radius:
+            # The far region shrank (a longer-ranged defense, zooming out): bring everyone back to full rate
+            for enemy in self.active_enemies:
+                enemy.lod_due = 0
+        self.lod_radius = lod_radius
+        self.enemies_behind = False
+
         for enemy in self.active_enemies[:]:
-            hit_planet = enemy.move(self.planet.position)
+            if enemy.lod_due > tick:
+                self.enemies_behind = True
+                continue
+            ticks = tick - enemy.lod_tick
+            hit_planet = enemy.move(planet_pos) if ticks == 1 else enemy.advance(planet_pos, ticks)
+            enemy.lod_tick = tick
+            # closest_approach is where this tick's step started; batch only while the whole batch stays out
+            if lod_radius is not None and enemy.closest_approach > lod_radius + 3 * enemy.speed:
+                clear_ticks = int((enemy.closest_approach - lod_radius) / enemy.speed) - 1
+                enemy.lod_due = tick + min(self.enemy_lod, clear_ticks)
+                self.enemies_behind = True
             
             if hit_planet:
                 damage = enemy.attack(self.planet)
-                self.stats.update_stats("damage_taken", damage, source=enemy.__class__.__name__)
+                self.stats.update_stats("damage_taken", damage, source=enemy.type_name, enemy=enemy)
+                if self.effects is not None:
+                    self.effects.shield_flash(self.planet.position, self.planet.radius)
                 self.active_enemies.remove(enemy)
             elif enemy.destroyed:
                 self.stats.update_stats("enemy_defeated", enemy.reward, enemy=enemy)
+                if self.effects is not None:
+                    self.effects.explosion(enemy.position, enemy.color)
                 self.active_enemies.remove(enemy)
                 self.planet.add_resources(enemy.reward // 2)
-                
+
+    def update_wave(self, current_time):
         if self.wave_in_progress:
             new_enemy = self.wave_manager.spawn_enemies(current_time)
             if new_enemy:
+                new_enemy.lod_tick = self.sim_tick
                 self.active_enemies.append(new_enemy)
                 
             if not self.wave_manager.wave_active and len(self.active_enemies) == 0:
                 self.wave_in_progress = False
                 self.wave_manager.wave_completed(True)
                 self.stats.update_stats("wave_completed")
+                self.tracer.complete(f"wave {self.wave_manager.current_wave}", self.wave_trace_start, "wave",
+                                     {'score': self.stats.player_score, 'health': self.planet.health})
                 
-    def render(self):
-        screen = pygame.display.get_surface()
+    def refresh_analytics(self):
+        # The summary is rebuilt at most 4 times a second; in between the same object is handed out,
+        # which also tells the UI its cached panel is still valid
+        if not self.show_analytics or self.stats.live is None:
+            self.analytics_summary = None
+            return None
+        now = self.clock()
+        if self.analytics_summary is None or now - self.analytics_refreshed >= 250:
+            self.analytics_summary = self.stats.live.summary()
+            self.analytics_refreshed = now
+        return self.analytics_summary
+
+    def ui_state(self):
+        return UIState(self.planet.health, self.planet.resources, self.wave_manager.current_wave,
+                       self.wave_manager.enemies_in_wave, len(self.active_enemies), self.stats.player_score,
+                       self.stats.waves_completed, self.time_scale, self.achieved_speed, self.wave_in_progress,
+                       self.placement_mode, self.selected_defense_type, self.game_over, self.refresh_analytics())
+
+    def capture_snapshot(self):
+        return WorldSnapshot(self.sim_tick, self.game_time, self.planet.snapshot(),
+                             tuple(defense.snapshot() for defense in self.defenses),
+                             tuple(enemy.snapshot() for enemy in self.active_enemies),
+                             tuple(projectile.snapshot() for projectile in self.projectiles),
+                             self.ui_state())
+
+    def describe_defense(self, defense):
+        # Read from the render thread: per-defense counters live in GameStats, indexed by defense_id
+        stats = self.stats
+        lines = [f"{defense.spec.title}  L{defense.upgrade_level}/{defense.spec.max_level}"]
+        if isinstance(defense, ResourceCollector):
+            lines.append(f"Collects {defense.collection_rate}/s, holds {defense.current_storage:.0f}/{defense.storage_capacity}")
+        else:
+            lines.append(f"Damage {defense.damage}  Rate {defense.fire_rate}/s  Range {defense.range}")
+        if 0 <= defense.defense_id < len(stats.defense_damage):
+            shots = stats.defense_shots[defense.defense_id]
+            hits = stats.defense_hits[defense.defense_id]
+            accuracy = f"{hits / shots * 100:.0f}%" if shots else "-"
+            lines.append(f"Shots {shots}  Hits {hits}  Acc {accuracy}")
+            lines.append(f"Damage dealt {stats.defense_damage[defense.defense_id]:.0f}")
+        return tuple(lines)
+
+    def metrics(self):
+        # Called from the metrics server's thread: plain reads of counters the simulation already keeps
+        values = {
+            'sim_ticks': self.sim_tick,
+            'game_time_ms': self.game_time,
+            'wave': self.wave_manager.current_wave,
+            'enemies': len(self.active_enemies),
+            'projectiles': len(self.projectiles),
+            'defenses': len(self.defenses),
+            'shots_fired': self.stats.total_shots,
+            'shots_hit': self.stats.total_hits,
+            'resources': self.planet.resources,
+            'resources_collected': self.stats.resources_collected,
+            'score': self.stats.player_score,
+            'db_pending_rows': self.stats.enemy_survival_times.pending_rows(),
+        }
+        if self.perf is not None:
+            quantiles = self.perf.session.quantiles()
+            values.update(frame_p50_ms=quantiles['p50_ms'], frame_p95_ms=quantiles['p95_ms'],
+                          frame_max_ms=quantiles['max_ms'])
+        if self.governor is not None:
+            values.update(self.governor.snapshot())
+        return values
+
+    def render_target(self, window):
+        # At render scale 1 the world is drawn straight onto the window; otherwise onto an offscreen target
+        # of the camera's view size that is stretched over the window afterwards
+        if window.get_size() != self.camera.window_size:
+            self.camera.resize(window.get_size())
+        if self.camera.view_size == window.get_size():
+            return window
+        if self.view is None or self.view.get_size() != self.camera.view_size:
+            self.view = pygame.Surface(self.camera.view_size)
+        return self.view
+
+    def render(self, snapshot=None):
+        window = pygame.display.get_surface()
+        screen = self.render_target(window)
+        camera = self.camera
         screen.fill(BACKGROUND_COLOR)
+        ui = self.ui_state() if snapshot is None else snapshot.ui
+        quality = QUALITY_LEVELS[0] if self.governor is None else self.governor.quality
+        detail = quality['detail']
+        mouse_pos = pygame.mouse.get_pos()
+        mouse_world = camera.to_world(mouse_pos)
         
-        for r in range(100, MAX_ORBITAL_RADIUS + 1, 50):
-            pygame.draw.circle(screen, (*WHITE, 30), self.planet.position, r, 1)
+        if quality['orbit_rings']:
+            center = camera.to_view(self.planet.position)
+            for r in range(100, MAX_ORBITAL_RADIUS + 1, 50):
+                pygame.draw.circle(screen, (*WHITE, 30), center, camera.length(r), 1)
             
-        if self.placement_mode:
-            mouse_pos = pygame.mouse.get_pos()
-            dx = mouse_pos[0] - self.planet.position[0]
-            dy = mouse_pos[1] - self.planet.position[1]
+        if ui.placement_mode:
+            dx = mouse_world[0] - self.planet.position[0]
+            dy = mouse_world[1] - self.planet.position[1]
             distance = math.sqrt(dx*dx + dy*dy)
             if PLANET_RADIUS + 20 <= distance <= MAX_ORBITAL_RADIUS:
-                color = GREEN if self.planet.resources >= self.selected_defense_type(mouse_pos, distance).cost else RED
-                pygame.draw.circle(screen, color, mouse_pos, 20, 2)
+                affordable = ui.resources >= ui.selected_defense_type.cost
+                color = GREEN if affordable and not self.placement_index.overlaps(mouse_world, 20) else RED
+                pygame.draw.circle(screen, color, camera.to_view(mouse_world), camera.length(20), 2)
         
-        self.planet.render(screen)
-        
-        for defense in self.defenses:
-            defense.render(screen)
-            
-        for enemy in self.active_enemies:
-            enemy.render(screen)
+        if snapshot is None:
+            # Culled on the positions the simulation already keeps; enemies spawn well outside the view
+            if camera.visible(self.planet.position, self.planet.radius + 10):
+                self.planet.render(screen, camera, detail)
             
-        for projectile in self.projectiles:
-            projectile.render(screen)
+            for defense in self.defenses:
+                if camera.visible(defense.position, defense.size):
+                    defense.render(screen, camera, detail)
+                
+            for enemy in self.active_enemies:
+                if camera.visible(enemy.position, enemy.radius):
+                    enemy.render(screen, camera)
+                
+            for projectile in self.projectiles:
+                if camera.visible(projectile.position, projectile.radius):
+                    projectile.render(screen, camera)
+        else:
+            draw_world(screen, snapshot, detail, camera)
+
+        now = self.clock()
+        if self.effects is not None:
+            if detail:
+                self.effects.update(0 if self.last_render_time is None else now - self.last_render_time)
+                self.effects.render(screen, camera)
+            else:
+                self.effects.clear()
+        self.last_render_time = now
+
+        if screen is not window:
+            pygame.transform.scale(screen, window.get_size(), window)
         
-        self.ui_manager.render_ui()
+        self.ui_manager.render_ui(ui)
 
-        if self.show_help:
+        if not ui.placement_mode:
+            hovered = self.placement_index.defense_at(mouse_world)
+            if hovered is not None:
+                self.ui_manager.draw_defense_tooltip(self.describe_defense(hovered), mouse_pos)
+
+        if self.show_help and quality['help_overlay']:
             self.ui_manager.show_controls_overlay()
         
         pygame.display.flip()
         
     def end_game(self):
+        if self.perf is not None:
+            self.perf.detach_gc()
+        if self.stream is not None:
+            self.stream.close()
         self.stats.save_stats()
+
+    def run_simulation(self):
+        last_tick = self.clock()
+        while not self.sim_stop.is_set() and not self.game_over:
+            changed = False
+            while True:
+                try:
+                    event = self.input_queue.get_nowait()
+                except queue.Empty:
+                    break
+                self.handle_event(event)
+                changed = True
+
+            now = self.clock()
+            if self.advance_simulation(now - last_tick) or changed:
+                self.snapshots.publish(self.capture_snapshot())
+            else:
+                time.sleep(0.001)
+            last_tick = now
+        self.snapshots.publish(self.capture_snapshot())
+
+    def start_simulation_thread(self):
+        self.sim_stop.clear()
+        self.snapshots.publish(self.capture_snapshot())
+        self.sim_thread = threading.Thread(target=self.run_simulation, name="simulation", daemon=True)
+        self.sim_thread.start()
+
+    def stop_simulation_thread(self):
+        if self.sim_thread is not None:
+            self.sim_stop.set()
+            self.sim_thread.join()
+            self.sim_thread = None
         
     def main_loop(self):
+        if self.threaded:
+            return self.threaded_main_loop()
+
         self.start_game()
+        last_frame = self.clock()
         
         while not self.game_over:
+            self.governor.begin_frame()
             self.process_input()
-            self.update_game_state()
-            self.render()
-            pygame.time.Clock().tick(60)
+            now = self.clock()
+            self.advance_simulation(now - last_frame)
+            last_frame = now
+            rendered = self.governor.should_render()
+            if rendered:
+                self.render()
+            self.governor.end_frame(rendered)
+            self.perf.record_frame(self.governor.last_frame_ms, self.wave_manager.current_wave,
+                                   len(self.active_enemies), len(self.projectiles))
             
         self.ui_manager.show_game_over()
-        self.end_game()
\ No newline at end of file
+        self.end_game()
+
+    def threaded_main_loop(self):
+        # The simulation ticks on its own thread; this loop only handles input and draws the latest snapshot
+        self.start_game()
+        self.start_simulation_thread()
+
+        while self.sim_thread.is_alive():
+            self.governor.begin_frame()
+            self.process_input()
+            snapshot = self.snapshots.latest()
+            rendered = self.governor.should_render()
+            if rendered:
+                self.render(snapshot)
+            self.governor.end_frame(rendered)
+            self.perf.record_frame(self.governor.last_frame_ms, snapshot.ui.wave,
+                                   len(snapshot.enemies), len(snapshot.projectiles))
+
+        self.stop_simulation_thread()
+        self.ui_manager.show_game_over()
+        self.end_game()
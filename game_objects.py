@@ -1,6 +1,6 @@
 import pygame
 import math
-from config import SCREEN_WIDTH, SCREEN_HEIGHT, PLANET_RADIUS, RESOURCE_START, BLUE, CYAN
+from config import WORLD_WIDTH, WORLD_HEIGHT, PLANET_RADIUS, RESOURCE_START, BLUE, CYAN
 
 class GameObject:
     def __init__(self, position):
@@ -9,7 +9,7 @@ class GameObject:
     def update(self):
         pass
         
-    def render(self, surface):
+    def render(self, surface, camera):
         pass
 
 class Planet(GameObject):
@@ -19,8 +19,6 @@ class Planet(GameObject):
         self.resources = RESOURCE_START
         self.shield_level = 0
         self.radius = PLANET_RADIUS
-        self.image = pygame.Surface((self.radius * 2, self.radius * 2), pygame.SRCALPHA)
-        pygame.draw.circle(self.image, BLUE, (self.radius, self.radius), self.radius)
         
     def take_damage(self, amount):
         damage_reduced = amount * (1 - (self.shield_level * 0.1))
@@ -39,32 +37,42 @@ class Planet(GameObject):
         
     def check_game_over(self):
         return self.health <= 0
+
+    def snapshot(self):
+        return (self.position[0], self.position[1], self.radius, self.shield_level)
         
-    def render(self, surface):
-        surface.blit(self.image, (self.position[0] - self.radius, self.position[1] - self.radius))
+    def render(self, surface, camera, detail=True):
+        center = camera.to_view(self.position)
+        pygame.draw.circle(surface, BLUE, center, camera.length(self.radius))
         
-        if self.shield_level > 0:
-            shield_radius = self.radius + 10
+        if self.shield_level > 0 and not detail:
+            pygame.draw.circle(surface, CYAN, center, camera.length(self.radius + 10), 2)
+        elif self.shield_level > 0:
+            shield_radius = camera.length(self.radius + 10)
             shield_surface = pygame.Surface((shield_radius * 2, shield_radius * 2), pygame.SRCALPHA)
             shield_color = (*CYAN[:3], 50 + self.shield_level * 25)
             pygame.draw.circle(shield_surface, shield_color, (shield_radius, shield_radius), shield_radius)
-            surface.blit(shield_surface, (self.position[0] - shield_radius, self.position[1] - shield_radius))
+            surface.blit(shield_surface, (center[0] - shield_radius, center[1] - shield_radius))
 
 class Defense(GameObject):
-    def __init__(self, position, orbital_radius, cost, damage, fire_rate):
+    def __init__(self, position, orbital_radius, spec):
         super().__init__(position)
+        self.spec = spec
+        self.type_name = spec.name
         self.orbital_radius = orbital_radius
-        self.cost = cost
-        self.damage = damage
-        self.fire_rate = fire_rate
+        self.cost = spec.cost
+        self.color = spec.color
         self.upgrade_level = 1
-        self.angle = math.atan2(position[1] - SCREEN_HEIGHT//2, position[0] - SCREEN_WIDTH//2)
+        self.apply_level_stats(spec.level_stats(1))
+        self.angle = math.atan2(position[1] - WORLD_HEIGHT//2, position[0] - WORLD_WIDTH//2)
         self.last_fire_time = 0
         self.size = 20
+        self.defense_id = -1
         self.shots_fired = 0
-        self.shots_hit = 0
-        self.total_damage_dealt = 0
         
+    def ready(self, current_time):
+        return current_time - self.last_fire_time >= 1000 / self.fire_rate
+
     def fire(self, current_time, enemies):
         if current_time - self.last_fire_time >= 1000 / self.fire_rate:
             target = self.detect_enemies(enemies)
@@ -78,9 +86,15 @@ class Defense(GameObject):
         pass
         
     def upgrade(self):
+        if self.upgrade_level >= self.spec.max_level:
+            return False
         self.upgrade_level += 1
-        self.damage *= 1.2
-        self.fire_rate *= 1.1
+        self.apply_level_stats(self.spec.level_stats(self.upgrade_level))
+        return True
+
+    def apply_level_stats(self, stats):
+        self.damage = stats.get('damage', 0)
+        self.fire_rate = stats.get('fire_rate', 0)
         
     def calculate_aim(self, target):
         dx = target.position[0] - self.position[0]
@@ -100,6 +114,9 @@ class Defense(GameObject):
                 min_dist = dist
                 closest = enemy
         return closest
+
+    def snapshot(self):
+        return (self.position[0], self.position[1], self.size, self.color, 0)
         
-    def render(self, surface):
-        pygame.draw.circle(surface, (255, 0, 0), (int(self.position[0]), int(self.position[1])), self.size)
\ No newline at end of file
+    def render(self, surface, camera, detail=True):
+        pygame.draw.circle(surface, self.color, camera.to_view(self.position), camera.length(self.size))
\ No newline at end of file
@@ -1,11 +1,17 @@
 import os
 import csv
-import sqlite3
-import pygame
+from array import array
 from datetime import datetime
+from config import wall_clock_ms
+from stat_buffers import ChunkedBuffer
+from stats_sinks import SQLiteStatsSink
+from timeseries import SessionTimeSeries
+from tracer import get_tracer
 
 class GameStats:
-    def __init__(self):
+    def __init__(self, clock=wall_clock_ms, sink=None):
+        self.clock = clock
+        self.sink = sink if sink is not None else SQLiteStatsSink()
         self.player_score = 0
         self.waves_completed = 0
         self.resources_collected = 0
@@ -15,56 +21,22 @@ class GameStats:
         self.total_hits = 0
         self.damage_sources = {}
         self.upgrade_choices = {}
-        self.defense_placements = []
-        self.enemy_survival_times = []
-        self.resources_over_time = []
-        self.session_start_time = pygame.time.get_ticks()
+        self.session_start_time = self.clock()
+        self.perf = None
+        self.live = None
         
-        os.makedirs('data', exist_ok=True)
-        
-        self.init_db()
-        
-    def init_db(self):
-        self.conn = sqlite3.connect('data/game_stats.db')
-        self.cursor = self.conn.cursor()
-        
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS game_sessions (
-            id INTEGER PRIMARY KEY,
-            date TEXT,
-            duration INTEGER,
-            waves_completed INTEGER,
-            score INTEGER,
-            resources_collected INTEGER,
-            enemies_defeated INTEGER,
-            accuracy REAL
-        )
-        ''')
-        
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS defense_placements (
-            session_id INTEGER,
-            defense_type TEXT,
-            orbital_radius REAL,
-            angle REAL,
-            upgrade_level INTEGER,
-            damage_dealt INTEGER,
-            FOREIGN KEY (session_id) REFERENCES game_sessions(id)
-        )
-        ''')
-        
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS enemy_data (
-            session_id INTEGER,
-            enemy_type TEXT,
-            survival_time INTEGER,
-            damage_dealt INTEGER,
-            penetration_depth REAL,
-            FOREIGN KEY (session_id) REFERENCES game_sessions(id)
-        )
-        ''')
-        
-        self.conn.commit()
+        self.defense_placements = ChunkedBuffer([('type', 'str'), ('orbital_radius', 'd'), ('angle', 'd')])
+        # Indexed by Defense.defense_id; projectiles carry that id instead of a reference to their turret
+        self.defense_levels = array('B')
+        self.defense_shots = array('I')
+        self.defense_hits = array('I')
+        self.defense_damage = array('d')
+        self.enemy_survival_times = ChunkedBuffer(
+            [('enemy_type', 'str'), ('survival_time', 'q'), ('penetration_depth', 'd'), ('damage_dealt', 'd')],
+            spill=self.sink.write_enemy_data)
+        self.resources_over_time = ChunkedBuffer([('time', 'd'), ('amount', 'd')])
+        # Sampled by the game controller and saved with the session
+        self.timeseries = SessionTimeSeries()
         
     def update_stats(self, stat_type, value=None, **kwargs):
         if stat_type == "enemy_defeated":
@@ -73,30 +45,25 @@ class GameStats:
             
             enemy = kwargs.get('enemy')
             if enemy:
-                survival_time = pygame.time.get_ticks() - enemy.spawn_time
-                self.enemy_survival_times.append({
-                    'enemy_type': enemy.__class__.__name__,
-                    'survival_time': survival_time,
-                    'penetration_depth': enemy.closest_approach
-                })
+                survival_time = round(self.clock() - enemy.spawn_time)
+                self.enemy_survival_times.append(enemy.type_name, survival_time, enemy.closest_approach, 0)
                 
         elif stat_type == "wave_completed":
             self.waves_completed += 1
             
         elif stat_type == "resources_collected":
             self.resources_collected += value
-            current_time = pygame.time.get_ticks() - self.session_start_time
-            self.resources_over_time.append((current_time, value))
+            current_time = self.clock() - self.session_start_time
+            self.resources_over_time.append(current_time, value)
             
         elif stat_type == "defense_placed":
             defense = kwargs.get('defense')
             if defense:
-                self.defense_placements.append({
-                    'type': defense.__class__.__name__,
-                    'orbital_radius': defense.orbital_radius,
-                    'angle': defense.angle,
-                    'position': defense.position
-                })
+                self.defense_placements.append(defense.type_name, defense.orbital_radius, defense.angle)
+                self.defense_levels.append(defense.upgrade_level)
+                self.defense_shots.append(0)
+                self.defense_hits.append(0)
+                self.defense_damage.append(0.0)
                 
         elif stat_type == "damage_taken":
             source = kwargs.get('source', 'Unknown')
@@ -105,72 +72,69 @@ class GameStats:
                 self.damage_sources[source] = 0
             self.damage_sources[source] += amount
             
+            enemy = kwargs.get('enemy')
+            if enemy:
+                survival_time = round(self.clock() - enemy.spawn_time)
+                self.enemy_survival_times.append(enemy.type_name, survival_time, enemy.closest_approach, amount)
+            
         elif stat_type == "shot_fired":
             self.total_shots += 1
+            owner_id = kwargs.get('owner_id', -1)
+            if owner_id >= 0:
+                self.defense_shots[owner_id] += 1
             
         elif stat_type == "shot_hit":
             self.total_hits += 1
+            projectile = kwargs.get('projectile')
+            if projectile is not None and projectile.owner_id >= 0:
+                self.defense_hits[projectile.owner_id] += 1
+                self.defense_damage[projectile.owner_id] += projectile.damage
             
         elif stat_type == "upgrade_choice":
             upgrade_type = kwargs.get('upgrade_type', 'Unknown')
             if upgrade_type not in self.upgrade_choices:
                 self.upgrade_choices[upgrade_type] = 0
             self.upgrade_choices[upgrade_type] += 1
+            defense = kwargs.get('defense')
+            if defense is not None and defense.defense_id >= 0:
+                self.defense_levels[defense.defense_id] = defense.upgrade_level
             
         if self.total_shots > 0:
             self.accuracy = self.total_hits / self.total_shots
+
+        if self.live is not None:
+            self.live.record(stat_type, value, kwargs)
             
     def save_stats(self):
-        try:
-            session_duration = pygame.time.get_ticks() - self.session_start_time
-            date_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-            resources_collected = round(self.resources_collected)
-        
-            self.cursor.execute('''
-            INSERT INTO game_sessions (date, duration, waves_completed, score, resources_collected, enemies_defeated, accuracy)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (date_str, session_duration, self.waves_completed, self.player_score, 
-                resources_collected, self.enemies_defeated, self.accuracy))
-        
-            session_id = self.cursor.lastrowid
-        
-            for placement in self.defense_placements:
-                self.cursor.execute('''
-                INSERT INTO defense_placements (session_id, defense_type, orbital_radius, angle, upgrade_level, damage_dealt)
-                VALUES (?, ?, ?, ?, ?, ?)
-                ''', (session_id, placement['type'], placement['orbital_radius'], placement['angle'], 1, 0))
-            
-            for enemy_data in self.enemy_survival_times:
-                self.cursor.execute('''
-                INSERT INTO enemy_data (session_id, enemy_type, survival_time, damage_dealt, penetration_depth)
-                VALUES (?, ?, ?, ?, ?)
-                ''', (session_id, enemy_data['enemy_type'], enemy_data['survival_time'], 0, enemy_data['penetration_depth']))
-            
-            self.conn.commit()
+        with get_tracer().span("save_stats", "db"):
+            # Most enemy rows were already spilled during play; the last partial chunk is saved with the session
+            enemy_rows = self.enemy_survival_times.take()
+            summary = {
+                'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'duration': round(self.clock() - self.session_start_time),
+                'waves_completed': self.waves_completed,
+                'score': self.player_score,
+                'resources_collected': round(self.resources_collected),
+                'enemies_defeated': self.enemies_defeated,
+                'accuracy': self.accuracy
+            }
+            self.sink.save_session(summary, self.iter_defense_records(), enemy_rows)
+            self.sink.save_timeseries(self.timeseries)
+            self.timeseries.clear()
+            self.defense_placements.clear()
+            for column in (self.defense_levels, self.defense_shots, self.defense_hits, self.defense_damage):
+                del column[:]
+            if self.perf is not None:
+                self.sink.save_perf(self.perf.session_row(), self.perf.wave_rows())
         
-            with open(f'data/game_session_{date_str.replace(":", "-").replace(" ", "_")}.csv', 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(['Metric', 'Value'])
-                writer.writerow(['Date', date_str])
-                writer.writerow(['Duration (ms)', session_duration])
-                writer.writerow(['Waves Completed', self.waves_completed])
-                writer.writerow(['Score', self.player_score])
-                writer.writerow(['Resources Collected', resources_collected])
-                writer.writerow(['Enemies Defeated', self.enemies_defeated])
-                writer.writerow(['Accuracy', self.accuracy])
-            
-        except sqlite3.Error as e:
-            print(f"Database error while saving stats: {e}")
-            try:
-                with open(f'data/emergency_backup_{datetime.now().strftime("%Y%m%d%H%M%S")}.csv', 'w', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(['Emergency backup due to database error'])
-                    writer.writerow(['Score', self.player_score])
-                    writer.writerow(['Waves', self.waves_completed])
-                    writer.writerow(['Resources', round(self.resources_collected)])
-            except Exception as ex:
-                print(f"Failed to create emergency backup: {ex}")
+    def iter_defense_records(self):
+        for record in zip(self.defense_placements, self.defense_levels, self.defense_shots,
+                          self.defense_hits, self.defense_damage):
+            yield record[0] + record[1:]
+
+    def iter_enemy_records(self):
+        yield from self.sink.iter_enemy_data()
+        yield from self.enemy_survival_times
         
     def generate_report(self):
         return {
@@ -184,6 +148,7 @@ class GameStats:
         }
         
     def export_to_csv(self, filename='game_stats_export.csv'):
+        os.makedirs('data', exist_ok=True)
         with open(f'data/{filename}', 'w', newline='') as f:
             writer = csv.writer(f)
             writer.writerow(['Game Summary Stats'])
@@ -193,12 +158,12 @@ class GameStats:
             
             writer.writerow([])
             writer.writerow(['Enemy Survival Data'])
-            writer.writerow(['Enemy Type', 'Survival Time (ms)', 'Penetration Depth'])
-            for enemy_data in self.enemy_survival_times:
-                writer.writerow([enemy_data['enemy_type'], enemy_data['survival_time'], enemy_data['penetration_depth']])
+            writer.writerow(['Enemy Type', 'Survival Time (ms)', 'Penetration Depth', 'Damage Dealt'])
+            for enemy_type, survival_time, penetration_depth, damage_dealt in self.iter_enemy_records():
+                writer.writerow([enemy_type, survival_time, penetration_depth, damage_dealt])
                 
             writer.writerow([])
             writer.writerow(['Defense Placement Data'])
-            writer.writerow(['Type', 'Orbital Radius', 'Angle'])
-            for placement in self.defense_placements:
-                writer.writerow([placement['type'], placement['orbital_radius'], placement['angle']])
\ No newline at end of file
+            writer.writerow(['Type', 'Orbital Radius', 'Angle', 'Upgrade Level', 'Shots Fired', 'Shots Hit', 'Damage Dealt'])
+            for record in self.iter_defense_records():
+                writer.writerow(list(record))
\ No newline at end of file
@@ -0,0 +1,97 @@
+class RollingWindow:
+    def __init__(self, window_ms=10000, bucket_ms=500):
+        self.window_ms = window_ms
+        self.bucket_ms = bucket_ms
+        self.buckets = [0] * (window_ms // bucket_ms)
+        self.current = 0
+        self.total = 0
+
+    def _advance(self, now):
+        bucket = int(now // self.bucket_ms)
+        # Expire at most one full lap of buckets, so a long idle gap costs the same as a short one
+        steps = min(bucket - self.current, len(self.buckets))
+        for i in range(1, steps + 1):
+            index = (self.current + i) % len(self.buckets)
+            self.total -= self.buckets[index]
+            self.buckets[index] = 0
+        self.current = max(self.current, bucket)
+
+    def add(self, now, value=1):
+        self._advance(now)
+        self.buckets[self.current % len(self.buckets)] += value
+        self.total += value
+
+    def sum(self, now):
+        self._advance(now)
+        return self.total
+
+    def rate(self, now, elapsed_ms=None):
+        self._advance(now)
+        span = self.window_ms if elapsed_ms is None else max(min(elapsed_ms, self.window_ms), self.bucket_ms)
+        return self.total * 1000 / span
+
+class RecentRatio:
+    def __init__(self, size=50):
+        self.outcomes = bytearray(size)
+        self.count = 0
+        self.next = 0
+        self.hits = 0
+
+    def add(self, hit):
+        if self.count == len(self.outcomes):
+            self.hits -= self.outcomes[self.next]
+        else:
+            self.count += 1
+        self.outcomes[self.next] = 1 if hit else 0
+        self.hits += self.outcomes[self.next]
+        self.next = (self.next + 1) % len(self.outcomes)
+
+    def ratio(self):
+        return self.hits / self.count if self.count else 0.0
+
+class LiveAnalytics:
+    def __init__(self, clock, window_ms=10000, recent_shots=50):
+        self.clock = clock
+        self.window_ms = window_ms
+        self.start_time = clock()
+        self.kills = RollingWindow(window_ms)
+        self.income = RollingWindow(window_ms)
+        self.damage_dealt = {}
+        self.damage_taken = {}
+        self.recent_shots = RecentRatio(recent_shots)
+
+    def _window(self, windows, key):
+        window = windows.get(key)
+        if window is None:
+            window = windows[key] = RollingWindow(self.window_ms)
+        return window
+
+    def record(self, stat_type, value, kwargs):
+        now = self.clock()
+        if stat_type == "enemy_defeated":
+            self.kills.add(now)
+        elif stat_type == "resources_collected":
+            self.income.add(now, value)
+        elif stat_type == "shot_hit":
+            self.recent_shots.add(True)
+            projectile = kwargs.get('projectile')
+            if projectile is not None:
+                self._window(self.damage_dealt, projectile.source_type).add(now, projectile.damage)
+        elif stat_type == "shot_missed":
+            self.recent_shots.add(False)
+        elif stat_type == "damage_taken":
+            self._window(self.damage_taken, kwargs.get('source', 'Unknown')).add(now, value)
+
+    def summary(self):
+        now = self.clock()
+        # Early in a game the window isn't full yet, so rates are taken over the time actually played
+        elapsed = now - self.start_time
+        return {
+            'kills_per_sec': self.kills.rate(now, elapsed),
+            'income_per_sec': self.income.rate(now, elapsed),
+            'dps': {name: window.rate(now, elapsed) for name, window in self.damage_dealt.items()},
+            'damage_taken': {name: window.sum(now) for name, window in self.damage_taken.items()},
+            'accuracy': self.recent_shots.ratio(),
+            'recent_shots': self.recent_shots.count,
+            'window_sec': self.window_ms / 1000,
+        }
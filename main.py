@@ -1,12 +1,69 @@
+import time
+STARTUP_BEGIN = time.perf_counter()
+
+import argparse
+from config import RENDER_SCALE, init_display
 from game_controller import GameController
 from stats_display import StatsDisplay
+from tracer import Tracer, set_tracer
+
+def report_startup(phases):
+    print("Startup profile:")
+    previous = STARTUP_BEGIN
+    for name, timestamp in phases:
+        print(f"  {name:<22} {(timestamp - previous) * 1000:8.1f} ms")
+        previous = timestamp
+    print(f"  {'total':<22} {(previous - STARTUP_BEGIN) * 1000:8.1f} ms")
 
 def main():
-    game = GameController()
+    parser = argparse.ArgumentParser(description="Orbital Defense")
+    parser.add_argument('--startup-profile', action='store_true',
+                        help="time cold start up to the first rendered frame and print a report")
+    parser.add_argument('--threaded', action='store_true',
+                        help="run the simulation on its own thread and render from state snapshots")
+    parser.add_argument('--trace', metavar='PATH',
+                        help="write a Chrome trace-event JSON file (open it in Perfetto or chrome://tracing)")
+    parser.add_argument('--metrics', metavar='ADDRESS',
+                        help="serve live metrics on host:port or unix:/path (/metrics and /metrics.json)")
+    parser.add_argument('--stream', metavar='ADDRESS',
+                        help="stream game state to spectators on host:port or unix:/path")
+    parser.add_argument('--render-scale', type=float, default=RENDER_SCALE,
+                        help="draw the battlefield at this fraction of the window resolution (e.g. 0.5)")
+    args = parser.parse_args()
+    if args.trace:
+        set_tracer(Tracer(args.trace))
+    phases = [("imports", time.perf_counter())]
+
+    init_display(resizable=True)
+    phases.append(("display + font init", time.perf_counter()))
+
+    game = GameController(threaded=args.threaded, render_scale=args.render_scale)
+    phases.append(("game setup", time.perf_counter()))
+
+    if args.metrics:
+        # Imported here so http.server stays off the startup path when metrics are off
+        from metrics_server import MetricsServer
+        try:
+            MetricsServer(args.metrics).start().add_source('game', game.metrics)
+        except OSError as e:
+            print(f"Metrics server disabled: {e}")
+
+    if args.stream:
+        from spectator_stream import StatePublisher
+        try:
+            game.stream = StatePublisher(args.stream).start()
+        except OSError as e:
+            print(f"Spectator stream disabled: {e}")
+
+    if args.startup_profile:
+        game.render()
+        phases.append(("first frame", time.perf_counter()))
+        report_startup(phases)
+
     game.main_loop()
     
     stats_display = StatsDisplay()
     stats_display.render_stats_dashboard()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
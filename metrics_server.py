@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import atexit
+import threading
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# name: (Prometheus type, help text); sources report any subset of these
+METRICS = {
+    'sim_ticks': ('counter', "Simulation ticks run"),
+    'tick_rate': ('gauge', "Simulation ticks per second since the previous scrape"),
+    'game_time_ms': ('gauge', "Simulated game time"),
+    'wave': ('gauge', "Current wave"),
+    'enemies': ('gauge', "Active enemies"),
+    'projectiles': ('gauge', "Active projectiles"),
+    'defenses': ('gauge', "Placed defenses"),
+    'shots_fired': ('counter', "Shots fired by all defenses"),
+    'shots_hit': ('counter', "Shots that hit an enemy"),
+    'resources': ('gauge', "Planet resources available to spend"),
+    'resources_collected': ('counter', "Resources delivered by collectors"),
+    'score': ('gauge', "Player score"),
+    'frame_p50_ms': ('gauge', "Median frame time this session"),
+    'frame_p95_ms': ('gauge', "95th percentile frame time this session"),
+    'frame_max_ms': ('gauge', "Slowest frame this session"),
+    'frame_cost_ms': ('gauge', "Smoothed frame cost the frame governor adapts quality to"),
+    'fps': ('gauge', "Frames per second"),
+    'quality_level': ('gauge', "Render quality level, 0 is full quality"),
+    'frames_rendered': ('counter', "Frames drawn"),
+    'frames_skipped': ('counter', "Frames skipped by the frame governor"),
+    'db_pending_rows': ('gauge', "Enemy rows buffered in memory waiting for the next database write"),
+    'sessions_running': ('gauge', "Sessions still running on the simulation host"),
+    'sessions_finished': ('gauge', "Sessions the simulation host has finished"),
+}
+
+PREFIX = 'orbital_'
+DEFAULT_ADDRESS = '127.0.0.1:9108'
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/metrics':
+            body = self.server.metrics.prometheus_text()
+            content_type = 'text/plain; version=0.0.4'
+        elif path == '/metrics.json':
+            body = json.dumps(self.server.metrics.collect())
+            content_type = 'application/json'
+        else:
+            self.send_error(404)
+            return
+        data = body.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+class MetricsServer:
+    def __init__(self, address=DEFAULT_ADDRESS):
+        self.address = address
+        self.sources = []
+        self.server = None
+        self.thread = None
+        # Only guards the tick-rate bookkeeping between concurrent scrapes; the simulation never takes it
+        self.lock = threading.Lock()
+        self.last_ticks = {}
+
+    def add_source(self, name, collect):
+        self.sources.append((name, collect))
+
+    def _bind(self):
+        if self.address.startswith('unix:'):
+            path = self.address[len('unix:'):]
+            if os.path.exists(path):
+                os.unlink(path)
+            return _UnixHTTPServer(path, _MetricsHandler)
+        host, _, port = self.address.rpartition(':')
+        server = ThreadingHTTPServer((host or '127.0.0.1', int(port)), _MetricsHandler)
+        server.daemon_threads = True
+        return server
+
+    def start(self):
+        self.server = self._bind()
+        self.server.metrics = self
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+        return self
+
+    def close(self):
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        if self.address.startswith('unix:') and os.path.exists(self.address[len('unix:'):]):
+            os.unlink(self.address[len('unix:'):])
+        self.server = None
+
+    def collect(self):
+        # Sources only read plain attributes the simulation already keeps, so a scrape never waits on the sim
+        snapshot = {}
+        now = time.perf_counter()
+        for name, collect in self.sources:
+            values = collect()
+            with self.lock:
+                previous = self.last_ticks.get(name)
+                self.last_ticks[name] = (values.get('sim_ticks', 0), now)
+            if previous is not None and now > previous[1]:
+                values['tick_rate'] = (values.get('sim_ticks', 0) - previous[0]) / (now - previous[1])
+            snapshot[name] = values
+        return snapshot
+
+    def prometheus_text(self):
+        snapshot = self.collect()
+        lines = []
+        for metric, (metric_type, help_text) in METRICS.items():
+            samples = [(source, values[metric]) for source, values in snapshot.items() if metric in values]
+            if not samples:
+                continue
+            name = PREFIX + metric + ('_total' if metric_type == 'counter' else '')
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for source, value in samples:
+                lines.append(f'{name}{{source="{source}"}} {value}')
+        return '\n'.join(lines) + '\n'
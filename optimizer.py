@@ -0,0 +1,156 @@
+import os
+import argparse
+import math
+import random
+import time
+import multiprocessing
+from config import PLANET_RADIUS, MAX_ORBITAL_RADIUS, RESOURCE_START
+from catalog import get_catalog
+from simulation_host import SimulationHost
+from stats_sinks import SQLiteStatsSink, NullStatsSink
+
+DEFENSE_COSTS = {spec.name: spec.cost for spec in get_catalog().defenses}
+MIN_RADIUS = PLANET_RADIUS + 20
+
+def layout_cost(layout):
+    return sum(DEFENSE_COSTS[defense_type] for defense_type, _, _ in layout)
+
+def repair_layout(layout, budget):
+    layout = [(t, min(MAX_ORBITAL_RADIUS, max(MIN_RADIUS, r)), a % (2 * math.pi)) for t, r, a in layout]
+    while layout and layout_cost(layout) > budget:
+        layout.pop()
+    return layout
+
+def random_gene(rng):
+    return (rng.choice(list(DEFENSE_COSTS)),
+            rng.uniform(MIN_RADIUS, MAX_ORBITAL_RADIUS),
+            rng.uniform(0, 2 * math.pi))
+
+def random_layout(rng, budget):
+    layout = []
+    cheapest = min(DEFENSE_COSTS.values())
+    while budget - layout_cost(layout) >= cheapest:
+        gene = random_gene(rng)
+        if layout_cost(layout) + DEFENSE_COSTS[gene[0]] <= budget:
+            layout.append(gene)
+    return layout
+
+def mutate(layout, rng, budget, rate=0.3):
+    layout = list(layout)
+    for i, (defense_type, radius, angle) in enumerate(layout):
+        if rng.random() < rate:
+            radius += rng.gauss(0, 25)
+            angle += rng.gauss(0, 0.3)
+        if rng.random() < rate / 3:
+            defense_type = rng.choice(list(DEFENSE_COSTS))
+        layout[i] = (defense_type, radius, angle)
+    if layout and rng.random() < rate / 2:
+        layout.pop(rng.randrange(len(layout)))
+    if rng.random() < rate / 2:
+        layout.insert(rng.randrange(len(layout) + 1), random_gene(rng))
+    return repair_layout(layout, budget)
+
+def crossover(parent_a, parent_b, rng, budget):
+    cut_a = rng.randint(0, len(parent_a))
+    cut_b = rng.randint(0, len(parent_b))
+    return repair_layout(parent_a[:cut_a] + parent_b[cut_b:], budget)
+
+def layout_fitness(game):
+    return game.stats.waves_completed * 1000 + game.stats.player_score + max(0, game.planet.health)
+
+def _init_worker():
+    # Only the pool's own processes are switched to the dummy driver, never a program importing this module
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+def evaluate_layout(task):
+    layout, seeds, max_waves, max_ticks = task
+    host = SimulationHost(max_waves, max_ticks)
+    for seed in seeds:
+        host.add_session(seed, layout, stats_sink=NullStatsSink())
+    finished = host.run()
+    fitness = sum(layout_fitness(game) for game in finished) / len(finished)
+    return fitness, host.total_ticks
+
+def tournament(scored, rng, size=3):
+    return max(rng.sample(scored, min(size, len(scored))), key=lambda item: item[0])[1]
+
+def optimize(population_size=32, generations=20, seeds=(1, 2, 3), budget=RESOURCE_START,
+             max_waves=15, max_ticks=60000, workers=None, elite=2, seed=0, log=print):
+    rng = random.Random(seed)
+    workers = workers or os.cpu_count() or 1
+    population = [random_layout(rng, budget) for _ in range(population_size)]
+    simulations = 0
+    ticks = 0
+    start = time.perf_counter()
+
+    # Fork is unsafe once SDL has been initialised in the parent, and SDL swallows the
+    # SIGTERM that Pool.terminate() sends, so workers are always closed and joined
+    pool = multiprocessing.get_context("spawn").Pool(workers, initializer=_init_worker)
+    try:
+        for generation in range(1, generations + 1):
+            tasks = [(layout, list(seeds), max_waves, max_ticks) for layout in population]
+            results = pool.map(evaluate_layout, tasks)
+            simulations += len(tasks) * len(seeds)
+            ticks += sum(t for _, t in results)
+            scored = sorted(zip((f for f, _ in results), population), key=lambda item: item[0], reverse=True)
+
+            elapsed = time.perf_counter() - start
+            log(f"Generation {generation}/{generations}: best {scored[0][0]:.0f}, "
+                f"mean {sum(f for f, _ in scored) / len(scored):.0f}, "
+                f"{simulations / elapsed / workers:.2f} sims/s/core")
+
+            if generation == generations:
+                break
+            next_population = [layout for _, layout in scored[:elite]]
+            while len(next_population) < population_size:
+                child = crossover(tournament(scored, rng), tournament(scored, rng), rng, budget)
+                next_population.append(mutate(child, rng, budget))
+            population = next_population
+    finally:
+        pool.close()
+        pool.join()
+
+    elapsed = time.perf_counter() - start
+    throughput = {
+        'simulations': simulations,
+        'seconds': elapsed,
+        'workers': workers,
+        'sims_per_second_per_core': simulations / elapsed / workers,
+        'ticks_per_second': ticks / elapsed,
+    }
+    return scored, throughput
+
+def main():
+    parser = argparse.ArgumentParser(description="Evolve defense layouts using headless simulations")
+    parser.add_argument('--population', type=int, default=32)
+    parser.add_argument('--generations', type=int, default=20)
+    parser.add_argument('--seeds', type=int, nargs='+', default=[1, 2, 3])
+    parser.add_argument('--budget', type=int, default=RESOURCE_START)
+    parser.add_argument('--max-waves', type=int, default=15)
+    parser.add_argument('--max-ticks', type=int, default=60000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--top', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if args.population < 1:
+        parser.error("--population must be at least 1")
+    if args.generations < 1:
+        parser.error("--generations must be at least 1")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    scored, throughput = optimize(args.population, args.generations, args.seeds, args.budget,
+                                  args.max_waves, args.max_ticks, args.workers, seed=args.seed)
+
+    best = scored[:args.top]
+    for fitness, layout in best:
+        print(f"{fitness:.0f}: " + ", ".join(f"{t}@r{r:.0f}/{math.degrees(a):.0f}deg" for t, r, a in layout))
+
+    SQLiteStatsSink().save_optimized_layouts(best, args.generations, args.seeds)
+
+    print(f"{throughput['simulations']} simulations in {throughput['seconds']:.1f}s on {throughput['workers']} "
+          f"workers: {throughput['sims_per_second_per_core']:.2f} sims/s/core, "
+          f"{throughput['ticks_per_second']:.0f} ticks/s")
+
+if __name__ == "__main__":
+    main()
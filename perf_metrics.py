@@ -0,0 +1,123 @@
+import gc
+import json
+import time
+from collections import deque
+
+# Upper bounds (ms) of the frame-time histogram buckets; the last bucket catches everything slower
+FRAME_BUCKETS_MS = [2, 4, 6, 8, 10, 12, 14, 16.7, 20, 25, 33.3, 50, 100, 250]
+
+def bucket_index(frame_ms):
+    for i, bound in enumerate(FRAME_BUCKETS_MS):
+        if frame_ms <= bound:
+            return i
+    return len(FRAME_BUCKETS_MS)
+
+def histogram_percentile(histogram, fraction, max_ms):
+    total = sum(histogram)
+    if total == 0:
+        return 0.0
+    target = total * fraction
+    seen = 0
+    for i, count in enumerate(histogram):
+        if count and seen + count >= target:
+            # Interpolate inside the bucket rather than reporting its upper bound
+            lower = FRAME_BUCKETS_MS[i - 1] if i > 0 else 0.0
+            upper = FRAME_BUCKETS_MS[i] if i < len(FRAME_BUCKETS_MS) else max(max_ms, lower)
+            return min(lower + (upper - lower) * (target - seen) / count, max_ms)
+        seen += count
+    return max_ms
+
+class PerfWindow:
+    def __init__(self):
+        self.histogram = [0] * (len(FRAME_BUCKETS_MS) + 1)
+        self.frames = 0
+        self.max_frame_ms = 0.0
+        self.peak_enemies = 0
+        self.peak_projectiles = 0
+        self.gc_collections = 0
+        self.gc_pause_ms = 0.0
+
+    def record_frame(self, frame_ms, enemies, projectiles):
+        self.histogram[bucket_index(frame_ms)] += 1
+        self.frames += 1
+        self.max_frame_ms = max(self.max_frame_ms, frame_ms)
+        self.peak_enemies = max(self.peak_enemies, enemies)
+        self.peak_projectiles = max(self.peak_projectiles, projectiles)
+
+    def quantiles(self):
+        # Copied first, since the metrics server reads this while the game loop keeps recording
+        histogram = list(self.histogram)
+        return {
+            'p50_ms': histogram_percentile(histogram, 0.5, self.max_frame_ms),
+            'p95_ms': histogram_percentile(histogram, 0.95, self.max_frame_ms),
+            'max_ms': self.max_frame_ms,
+        }
+
+    def row(self):
+        quantiles = self.quantiles()
+        return {
+            'frames': self.frames,
+            'histogram': json.dumps({'buckets_ms': FRAME_BUCKETS_MS, 'counts': self.histogram}),
+            'p50_ms': quantiles['p50_ms'],
+            'p95_ms': quantiles['p95_ms'],
+            'max_frame_ms': self.max_frame_ms,
+            'peak_enemies': self.peak_enemies,
+            'peak_projectiles': self.peak_projectiles,
+            'gc_collections': self.gc_collections,
+            'gc_pause_ms': self.gc_pause_ms
+        }
+
+class PerfRecorder:
+    def __init__(self):
+        self.session = PerfWindow()
+        self.waves = {}
+        self.current_wave = 0
+        self.gc_start = None
+        self.gc_attached = False
+        # GC callbacks run on whichever thread triggered the collection, so pauses are only queued there
+        # and folded into the windows by the thread that records frames
+        self.gc_pauses = deque()
+
+    def attach_gc(self):
+        if not self.gc_attached:
+            gc.callbacks.append(self._on_gc)
+            self.gc_attached = True
+
+    def detach_gc(self):
+        if self.gc_attached:
+            gc.callbacks.remove(self._on_gc)
+            self.gc_attached = False
+
+    def _on_gc(self, phase, info):
+        if phase == 'start':
+            self.gc_start = time.perf_counter()
+        elif self.gc_start is not None:
+            self.gc_pauses.append((time.perf_counter() - self.gc_start) * 1000)
+            self.gc_start = None
+
+    def _fold_gc(self):
+        while self.gc_pauses:
+            pause_ms = self.gc_pauses.popleft()
+            for window in (self.session, self.wave_window(self.current_wave)):
+                window.gc_collections += 1
+                window.gc_pause_ms += pause_ms
+
+    def wave_window(self, wave):
+        window = self.waves.get(wave)
+        if window is None:
+            window = self.waves[wave] = PerfWindow()
+        return window
+
+    def record_frame(self, frame_ms, wave, enemies, projectiles):
+        self._fold_gc()
+        self.current_wave = wave
+        self.session.record_frame(frame_ms, enemies, projectiles)
+        self.wave_window(wave).record_frame(frame_ms, enemies, projectiles)
+
+    def session_row(self):
+        self._fold_gc()
+        return self.session.row()
+
+    def wave_rows(self):
+        self._fold_gc()
+        return [dict(window.row(), wave=wave) for wave, window in sorted(self.waves.items())]
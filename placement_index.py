@@ -0,0 +1,95 @@
+import math
+from bisect import bisect_left, bisect_right
+
+TWO_PI = 2 * math.pi
+EMPTY_BAND = ((), ())
+
+class PlacementIndex:
+    # Defenses bucketed into rings of band_width pixels, each ring sorted by angle around the planet. A query
+    # only looks at the rings its reach overlaps and, within each, bisects out the arc that can be close enough,
+    # so overlap checks and hover hit-tests stay logarithmic however many defenses are placed.
+    def __init__(self, center, band_width=40):
+        self.center = center
+        self.band_width = band_width
+        self.bands = {}
+        self.max_size = 0
+        self.count = 0
+
+    def polar(self, pos):
+        dx = pos[0] - self.center[0]
+        dy = pos[1] - self.center[1]
+        return math.sqrt(dx*dx + dy*dy), math.atan2(dy, dx) % TWO_PI
+
+    def add(self, defense):
+        radius, angle = self.polar(defense.position)
+        band = int(radius // self.band_width)
+        angles, defenses = self.bands.get(band, EMPTY_BAND)
+        i = bisect_right(angles, angle)
+        # Bands are replaced rather than edited, so the render thread can query while the simulation places
+        self.bands[band] = (angles[:i] + (angle,) + angles[i:], defenses[:i] + (defense,) + defenses[i:])
+        self.max_size = max(self.max_size, defense.size)
+        self.count += 1
+
+    def candidates(self, pos, reach):
+        radius, angle = self.polar(pos)
+        first = max(0, int((radius - reach) // self.band_width))
+        last = int((radius + reach) // self.band_width)
+        for band in range(first, last + 1):
+            angles, defenses = self.bands.get(band, EMPTY_BAND)
+            if not angles:
+                continue
+            # Anything more than asin(reach / r) round from the query angle is at least reach away
+            inner = max(band * self.band_width, radius - reach)
+            if inner <= reach:
+                yield from defenses
+                continue
+            window = math.asin(reach / inner)
+            low, high = angle - window, angle + window
+            if low < 0:
+                spans = ((0, high), (low + TWO_PI, TWO_PI))
+            elif high > TWO_PI:
+                spans = ((low, TWO_PI), (0, high - TWO_PI))
+            else:
+                spans = ((low, high),)
+            for start, end in spans:
+                yield from defenses[bisect_left(angles, start):bisect_right(angles, end)]
+
+    def nearest(self, pos, max_distance=None):
+        if max_distance is None:
+            # Widen the search until something turns up; nothing can be further than the outermost band
+            if not self.bands:
+                return None
+            limit = self.polar(pos)[0] + (max(self.bands) + 1) * self.band_width
+            reach = self.band_width
+            while reach < limit:
+                found = self.nearest(pos, reach)
+                if found is not None:
+                    return found
+                reach *= 2
+            return self.nearest(pos, limit)
+
+        best = None
+        best_distance = max_distance
+        for defense in self.candidates(pos, max_distance):
+            distance = math.hypot(defense.position[0] - pos[0], defense.position[1] - pos[1])
+            if distance <= best_distance:
+                best, best_distance = defense, distance
+        return None if best is None else (best, best_distance)
+
+    def overlaps(self, pos, size):
+        for defense in self.candidates(pos, size + self.max_size):
+            if math.hypot(defense.position[0] - pos[0], defense.position[1] - pos[1]) < size + defense.size:
+                return defense
+        return None
+
+    def defense_at(self, pos):
+        hit = None
+        hit_distance = None
+        for defense in self.candidates(pos, self.max_size):
+            distance = math.hypot(defense.position[0] - pos[0], defense.position[1] - pos[1])
+            if distance <= defense.size and (hit is None or distance < hit_distance):
+                hit, hit_distance = defense, distance
+        return hit
+
+    def __len__(self):
+        return self.count
@@ -1,10 +1,12 @@
 import math
 import pygame
-from config import SCREEN_WIDTH, SCREEN_HEIGHT, RED
+from config import WORLD_WIDTH, WORLD_HEIGHT, RED
 
 class Projectile:
-    def __init__(self, position, angle, damage, speed=5, color=RED):
+    def __init__(self, position, angle, damage, speed=5, color=RED, source_type=None, owner_id=-1):
         self.position = list(position)
+        self.source_type = source_type
+        self.owner_id = owner_id
         self.angle = angle
         self.damage = damage
         self.speed = speed
@@ -16,8 +18,8 @@ class Projectile:
         self.position[0] += math.cos(self.angle) * self.speed
         self.position[1] += math.sin(self.angle) * self.speed
         
-        if (self.position[0] < 0 or self.position[0] > SCREEN_WIDTH or 
-            self.position[1] < 0 or self.position[1] > SCREEN_HEIGHT):
+        if (self.position[0] < 0 or self.position[0] > WORLD_WIDTH or 
+            self.position[1] < 0 or self.position[1] > WORLD_HEIGHT):
             self.destroyed = True
             
     def check_collision(self, enemies):
@@ -31,6 +33,9 @@ class Projectile:
                 self.destroyed = True
                 return enemy
         return None
+
+    def snapshot(self):
+        return (self.position[0], self.position[1], self.radius, self.color)
         
-    def render(self, surface):
-        pygame.draw.circle(surface, self.color, (int(self.position[0]), int(self.position[1])), self.radius)
\ No newline at end of file
+    def render(self, surface, camera):
+        pygame.draw.circle(surface, self.color, camera.to_view(self.position), camera.length(self.radius))
\ No newline at end of file
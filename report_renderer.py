@@ -0,0 +1,119 @@
+import os
+import argparse
+import hashlib
+import sqlite3
+import time
+import multiprocessing
+import pygame
+from config import SCREEN_WIDTH, SCREEN_HEIGHT, STATS_DB_PATH
+from stats_display import StatsDisplay, PAGE_TITLES, BROWSER_PAGE
+
+# Bump when page layout changes so existing reports are re-rendered
+REPORT_VERSION = 3
+HASH_FILE = 'report.sha256'
+
+_display = None
+
+def _init_worker(db_path):
+    global _display
+    # Only the pool's own processes are switched to the dummy driver, never a program importing this module
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    _display = StatsDisplay(db_path, headless=True)
+
+def report_hash(display):
+    digest = hashlib.sha256(f"v{REPORT_VERSION}".encode())
+    for rows in (display.sessions, display.placements, display.enemy_data, display.wave_perf,
+                 sorted(display.timeseries.items())):
+        digest.update(repr(rows).encode())
+    return digest.hexdigest()
+
+def page_filename(page):
+    return f"{page + 1}_{PAGE_TITLES[page].lower().replace(' ', '_')}.png"
+
+def render_session(task):
+    session_id, out_dir, force = task
+    _display.load_data(session_id)
+    if not _display.sessions or _display.sessions[0][0] != session_id:
+        return session_id, 'missing'
+
+    session_dir = os.path.join(out_dir, f"session_{session_id}")
+    hash_path = os.path.join(session_dir, HASH_FILE)
+    content_hash = report_hash(_display)
+    if not force and os.path.exists(hash_path):
+        with open(hash_path) as f:
+            if f.read().strip() == content_hash:
+                return session_id, 'skipped'
+
+    os.makedirs(session_dir, exist_ok=True)
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    footer = f"Session {session_id} - {_display.sessions[0][1]}"
+    # The browser is interactive and not part of a session's report
+    for page in range(BROWSER_PAGE):
+        _display.render_page(surface, page, footer)
+        pygame.image.save(surface, os.path.join(session_dir, page_filename(page)))
+
+    # Written last, so an interrupted render is redone next time
+    with open(hash_path, 'w') as f:
+        f.write(content_hash + '\n')
+    return session_id, 'rendered'
+
+def select_sessions(db_path, session_ids=None, since=None, until=None):
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        query = "SELECT id FROM game_sessions WHERE 1 = 1"
+        # Databases the game hasn't written since the complete flag was added hold only finished sessions
+        if 'complete' in {row[1] for row in conn.execute("PRAGMA table_info(game_sessions)")}:
+            query += " AND complete = 1"
+        params = []
+        if session_ids:
+            query += f" AND id IN ({', '.join('?' * len(session_ids))})"
+            params += session_ids
+        if since:
+            query += " AND date >= ?"
+            params.append(since)
+        if until:
+            query += " AND date <= ?"
+            # A bare date means the whole of that day
+            params.append(until + ' 23:59:59' if len(until) == 10 else until)
+        return [row[0] for row in conn.execute(query + " ORDER BY id", params)]
+    finally:
+        conn.close()
+
+def render_reports(session_ids, db_path=STATS_DB_PATH, out_dir='data/reports', workers=None, force=False, log=print):
+    workers = workers or os.cpu_count() or 1
+    counts = {'rendered': 0, 'skipped': 0, 'missing': 0}
+    start = time.perf_counter()
+
+    # Same pool discipline as the optimizer: spawn, then close and join instead of terminate
+    pool = multiprocessing.get_context("spawn").Pool(workers, initializer=_init_worker, initargs=(db_path,))
+    try:
+        tasks = [(session_id, out_dir, force) for session_id in session_ids]
+        for session_id, status in pool.imap_unordered(render_session, tasks, chunksize=8):
+            counts[status] += 1
+            if status == 'missing':
+                log(f"Session {session_id} not found")
+    finally:
+        pool.close()
+        pool.join()
+
+    counts['seconds'] = time.perf_counter() - start
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the stats dashboard pages of past sessions to PNG files")
+    parser.add_argument('--db', default=STATS_DB_PATH)
+    parser.add_argument('--out', default='data/reports')
+    parser.add_argument('--session', type=int, nargs='+', help="session ids to render (default: all)")
+    parser.add_argument('--since', help="only sessions on or after this date, e.g. 2025-04-01")
+    parser.add_argument('--until', help="only sessions on or before this date, e.g. 2025-04-30")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help="re-render even when the report is up to date")
+    args = parser.parse_args()
+
+    session_ids = select_sessions(args.db, args.session, args.since, args.until)
+    counts = render_reports(session_ids, args.db, args.out, args.workers, args.force)
+    print(f"{len(session_ids)} sessions in {counts['seconds']:.1f}s: {counts['rendered']} rendered, "
+          f"{counts['skipped']} up to date, {counts['missing']} missing -> {args.out}")
+
+if __name__ == "__main__":
+    main()
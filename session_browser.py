@@ -0,0 +1,134 @@
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+
+PAGE_SIZE = 20
+
+SESSION_COLUMNS = "id, date, duration, waves_completed, score, enemies_defeated, accuracy"
+
+class LRUCache:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.items = OrderedDict()
+
+    def get(self, key):
+        value = self.items.get(key)
+        if value is not None:
+            self.items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        if len(self.items) > self.capacity:
+            self.items.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self.items
+
+class SessionPager:
+    # Pages through game_sessions newest first. Each page starts after the (date, id) of the previous page's
+    # last row, so a page costs the same index seek whether it's the first or the ten-thousandth.
+    def __init__(self, db_path, page_size=PAGE_SIZE):
+        self.db_path = db_path
+        self.page_size = page_size
+        self.conn = sqlite3.connect(db_path)
+        # Databases the game hasn't written since the complete flag was added hold only finished sessions
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(game_sessions)")}
+        self.complete = "complete = 1" if 'complete' in columns else "1 = 1"
+        self.lock = threading.Lock()
+        self.pages = LRUCache(32)
+        self.requests = queue.Queue()
+        self.prefetch_thread = threading.Thread(target=self._prefetch_worker, name="session-prefetch", daemon=True)
+        self.prefetch_thread.start()
+        self.history = []
+        self.anchor = None
+        self.rows = self.fetch(None)
+        self._prefetch_next()
+
+    def _query(self, conn, anchor):
+        if anchor is None:
+            return conn.execute(f'''
+            SELECT {SESSION_COLUMNS} FROM game_sessions WHERE {self.complete} ORDER BY date DESC, id DESC LIMIT ?
+            ''', (self.page_size,)).fetchall()
+        return conn.execute(f'''
+        SELECT {SESSION_COLUMNS} FROM game_sessions
+        WHERE (date, id) < (?, ?) AND {self.complete}
+        ORDER BY date DESC, id DESC LIMIT ?
+        ''', (*anchor, self.page_size)).fetchall()
+
+    def fetch(self, anchor):
+        with self.lock:
+            rows = self.pages.get(anchor)
+        if rows is None:
+            rows = self._query(self.conn, anchor)
+            with self.lock:
+                self.pages.put(anchor, rows)
+        return rows
+
+    def _prefetch_worker(self):
+        # sqlite3 connections stay on the thread that made them, so the worker has its own
+        conn = sqlite3.connect(self.db_path)
+        try:
+            while True:
+                anchor = self.requests.get()
+                if anchor is None:
+                    break
+                with self.lock:
+                    cached = anchor in self.pages
+                if not cached:
+                    rows = self._query(conn, anchor)
+                    with self.lock:
+                        self.pages.put(anchor, rows)
+        finally:
+            conn.close()
+
+    def next_anchor(self):
+        if len(self.rows) < self.page_size:
+            return None
+        last = self.rows[-1]
+        return (last[1], last[0])
+
+    def _prefetch_next(self):
+        anchor = self.next_anchor()
+        if anchor is not None:
+            self.requests.put(anchor)
+
+    def next_page(self):
+        anchor = self.next_anchor()
+        if anchor is None:
+            return False
+        rows = self.fetch(anchor)
+        if not rows:
+            return False
+        self.history.append(self.anchor)
+        self.anchor = anchor
+        self.rows = rows
+        self._prefetch_next()
+        return True
+
+    def previous_page(self):
+        if not self.history:
+            return False
+        self.anchor = self.history.pop()
+        self.rows = self.fetch(self.anchor)
+        return True
+
+    def first_page(self):
+        # Re-queried rather than served from the cache, so sessions saved since opening show up
+        self.history = []
+        self.anchor = None
+        self.rows = self._query(self.conn, None)
+        with self.lock:
+            self.pages.put(None, self.rows)
+        self._prefetch_next()
+
+    @property
+    def page_number(self):
+        return len(self.history) + 1
+
+    def close(self):
+        self.requests.put(None)
+        self.prefetch_thread.join()
+        self.conn.close()
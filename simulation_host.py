@@ -0,0 +1,132 @@
+import argparse
+import math
+import time
+from game_controller import GameController
+from stats_sinks import MemoryStatsSink
+from metrics_server import MetricsServer
+from spectator_stream import StatePublisher
+
+class SimulationHost:
+    def __init__(self, max_waves=None, max_ticks=60000, auto_start_waves=True):
+        # A session that never loses would otherwise keep run() going forever
+        if max_waves is None and max_ticks is None:
+            raise ValueError("SimulationHost needs max_waves or max_ticks")
+        self.max_waves = max_waves
+        self.max_ticks = max_ticks
+        self.auto_start_waves = auto_start_waves
+        self.sessions = []
+        self.finished = []
+        self.total_ticks = 0
+
+    def add_session(self, seed=None, layout=(), stats_sink=None):
+        game = GameController(seed=seed, headless=True, stats_sink=stats_sink or MemoryStatsSink())
+        game.start_game()
+        for defense_type, radius, angle in layout:
+            game.place_defense_at(game.catalog.defense(defense_type), radius, angle)
+        self.sessions.append(game)
+        return game
+
+    def waves_exhausted(self, game):
+        return (self.max_waves is not None and not game.wave_in_progress
+                and game.stats.waves_completed >= self.max_waves)
+
+    def is_finished(self, game):
+        return (game.game_over or self.waves_exhausted(game)
+                or (self.max_ticks is not None and game.sim_tick >= self.max_ticks))
+
+    def step_session(self, game, ticks):
+        for _ in range(ticks):
+            if self.is_finished(game):
+                break
+            if self.auto_start_waves and not game.wave_in_progress:
+                game.start_next_wave()
+            game.update_game_state()
+            self.total_ticks += 1
+
+    def _retire_finished(self):
+        still_running = []
+        for game in self.sessions:
+            if self.is_finished(game):
+                game.end_game()
+                self.finished.append(game)
+            else:
+                still_running.append(game)
+        self.sessions = still_running
+
+    def step_round_robin(self, ticks=1):
+        # Every session advances one tick per turn, so all games stay in lockstep
+        for _ in range(ticks):
+            for game in self.sessions:
+                self.step_session(game, 1)
+        self._retire_finished()
+
+    def step_batch(self, batch_ticks=60):
+        # Each session runs a batch of ticks back to back, which keeps its state hot between ticks
+        for game in self.sessions:
+            self.step_session(game, batch_ticks)
+        self._retire_finished()
+
+    def metrics(self):
+        # Called from the metrics server's thread; _retire_finished swaps in a new list rather than mutating
+        # the one being read here
+        running = self.sessions
+        games = running + self.finished
+        return {
+            'sim_ticks': self.total_ticks,
+            'sessions_running': len(running),
+            'sessions_finished': len(self.finished),
+            'wave': max((game.wave_manager.current_wave for game in running), default=0),
+            'enemies': sum(len(game.active_enemies) for game in running),
+            'projectiles': sum(len(game.projectiles) for game in running),
+            'shots_fired': sum(game.stats.total_shots for game in games),
+            'shots_hit': sum(game.stats.total_hits for game in games),
+            'resources_collected': sum(game.stats.resources_collected for game in games),
+            'db_pending_rows': sum(game.stats.enemy_survival_times.pending_rows() for game in running),
+        }
+
+    def run(self, mode='batch', batch_ticks=60):
+        while self.sessions:
+            if mode == 'round_robin':
+                self.step_round_robin(batch_ticks)
+            else:
+                self.step_batch(batch_ticks)
+        return self.finished
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many independent headless games in one process")
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--max-waves', type=int, default=5)
+    parser.add_argument('--max-ticks', type=int, default=60000)
+    parser.add_argument('--mode', choices=['batch', 'round_robin'], default='batch')
+    parser.add_argument('--batch-ticks', type=int, default=60)
+    parser.add_argument('--turrets', type=int, default=3, help="laser turrets placed evenly around each planet")
+    parser.add_argument('--metrics', metavar='ADDRESS',
+                        help="serve live metrics on host:port or unix:/path (/metrics and /metrics.json)")
+    parser.add_argument('--stream', metavar='ADDRESS',
+                        help="stream the first session to spectators on host:port or unix:/path")
+    args = parser.parse_args()
+    if args.sessions < 1:
+        parser.error("--sessions must be at least 1")
+    if args.batch_ticks < 1:
+        parser.error("--batch-ticks must be at least 1")
+
+    host = SimulationHost(args.max_waves, args.max_ticks)
+    if args.metrics:
+        MetricsServer(args.metrics).start().add_source('host', host.metrics)
+    layout = [('LaserTurret', 150, 2 * math.pi * i / args.turrets) for i in range(args.turrets)]
+    for seed in range(args.sessions):
+        host.add_session(seed, layout)
+    if args.stream:
+        host.sessions[0].stream = StatePublisher(args.stream).start()
+
+    start = time.perf_counter()
+    finished = host.run(args.mode, args.batch_ticks)
+    elapsed = time.perf_counter() - start
+
+    waves = sum(game.stats.waves_completed for game in finished)
+    print(f"{len(finished)} sessions ({args.mode}) in {elapsed:.2f}s: "
+          f"{host.total_ticks / elapsed:.0f} ticks/s, {len(finished) / elapsed:.1f} sessions/s, "
+          f"{waves / len(finished):.1f} waves per session")
+
+if __name__ == "__main__":
+    main()
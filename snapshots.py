@@ -0,0 +1,76 @@
+import threading
+from collections import namedtuple
+import pygame
+from config import BLUE, CYAN, YELLOW
+from camera import Camera
+
+UIState = namedtuple('UIState', [
+    'health', 'resources', 'wave', 'enemies_in_wave', 'enemy_count', 'score', 'waves_completed',
+    'time_scale', 'achieved_speed', 'wave_in_progress', 'placement_mode', 'selected_defense_type', 'game_over',
+    'analytics'])
+
+# Entities are stored as plain tuples so a snapshot can be handed to another thread (or a recorder) as is:
+#   planet      (x, y, radius, shield_level)
+#   defenses    (x, y, size, color, fill)       fill is the collector storage fraction, 0 for turrets
+#   enemies     (x, y, radius, color)
+#   projectiles (x, y, radius, color)
+WorldSnapshot = namedtuple('WorldSnapshot', ['tick', 'game_time', 'planet', 'defenses', 'enemies', 'projectiles', 'ui'])
+
+class SnapshotBuffer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.slots = [None, None]
+        self.front = 0
+        self.published = 0
+
+    def publish(self, snapshot):
+        # The writer fills the back slot and then flips; readers only ever see the front slot
+        back = 1 - self.front
+        self.slots[back] = snapshot
+        with self.lock:
+            self.front = back
+            self.published += 1
+
+    def latest(self):
+        with self.lock:
+            return self.slots[self.front]
+
+def draw_planet(surface, planet, detail=True, camera=None):
+    camera = camera or Camera.for_surface(surface)
+    x, y, radius, shield_level = planet
+    center = camera.to_view((x, y))
+    pygame.draw.circle(surface, BLUE, center, camera.length(radius))
+    if shield_level > 0 and not detail:
+        pygame.draw.circle(surface, CYAN, center, camera.length(radius + 10), 2)
+    elif shield_level > 0:
+        shield_radius = camera.length(radius + 10)
+        shield_surface = pygame.Surface((shield_radius * 2, shield_radius * 2), pygame.SRCALPHA)
+        shield_color = (*CYAN[:3], 50 + shield_level * 25)
+        pygame.draw.circle(shield_surface, shield_color, (shield_radius, shield_radius), shield_radius)
+        surface.blit(shield_surface, (center[0] - shield_radius, center[1] - shield_radius))
+
+def _draw_circles(surface, entities, camera):
+    # Anything whose circle lies wholly outside the camera's view is skipped before any draw call
+    scale, offset_x, offset_y = camera.scale, camera.offset_x, camera.offset_y
+    left, right, top, bottom = camera.left, camera.right, camera.top, camera.bottom
+    for x, y, radius, color in entities:
+        if left - radius <= x <= right + radius and top - radius <= y <= bottom + radius:
+            pygame.draw.circle(surface, color, (int(x * scale + offset_x), int(y * scale + offset_y)),
+                               max(1, int(radius * scale)))
+
+def draw_world(surface, snapshot, detail=True, camera=None):
+    camera = camera or Camera.for_surface(surface)
+    if camera.visible(snapshot.planet[:2], snapshot.planet[2] + 10):
+        draw_planet(surface, snapshot.planet, detail, camera)
+
+    for x, y, size, color, fill in snapshot.defenses:
+        if not camera.visible((x, y), size):
+            continue
+        center = camera.to_view((x, y))
+        pygame.draw.circle(surface, color, center, camera.length(size))
+        fill_radius = int(size * fill * camera.scale) if detail else 0
+        if fill_radius > 0:
+            pygame.draw.circle(surface, YELLOW, center, fill_radius)
+
+    _draw_circles(surface, snapshot.enemies, camera)
+    _draw_circles(surface, snapshot.projectiles, camera)
@@ -0,0 +1,399 @@
+import os
+import gc
+import sys
+import json
+import math
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from game_controller import GameController
+from stats_sinks import SQLiteStatsSink
+from game_objects import Defense
+from enemies import Enemy
+from projectiles import Projectile
+from config import PLANET_RADIUS, MAX_ORBITAL_RADIUS
+
+# Exit codes for nightly jobs; 2 is left to argparse for bad arguments
+EXIT_OK = 0
+EXIT_GROWTH = 1
+EXIT_CRASH = 3
+
+# name: (description, checked for growth). The database grows with every saved game by design, so only its
+# size per saved game is checked.
+METRICS = {
+    'rss_mb': ("resident set size", True),
+    'traced_mb': ("Python allocations (tracemalloc)", True),
+    'enemies': ("live Enemy objects", True),
+    'projectiles': ("live Projectile objects", True),
+    'defenses': ("live Defense objects", True),
+    'gc_objects': ("objects tracked by the garbage collector", True),
+    'gc_uncollectable': ("objects in gc.garbage", True),
+    'gc_pause_ms': ("time spent in garbage collection this interval", True),
+    'tick_p50_us': ("median tick time", True),
+    'tick_p95_us': ("95th percentile tick time", True),
+    'tick_us_per_entity': ("tick time per live entity", True),
+    'db_mb': ("stats database and WAL size", False),
+    'db_kb_per_game': ("stats database size per saved game", True),
+}
+
+MIN_SAMPLES = 8
+TREND_Z = 2.33
+
+def parse_duration(text):
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    if text and text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+def rss_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Peak rather than current outside Linux, which still shows growth
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def mann_kendall_z(values):
+    # Mann-Kendall trend test: large positive z means the series keeps going up, whatever its shape
+    n = len(values)
+    s = 0
+    for i in range(n - 1):
+        vi = values[i]
+        for j in range(i + 1, n):
+            s += (values[j] > vi) - (values[j] < vi)
+    ties = {}
+    for value in values:
+        ties[value] = ties.get(value, 0) + 1
+    variance = (n * (n - 1) * (2 * n + 5) - sum(t * (t - 1) * (2 * t + 5) for t in ties.values())) / 18
+    if variance <= 0 or s == 0:
+        return 0.0
+    return (s - 1 if s > 0 else s + 1) / math.sqrt(variance)
+
+def theil_sen_slope(times, values):
+    slopes = sorted((values[j] - values[i]) / (times[j] - times[i])
+                    for i in range(len(values) - 1) for j in range(i + 1, len(values)) if times[j] > times[i])
+    return slopes[len(slopes) // 2] if slopes else 0.0
+
+def analyze(samples, max_growth):
+    results = {}
+    for metric, (description, checked) in METRICS.items():
+        points = [(sample['elapsed_s'], sample[metric]) for sample in samples if sample.get(metric) is not None]
+        result = {'description': description, 'samples': len(points), 'flagged': False}
+        if points:
+            values = [value for _, value in points]
+            result.update(first=values[0], last=values[-1], min=min(values), max=max(values))
+        if len(points) >= MIN_SAMPLES:
+            times = [elapsed for elapsed, _ in points]
+            slope = theil_sen_slope(times, values)
+            median = sorted(values)[len(values) // 2]
+            # Growth over the measured span, relative to the typical level (at least 1 unit, so a count going
+            # from 0 to a handful still registers)
+            growth = slope * (times[-1] - times[0]) / max(abs(median), 1.0)
+            z = mann_kendall_z(values)
+            result.update(slope_per_hour=slope * 3600, trend_z=z, growth=growth,
+                          flagged=checked and z >= TREND_Z and growth >= max_growth)
+        results[metric] = result
+    return results
+
+class AutoPlayer:
+    # Between waves, spends what the planet has on the next free slots of a ring layout (two turrets for every
+    # collector), then starts the next wave after a short pause
+    def __init__(self, rng, pause_ticks=60):
+        self.pause_ticks = pause_ticks
+        self.wait = 0
+        self.slots = []
+        for radius in range(PLANET_RADIUS + 40, MAX_ORBITAL_RADIUS + 1, 45):
+            count = max(1, int(2 * math.pi * radius / 50))
+            self.slots += [(radius, 2 * math.pi * i / count) for i in range(count)]
+        rng.shuffle(self.slots)
+        self.placed = 0
+
+    def choose(self, game):
+        defenses = game.catalog.defenses
+        turrets = [spec for spec in defenses if spec.kind != 'collector'] or defenses
+        collectors = [spec for spec in defenses if spec.kind == 'collector'] or defenses
+        if self.placed % 3 == 2:
+            return collectors[self.placed // 3 % len(collectors)]
+        return turrets[self.placed % len(turrets)]
+
+    def place(self, game):
+        while self.slots:
+            spec = self.choose(game)
+            if game.planet.resources < spec.cost:
+                return
+            radius, angle = self.slots.pop()
+            if game.place_defense_at(spec, radius, angle) is not None:
+                self.placed += 1
+
+    def step(self, game):
+        if game.wave_in_progress:
+            return
+        if self.wait > 0:
+            self.wait -= 1
+            return
+        self.place(game)
+        game.start_next_wave()
+        self.wait = self.pause_ticks
+
+class SoakTest:
+    def __init__(self, work_dir, duration_s, interval_s=60, warmup_s=120, waves_per_game=10, frame_ticks=60,
+                 seed=0, track_allocations=True, max_growth=0.1, log=print):
+        self.work_dir = work_dir
+        self.db_path = os.path.join(work_dir, 'soak_stats.db')
+        self.duration_s = duration_s
+        self.interval_s = interval_s
+        self.warmup_s = warmup_s
+        self.waves_per_game = waves_per_game
+        self.frame_ticks = frame_ticks
+        self.rng = random.Random(seed)
+        self.track_allocations = track_allocations
+        self.max_growth = max_growth
+        self.log = log
+        self.samples = []
+        self.games_finished = 0
+        self.total_ticks = 0
+        self.batch_us = []
+        self.entity_ticks = 0
+        self.tick_time_us = 0.0
+        self.gc_pause_ms = 0.0
+        self.gc_start = None
+        self.baseline = None
+        self.game = None
+        self.sink = None
+        self.player = None
+
+    def _on_gc(self, phase, info):
+        if phase == 'start':
+            self.gc_start = time.perf_counter()
+        elif self.gc_start is not None:
+            self.gc_pause_ms += (time.perf_counter() - self.gc_start) * 1000
+            self.gc_start = None
+
+    def new_game(self):
+        self.sink = SQLiteStatsSink(self.db_path, csv_dir=os.path.join(self.work_dir, 'csv'))
+        self.game = GameController(seed=self.rng.randrange(1 << 30), headless=True, stats_sink=self.sink)
+        self.game.start_game()
+        self.player = AutoPlayer(self.rng)
+
+    def finish_game(self):
+        self.game.end_game()
+        self.sink.close()
+        self.games_finished += 1
+        self.game = self.sink = self.player = None
+
+    def game_done(self, game):
+        return game.game_over or (not game.wave_in_progress and game.stats.waves_completed >= self.waves_per_game)
+
+    def run_batch(self):
+        # One "frame" is frame_ticks ticks; timing whole frames keeps the clock calls off the per-tick path
+        game = self.game
+        entities = len(game.active_enemies) + len(game.projectiles) + len(game.defenses)
+        start = time.perf_counter()
+        ticks = 0
+        for _ in range(self.frame_ticks):
+            self.player.step(game)
+            game.update_game_state()
+            ticks += 1
+            if self.game_done(game):
+                break
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        self.batch_us.append(elapsed_us / ticks)
+        self.tick_time_us += elapsed_us
+        self.entity_ticks += max(1, entities) * ticks
+        self.total_ticks += ticks
+        if self.game_done(game):
+            self.finish_game()
+            self.new_game()
+
+    def db_bytes(self):
+        return sum(os.path.getsize(path) for path in (self.db_path, self.db_path + '-wal')
+                   if os.path.exists(path))
+
+    def take_sample(self, elapsed_s):
+        gc_pause_ms = self.gc_pause_ms
+        # Finished games are reference cycles that only a full collection frees; collecting first means only
+        # objects that are really still reachable get counted
+        gc.collect()
+        counts = {'enemies': 0, 'projectiles': 0, 'defenses': 0}
+        objects = gc.get_objects()
+        for obj in objects:
+            if isinstance(obj, Enemy):
+                counts['enemies'] += 1
+            elif isinstance(obj, Projectile):
+                counts['projectiles'] += 1
+            elif isinstance(obj, Defense):
+                counts['defenses'] += 1
+        gc_objects = len(objects)
+        del objects
+
+        batches = sorted(self.batch_us)
+        rss = rss_bytes()
+        db_bytes = self.db_bytes()
+        sample = {
+            'elapsed_s': round(elapsed_s, 1),
+            'ticks': self.total_ticks,
+            'games_finished': self.games_finished,
+            'rss_mb': None if rss is None else rss / 2**20,
+            'traced_mb': tracemalloc.get_traced_memory()[0] / 2**20 if tracemalloc.is_tracing() else None,
+            'gc_objects': gc_objects,
+            'gc_uncollectable': len(gc.garbage),
+            'gc_pause_ms': gc_pause_ms,
+            'tick_p50_us': batches[len(batches) // 2] if batches else None,
+            'tick_p95_us': batches[int(len(batches) * 0.95)] if batches else None,
+            'tick_us_per_entity': self.tick_time_us / self.entity_ticks if self.entity_ticks else None,
+            'db_mb': db_bytes / 2**20,
+            'db_kb_per_game': db_bytes / 1024 / self.games_finished if self.games_finished else None,
+        }
+        sample.update(counts)
+        self.batch_us = []
+        self.tick_time_us = 0.0
+        self.entity_ticks = 0
+        self.gc_pause_ms = 0.0
+        return sample
+
+    def top_allocators(self, limit=10):
+        if self.baseline is None or not tracemalloc.is_tracing():
+            return []
+        skip = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, __file__))
+        current = tracemalloc.take_snapshot().filter_traces(skip)
+        return [{'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                 'size_diff_kb': stat.size_diff / 1024, 'size_kb': stat.size / 1024, 'count_diff': stat.count_diff}
+                for stat in current.compare_to(self.baseline.filter_traces(skip), 'lineno')[:limit]
+                if stat.size_diff > 0]
+
+    def run(self):
+        os.makedirs(self.work_dir, exist_ok=True)
+        if self.track_allocations:
+            tracemalloc.start()
+        gc.callbacks.append(self._on_gc)
+        error = None
+        start = time.perf_counter()
+        next_sample = start + self.warmup_s
+        warm = False
+        try:
+            self.new_game()
+            while True:
+                now = time.perf_counter()
+                if now >= next_sample:
+                    if not warm:
+                        # Everything up to here is warm-up: imports, caches, the first database pages
+                        warm = True
+                        self.take_sample(now - start)
+                        if self.track_allocations:
+                            self.baseline = tracemalloc.take_snapshot()
+                    else:
+                        sample = self.take_sample(now - start)
+                        self.samples.append(sample)
+                        self.log(f"[{sample['elapsed_s']:8.0f}s] games {sample['games_finished']:5d}  "
+                                 f"rss {sample['rss_mb'] or 0:7.1f} MB  objects {sample['gc_objects']:8d}  "
+                                 f"tick p50 {sample['tick_p50_us'] or 0:6.1f} us  db {sample['db_mb']:7.1f} MB")
+                    if now - start >= self.duration_s:
+                        break
+                    next_sample = now + self.interval_s
+                self.run_batch()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            self.log(f"Soak run stopped by an exception: {error}")
+        finally:
+            gc.callbacks.remove(self._on_gc)
+
+        report = {
+            'duration_s': round(time.perf_counter() - start, 1),
+            'ticks': self.total_ticks,
+            'games_finished': self.games_finished,
+            'max_growth': self.max_growth,
+            'error': error,
+            'metrics': analyze(self.samples, self.max_growth),
+            'top_allocators': self.top_allocators(),
+            'samples': self.samples,
+        }
+        if self.track_allocations:
+            tracemalloc.stop()
+        return report
+
+def exit_code(report):
+    if report['error'] is not None:
+        return EXIT_CRASH
+    if any(result['flagged'] for result in report['metrics'].values()):
+        return EXIT_GROWTH
+    return EXIT_OK
+
+def format_report(report):
+    lines = [f"Soak run: {report['duration_s']:.0f}s, {report['ticks']} ticks, {report['games_finished']} games",
+             f"{'metric':<20} {'first':>10} {'last':>10} {'min':>10} {'max':>10} {'slope/h':>10} {'trend z':>8} "
+             f"{'growth':>8}  verdict"]
+    for metric, result in report['metrics'].items():
+        if not result['samples']:
+            continue
+        if 'trend_z' in result:
+            verdict = "GROWING" if result['flagged'] else "ok" if METRICS[metric][1] else "info"
+            trend = f"{result['slope_per_hour']:10.3g} {result['trend_z']:8.2f} {result['growth'] * 100:7.1f}%"
+        else:
+            verdict = f"too few samples ({result['samples']} < {MIN_SAMPLES})"
+            trend = f"{'-':>10} {'-':>8} {'-':>8}"
+        lines.append(f"{metric:<20} {result['first']:10.4g} {result['last']:10.4g} {result['min']:10.4g} "
+                     f"{result['max']:10.4g} {trend}  {verdict}")
+    if report['top_allocators']:
+        lines.append("Largest allocation growth since warm-up:")
+        lines += [f"  {entry['size_diff_kb']:+10.1f} KB {entry['count_diff']:+8d} blocks  {entry['location']}"
+                  for entry in report['top_allocators']]
+    if report['error'] is not None:
+        lines.append(f"Run aborted: {report['error']}")
+    return '\n'.join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run headless games back to back for hours and flag steadily growing memory, object "
+                    "counts, GC cost, tick time or database size",
+        epilog=f"Exit status: {EXIT_OK} no growth, {EXIT_GROWTH} growth flagged, {EXIT_CRASH} the game raised, "
+               "2 bad arguments")
+    parser.add_argument('--duration', type=parse_duration, default=parse_duration('1h'),
+                        help="how long to run, e.g. 90s, 30m, 4h (default 1h)")
+    parser.add_argument('--interval', type=parse_duration, default=60.0, help="seconds between samples")
+    parser.add_argument('--warmup', type=parse_duration, default=120.0,
+                        help="seconds before the first sample counts and the allocation baseline is taken")
+    parser.add_argument('--waves-per-game', type=int, default=10)
+    parser.add_argument('--frame-ticks', type=int, default=60, help="ticks timed together as one frame")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-growth', type=float, default=10.0,
+                        help="percent growth over the run before a steady upward trend is flagged")
+    parser.add_argument('--no-tracemalloc', action='store_true',
+                        help="skip allocation tracking, which slows the simulation down")
+    parser.add_argument('--work-dir', help="where the soak database and CSVs go (default: a temporary "
+                                           "directory, removed afterwards)")
+    parser.add_argument('--report', metavar='PATH', help="also write the full report with all samples as JSON")
+    args = parser.parse_args()
+    if args.warmup >= args.duration:
+        parser.error("--warmup must be shorter than --duration")
+    if args.interval <= 0:
+        parser.error("--interval must be positive")
+    if args.frame_ticks < 1:
+        parser.error("--frame-ticks must be at least 1")
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='orbital_soak_')
+    soak = SoakTest(work_dir, args.duration, args.interval, args.warmup, args.waves_per_game, args.frame_ticks,
+                    args.seed, not args.no_tracemalloc, args.max_growth / 100)
+    try:
+        report = soak.run()
+    finally:
+        if args.work_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(format_report(report))
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+    sys.exit(exit_code(report))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+import os
+import sys
+import socket
+import struct
+import argparse
+from array import array
+from collections import deque
+from snapshots import WorldSnapshot
+from defenses import ResourceCollector
+
+KEYFRAME = 1
+DELTA = 2
+
+# Positions travel as quarter pixels so a moving entity usually fits a signed byte per axis. Absolute
+# positions are 32-bit, since a large world (WORLD_WIDTH, WORLD_HEIGHT) reaches past what 16 bits hold.
+POSITION_SCALE = 4
+MAX_CLIENT_BUFFER = 1 << 20
+
+FRAME_LENGTH = struct.Struct('<I')
+HEADER = struct.Struct('<BI')
+STATUS = struct.Struct('<fBIHHIB')
+PLANET = struct.Struct('<iiH')
+DEFENSE = struct.Struct('<iiB3BB')
+FILL = struct.Struct('<HB')
+ENTITY = struct.Struct('<Hii3BB')
+MOVE = struct.Struct('<Hbb')
+JUMP = struct.Struct('<Hii')
+COUNT = struct.Struct('<H')
+
+def _quantize(value):
+    return round(value * POSITION_SCALE)
+
+def _fill_byte(fill):
+    return min(255, max(0, int(fill * 255)))
+
+def parse_address(address):
+    if address.startswith('unix:'):
+        return socket.AF_UNIX, address[len('unix:'):]
+    host, _, port = address.rpartition(':')
+    return socket.AF_INET, (host or '127.0.0.1', int(port))
+
+class _Client:
+    def __init__(self, sock):
+        self.sock = sock
+        self.pending = deque()
+        self.pending_bytes = 0
+        # Set once the first queued frame has been partly written; it must then be finished, never dropped
+        self.head_started = False
+        self.needs_keyframe = True
+
+    def drop_backlog(self):
+        head = self.pending.popleft() if self.head_started else None
+        self.pending.clear()
+        self.pending_bytes = 0
+        if head is not None:
+            self.pending.append(head)
+            self.pending_bytes = len(head)
+        self.needs_keyframe = True
+
+class _EntityChannel:
+    # Tracks what spectators were last sent for one list of moving entities (enemies or projectiles).
+    # Entries hold the object itself for one tick, so its id() can't be reused by a new object meanwhile.
+    def __init__(self):
+        self.entries = {}
+        self.next_sid = 0
+
+    def reset(self):
+        self.entries = {}
+
+    def diff(self, objects):
+        previous = self.entries
+        current = {}
+        added = []
+        moves = []
+        jumps = []
+        for obj in objects:
+            position = obj.position
+            qx = round(position[0] * POSITION_SCALE)
+            qy = round(position[1] * POSITION_SCALE)
+            entry = previous.pop(id(obj), None)
+            if entry is None or entry[0] is not obj:
+                entry = [obj, self.next_sid, qx, qy, obj.radius, obj.color]
+                self.next_sid = (self.next_sid + 1) & 0xFFFF
+                added.append(entry)
+            else:
+                dx, dy = qx - entry[2], qy - entry[3]
+                if dx or dy:
+                    if -128 <= dx <= 127 and -128 <= dy <= 127:
+                        moves.append((entry[1], dx, dy))
+                    else:
+                        jumps.append((entry[1], qx, qy))
+                    entry[2], entry[3] = qx, qy
+            current[id(obj)] = entry
+        removed = array('H', [entry[1] for entry in previous.values()])
+        self.entries = current
+        return removed, added, moves, jumps
+
+    def encode_keyframe(self, out):
+        out += COUNT.pack(len(self.entries))
+        for _, sid, qx, qy, radius, color in self.entries.values():
+            out += ENTITY.pack(sid, qx, qy, *color[:3], radius)
+
+    @staticmethod
+    def encode_delta(out, removed, added, moves, jumps):
+        out += COUNT.pack(len(removed))
+        out += removed.tobytes()
+        out += COUNT.pack(len(added))
+        for _, sid, qx, qy, radius, color in added:
+            out += ENTITY.pack(sid, qx, qy, *color[:3], radius)
+        out += COUNT.pack(len(moves))
+        for move in moves:
+            out += MOVE.pack(*move)
+        out += COUNT.pack(len(jumps))
+        for jump in jumps:
+            out += JUMP.pack(*jump)
+
+class StatePublisher:
+    def __init__(self, address, every=1):
+        self.address = address
+        self.every = every
+        self.listener = None
+        self.clients = []
+        self.enemies = _EntityChannel()
+        self.projectiles = _EntityChannel()
+        self.defense_fills = {}
+        self.defenses_sent = 0
+        self.bytes_sent = 0
+        self.frames_published = 0
+
+    def start(self):
+        family, address = parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.exists(address):
+            os.unlink(address)
+        self.listener = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(address)
+        self.listener.listen()
+        self.listener.setblocking(False)
+        return self
+
+    def close(self):
+        for client in self.clients:
+            client.sock.close()
+        self.clients = []
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+            family, address = parse_address(self.address)
+            if family == socket.AF_UNIX and os.path.exists(address):
+                os.unlink(address)
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            sock.setblocking(False)
+            self.clients.append(_Client(sock))
+
+    def publish(self, game):
+        if self.listener is None or game.sim_tick % self.every:
+            return
+        self._accept()
+        if not self.clients:
+            # Nobody is watching: drop the references and let the next spectator start from a keyframe
+            self.enemies.reset()
+            self.projectiles.reset()
+            self.defenses_sent = 0
+            self.defense_fills = {}
+            return
+
+        status = self._encode_status(game)
+        enemy_delta = self.enemies.diff(game.active_enemies)
+        projectile_delta = self.projectiles.diff(game.projectiles)
+        new_defenses, fill_changes = self._diff_defenses(game.defenses)
+
+        delta = bytearray(HEADER.pack(DELTA, game.sim_tick))
+        delta += status
+        delta += COUNT.pack(len(new_defenses))
+        for defense in new_defenses:
+            delta += self._encode_defense(defense)
+        delta += COUNT.pack(len(fill_changes))
+        for change in fill_changes:
+            delta += FILL.pack(*change)
+        _EntityChannel.encode_delta(delta, *enemy_delta)
+        _EntityChannel.encode_delta(delta, *projectile_delta)
+
+        keyframe = None
+        for client in self.clients[:]:
+            if client.needs_keyframe:
+                if client.pending:
+                    # Wait for a lagging client to drain before resyncing it
+                    self._send(client, None)
+                    continue
+                if keyframe is None:
+                    keyframe = self._encode_keyframe(game, status)
+                client.needs_keyframe = False
+                self._send(client, keyframe)
+            else:
+                self._send(client, delta)
+        self.frames_published += 1
+
+    def _send(self, client, payload):
+        if payload is not None:
+            if client.pending_bytes + len(payload) > MAX_CLIENT_BUFFER:
+                # A spectator that can't keep up loses its backlog and is resynced, so memory stays bounded
+                client.drop_backlog()
+                return
+            frame = FRAME_LENGTH.pack(len(payload)) + payload
+            client.pending.append(frame)
+            client.pending_bytes += len(frame)
+        try:
+            while client.pending:
+                frame = client.pending[0]
+                sent = client.sock.send(frame)
+                self.bytes_sent += sent
+                client.pending_bytes -= sent
+                if sent < len(frame):
+                    client.pending[0] = frame[sent:]
+                    client.head_started = True
+                    break
+                client.pending.popleft()
+                client.head_started = False
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError:
+            client.sock.close()
+            self.clients.remove(client)
+
+    def _encode_status(self, game):
+        planet = game.planet
+        flags = (1 if game.wave_in_progress else 0) | (2 if game.game_over else 0)
+        return STATUS.pack(planet.health, planet.shield_level, int(planet.resources), game.wave_manager.current_wave,
+                           game.wave_manager.enemies_in_wave, game.stats.player_score, flags)
+
+    def _encode_defense(self, defense):
+        x, y, size, color, fill = defense.snapshot()
+        return DEFENSE.pack(_quantize(x), _quantize(y), size, *color[:3], _fill_byte(fill))
+
+    def _diff_defenses(self, defenses):
+        # Defenses are never removed, so anything past defenses_sent is new; after that only a collector's
+        # fill can change
+        fill_changes = []
+        for index, sent in self.defense_fills.items():
+            fill = _fill_byte(defenses[index].snapshot()[4])
+            if fill != sent:
+                self.defense_fills[index] = fill
+                fill_changes.append((index, fill))
+        new_defenses = defenses[self.defenses_sent:]
+        for index, defense in enumerate(new_defenses, self.defenses_sent):
+            if isinstance(defense, ResourceCollector):
+                self.defense_fills[index] = _fill_byte(defense.snapshot()[4])
+        self.defenses_sent = len(defenses)
+        return new_defenses, fill_changes
+
+    def _encode_keyframe(self, game, status):
+        out = bytearray(HEADER.pack(KEYFRAME, game.sim_tick))
+        out += status
+        planet = game.planet
+        out += PLANET.pack(_quantize(planet.position[0]), _quantize(planet.position[1]), planet.radius)
+        out += COUNT.pack(len(game.defenses))
+        for defense in game.defenses:
+            out += self._encode_defense(defense)
+        self.enemies.encode_keyframe(out)
+        self.projectiles.encode_keyframe(out)
+        return out
+
+class SpectatorState:
+    def __init__(self):
+        self.synced = False
+        self.tick = 0
+        self.status = None
+        self.planet = None
+        self.defenses = []
+        self.enemies = {}
+        self.projectiles = {}
+
+    def apply(self, payload):
+        kind, tick = HEADER.unpack_from(payload, 0)
+        if kind == DELTA and not self.synced:
+            return
+        offset = HEADER.size
+        self.tick = tick
+        self.status = STATUS.unpack_from(payload, offset)
+        offset += STATUS.size
+        if kind == KEYFRAME:
+            self.synced = True
+            self.planet = PLANET.unpack_from(payload, offset)
+            offset += PLANET.size
+            self.defenses = []
+            offset = self._read_defenses(payload, offset)
+            self.enemies = {}
+            offset = self._read_entities(payload, offset, self.enemies)
+            self.projectiles = {}
+            self._read_entities(payload, offset, self.projectiles)
+        else:
+            offset = self._read_defenses(payload, offset)
+            (count,) = COUNT.unpack_from(payload, offset)
+            offset += COUNT.size
+            for index, fill in FILL.iter_unpack(payload[offset:offset + count * FILL.size]):
+                self.defenses[index][4] = fill
+            offset += count * FILL.size
+            offset = self._read_entity_delta(payload, offset, self.enemies)
+            self._read_entity_delta(payload, offset, self.projectiles)
+
+    def _read_defenses(self, payload, offset):
+        (count,) = COUNT.unpack_from(payload, offset)
+        offset += COUNT.size
+        for qx, qy, size, r, g, b, fill in DEFENSE.iter_unpack(payload[offset:offset + count * DEFENSE.size]):
+            self.defenses.append([qx, qy, size, (r, g, b), fill])
+        return offset + count * DEFENSE.size
+
+    def _read_entities(self, payload, offset, entities):
+        (count,) = COUNT.unpack_from(payload, offset)
+        offset += COUNT.size
+        for sid, qx, qy, r, g, b, radius in ENTITY.iter_unpack(payload[offset:offset + count * ENTITY.size]):
+            entities[sid] = [qx, qy, radius, (r, g, b)]
+        return offset + count * ENTITY.size
+
+    def _read_entity_delta(self, payload, offset, entities):
+        (count,) = COUNT.unpack_from(payload, offset)
+        offset += COUNT.size
+        removed = array('H')
+        removed.frombytes(payload[offset:offset + count * COUNT.size])
+        for sid in removed:
+            entities.pop(sid, None)
+        offset += count * COUNT.size
+        offset = self._read_entities(payload, offset, entities)
+        for record, apply in ((MOVE, self._move), (JUMP, self._jump)):
+            (count,) = COUNT.unpack_from(payload, offset)
+            offset += COUNT.size
+            for sid, x, y in record.iter_unpack(payload[offset:offset + count * record.size]):
+                apply(entities[sid], x, y)
+            offset += count * record.size
+        return offset
+
+    @staticmethod
+    def _move(entity, dx, dy):
+        entity[0] += dx
+        entity[1] += dy
+
+    @staticmethod
+    def _jump(entity, qx, qy):
+        entity[0] = qx
+        entity[1] = qy
+
+    def snapshot(self):
+        if not self.synced:
+            return None
+        scale = POSITION_SCALE
+        px, py, radius = self.planet
+        planet = (px / scale, py / scale, radius, self.status[1])
+        defenses = tuple((qx / scale, qy / scale, size, color, fill / 255)
+                         for qx, qy, size, color, fill in self.defenses)
+        enemies = tuple((qx / scale, qy / scale, radius, color) for qx, qy, radius, color in self.enemies.values())
+        projectiles = tuple((qx / scale, qy / scale, radius, color)
+                            for qx, qy, radius, color in self.projectiles.values())
+        return WorldSnapshot(self.tick, None, planet, defenses, enemies, projectiles, None)
+
+def read_frames(buffer):
+    frames = []
+    offset = 0
+    while len(buffer) - offset >= FRAME_LENGTH.size:
+        (length,) = FRAME_LENGTH.unpack_from(buffer, offset)
+        if len(buffer) - offset - FRAME_LENGTH.size < length:
+            break
+        start = offset + FRAME_LENGTH.size
+        frames.append(bytes(buffer[start:start + length]))
+        offset = start + length
+    del buffer[:offset]
+    return frames
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a running game streamed with --stream")
+    parser.add_argument('address', help="host:port or unix:/path the game is streaming on")
+    args = parser.parse_args()
+
+    import pygame
+    from config import init_display, FPS, BLACK, WHITE
+    from fonts import get_font
+    from snapshots import draw_world
+
+    family, address = parse_address(args.address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.connect(address)
+    sock.setblocking(False)
+
+    screen = init_display("Orbital Defense - Spectator")
+    font = get_font(24)
+    clock = pygame.time.Clock()
+    state = SpectatorState()
+    buffer = bytearray()
+    connected = True
+
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                pygame.quit()
+                sys.exit()
+
+        while connected:
+            try:
+                data = sock.recv(1 << 16)
+            except (BlockingIOError, InterruptedError):
+                break
+            if not data:
+                connected = False
+                break
+            buffer += data
+        for payload in read_frames(buffer):
+            state.apply(payload)
+
+        screen.fill(BLACK)
+        snapshot = state.snapshot()
+        if snapshot is not None:
+            draw_world(screen, snapshot)
+            health, _, resources, wave, enemies_in_wave, score, flags = state.status
+            line = f"TICK {snapshot.tick}  WAVE {wave}  HEALTH {int(health)}  RESOURCES {resources}  SCORE {score}"
+            if flags & 2:
+                line += "  GAME OVER"
+            screen.blit(font.render(line, True, WHITE), (10, 10))
+        if not connected:
+            screen.blit(font.render("Stream ended", True, WHITE), (10, 36))
+        pygame.display.flip()
+        clock.tick(FPS)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import tempfile
+from array import array
+
+DEFAULT_CHUNK_SIZE = 512
+STRING_TYPECODE = 'H'
+
+class ChunkedBuffer:
+    def __init__(self, fields, chunk_size=DEFAULT_CHUNK_SIZE, spill=None):
+        self.fields = [name for name, _ in fields]
+        self.typecodes = [STRING_TYPECODE if typecode == 'str' else typecode for _, typecode in fields]
+        self.string_columns = {i for i, (_, typecode) in enumerate(fields) if typecode == 'str'}
+        self.chunk_size = chunk_size
+        self.spill = spill
+        self.strings = []
+        self.string_ids = {}
+        self.spill_file = None
+        self.spilled_chunks = []
+        self.spilled_rows = 0
+        self.chunk = self._new_chunk()
+
+    def _new_chunk(self):
+        return [array(typecode) for typecode in self.typecodes]
+
+    def _intern(self, value):
+        string_id = self.string_ids.get(value)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings.append(value)
+            self.string_ids[value] = string_id
+        return string_id
+
+    def _decode(self, chunk):
+        columns = [[self.strings[v] for v in column] if i in self.string_columns else column
+                   for i, column in enumerate(chunk)]
+        return list(zip(*columns))
+
+    def append(self, *values):
+        for i, value in enumerate(values):
+            self.chunk[i].append(self._intern(value) if i in self.string_columns else value)
+        if len(self.chunk[0]) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        rows = len(self.chunk[0])
+        if rows == 0:
+            return
+        if self.spill is not None:
+            self.spill(self._decode(self.chunk))
+        else:
+            if self.spill_file is None:
+                self.spill_file = tempfile.TemporaryFile()
+            self.spill_file.seek(0, 2)
+            for column in self.chunk:
+                column.tofile(self.spill_file)
+            self.spilled_chunks.append(rows)
+        self.spilled_rows += rows
+        self.chunk = self._new_chunk()
+
+    def take(self):
+        # Hands the unflushed rows to the caller, who writes them itself instead of through spill
+        rows = self._decode(self.chunk)
+        self.spilled_rows += len(rows)
+        self.chunk = self._new_chunk()
+        return rows
+
+    def _iter_spill_file(self):
+        if self.spill_file is None:
+            return
+        row_size = sum(array(typecode).itemsize for typecode in self.typecodes)
+        offset = 0
+        for rows in self.spilled_chunks:
+            # Seek per chunk so appends that spill mid-iteration can't move us
+            self.spill_file.seek(offset)
+            chunk = self._new_chunk()
+            for column in chunk:
+                column.fromfile(self.spill_file, rows)
+            offset += rows * row_size
+            yield from self._decode(chunk)
+
+    def __iter__(self):
+        yield from self._iter_spill_file()
+        yield from self._decode(self.chunk)
+
+    def __len__(self):
+        return self.spilled_rows + len(self.chunk[0])
+
+    def pending_rows(self):
+        return len(self.chunk[0])
+
+    def clear(self):
+        if self.spill_file is not None:
+            self.spill_file.close()
+        self.spill_file = None
+        self.spilled_chunks = []
+        self.spilled_rows = 0
+        self.chunk = self._new_chunk()
@@ -1,77 +1,201 @@
 import pygame
 import math
 import sqlite3
-from config import SCREEN_WIDTH, SCREEN_HEIGHT, BLACK, WHITE, RED, GREEN, BLUE, YELLOW, CYAN, PURPLE
+from datetime import datetime
+from config import SCREEN_WIDTH, SCREEN_HEIGHT, BLACK, WHITE, RED, GREEN, BLUE, YELLOW, CYAN, PURPLE, STATS_DB_PATH, init_display
+from fonts import get_font
+from catalog import get_catalog
+from tracer import get_tracer
+from session_browser import SessionPager, LRUCache
+from timeseries import decode_level
+
+PAGE_TITLES = [
+    "Game Summary",
+    "Defense Placement Heatmap",
+    "Resource Collection History",
+    "Enemy Survival Analysis",
+    "Frame Time by Wave",
+    "Session Browser",
+]
+BROWSER_PAGE = PAGE_TITLES.index("Session Browser")
+CURVE_WIDTH = 500
+CURVE_SERIES = [
+    ('resources', "Resources", GREEN),
+    ('health', "Health", RED),
+    ('enemies', "Enemies", PURPLE),
+    ('score', "Score", YELLOW),
+]
 
 class StatsDisplay:
-    def __init__(self):
-        pygame.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Orbital Defense - Statistics")
-        self.font_small = pygame.font.SysFont(None, 24)
-        self.font_medium = pygame.font.SysFont(None, 36)
-        self.font_large = pygame.font.SysFont(None, 48)
+    def __init__(self, db_path=STATS_DB_PATH, headless=False):
+        self.db_path = db_path
+        self.screen = None if headless else init_display("Orbital Defense - Statistics")
+        self.font_small = get_font(24)
+        self.font_medium = get_font(36)
+        self.font_large = get_font(48)
+        
+        self._conn = None
+        self._cursor = None
+        self.tracer = get_tracer()
+        self.browser = None
+        self.browser_selected = 0
+        self.session_details = LRUCache(64)
         
-        self.conn = sqlite3.connect('data/game_stats.db')
-        self.cursor = self.conn.cursor()
+    @property
+    def cursor(self):
+        if self._cursor is None:
+            self._conn = sqlite3.connect(self.db_path)
+            self._cursor = self._conn.cursor()
+        return self._cursor
         
-    def load_data(self):
+    def complete_sessions(self):
+        # Only the game migrates the schema; a database it hasn't written since the complete flag was added
+        # holds nothing but finished sessions
+        columns = {row[1] for row in self.cursor.execute("PRAGMA table_info(game_sessions)")}
+        return "complete = 1" if 'complete' in columns else "1 = 1"
+        
+    def enemy_totals(self, session_id=None):
+        # Sessions archived by db_maintenance keep per-type totals in enemy_rollups instead of raw enemy_data
+        # rows. Each table is aggregated on its own before the two are combined, which is much cheaper than
+        # grouping the union of every raw row.
+        where, params = ("WHERE session_id = ?", (session_id,)) if session_id is not None else ("", ())
+        parts = [f"SELECT enemy_type, SUM(survival_time) AS survival, COUNT(*) AS n FROM enemy_data {where} GROUP BY enemy_type"]
+        # Databases no game or maintenance run has touched since rollups were added only have enemy_data
+        has_rollups = self.cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'enemy_rollups'").fetchone()
+        if has_rollups:
+            parts.append(f"SELECT enemy_type, SUM(total_survival_time), SUM(enemy_count) FROM enemy_rollups {where} GROUP BY enemy_type")
+            params = params * 2
+        self.cursor.execute(f"""
+        SELECT enemy_type, SUM(survival) * 1.0 / SUM(n), SUM(n)
+        FROM ({' UNION ALL '.join(parts)})
+        GROUP BY enemy_type
+        """, params)
+        return self.cursor.fetchall()
+
+    def load_data(self, session_id=None):
+        # With a session id everything is loaded as of that session, otherwise as of the latest one
         try:
-            self.cursor.execute("SELECT * FROM game_sessions ORDER BY date DESC LIMIT 10")
-            self.sessions = self.cursor.fetchall()
+            with self.tracer.span("query recent sessions", "query"):
+                complete = self.complete_sessions()
+                if session_id is None:
+                    self.cursor.execute(f"SELECT * FROM game_sessions WHERE {complete} ORDER BY date DESC LIMIT 10")
+                else:
+                    # The chosen session plus the 9 before it, found by seeking the (date, id) index
+                    self.cursor.execute(f"""
+                    SELECT * FROM (
+                        SELECT * FROM game_sessions WHERE id = ? AND {complete}
+                        UNION ALL
+                        SELECT * FROM (
+                            SELECT * FROM game_sessions
+                            WHERE (date, id) < (SELECT date, id FROM game_sessions WHERE id = ?) AND {complete}
+                            ORDER BY date DESC, id DESC LIMIT 9
+                        )
+                    )
+                    ORDER BY id = ? DESC, date DESC, id DESC
+                    """, (session_id, session_id, session_id))
+                self.sessions = self.cursor.fetchall()
         
             if self.sessions:
                 latest_session_id = self.sessions[0][0]
             
-                self.cursor.execute("""
-                SELECT defense_type, orbital_radius, angle 
-                FROM defense_placements 
-                WHERE session_id = ?
-                """, (latest_session_id,))
-                self.placements = self.cursor.fetchall()
+                with self.tracer.span("query defense placements", "query"):
+                    self.cursor.execute("""
+                    SELECT defense_type, orbital_radius, angle, damage_dealt
+                    FROM defense_placements 
+                    WHERE session_id = ?
+                    """, (latest_session_id,))
+                    self.placements = self.cursor.fetchall()
             
-                self.cursor.execute("""
-                SELECT enemy_type, AVG(survival_time), COUNT(*) 
-                FROM enemy_data 
-                WHERE session_id = ?
-                GROUP BY enemy_type
-                """, (latest_session_id,))
-                self.enemy_data = self.cursor.fetchall()
+                with self.tracer.span("query session enemy data", "query"):
+                    self.enemy_data = self.enemy_totals(latest_session_id)
+
+                if session_id is None:
+                    with self.tracer.span("query enemy analysis", "query"):
+                        self.enemy_analysis = self.enemy_totals()
+                else:
+                    self.enemy_analysis = self.enemy_data
+
+                self.wave_perf = self.load_wave_perf([session[0] for session in self.sessions[:5]])
+                self.timeseries = self.load_timeseries(latest_session_id)
             else:
                 self.placements = []
                 self.enemy_data = []
+                self.enemy_analysis = []
+                self.wave_perf = []
+                self.timeseries = {}
             
         except sqlite3.Error as e:
             print(f"Database error while loading data: {e}")
             self.sessions = []
             self.placements = []
             self.enemy_data = []
+            self.enemy_analysis = []
+            self.wave_perf = []
+            self.timeseries = {}
+
+    def load_session_detail(self, session_id):
+        self.cursor.execute("""
+        SELECT defense_type, orbital_radius, angle, damage_dealt FROM defense_placements WHERE session_id = ?
+        """, (session_id,))
+        placements = self.cursor.fetchall()
+        return placements, self.enemy_totals(session_id)
+
+    def load_wave_perf(self, session_ids):
+        try:
+            with self.tracer.span("query wave performance", "query"):
+                self.cursor.execute(f"""
+                SELECT session_id, wave, p95_ms FROM wave_perf
+                WHERE session_id IN ({', '.join('?' * len(session_ids))})
+                ORDER BY session_id, wave
+                """, session_ids)
+                return self.cursor.fetchall()
+        except sqlite3.Error:
+            # Databases written before performance metrics existed have no wave_perf table
+            return []
         
+    def load_timeseries(self, session_id, max_points=2 * CURVE_WIDTH):
+        # Per series, the finest stored level with at most two points per pixel; a long session is a few kilobytes
+        try:
+            with self.tracer.span("query session time series", "query"):
+                self.cursor.execute('''
+                SELECT series, level, interval_ms, count, data FROM session_timeseries AS t
+                WHERE session_id = ? AND level = (
+                    SELECT MIN(level) FROM session_timeseries
+                    WHERE session_id = t.session_id AND series = t.series AND count <= ?)
+                ''', (session_id, max_points))
+                rows = self.cursor.fetchall()
+        except sqlite3.Error:
+            # Databases written before time series were stored have no session_timeseries table
+            return {}
+        return {series: (interval_ms,) + decode_level(data, level, count)
+                for series, level, interval_ms, count, data in rows}
+
     def generate_heatmap(self):
         heatmap = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
         
-        for defense_type, radius, angle in self.placements:
+        max_damage = max((damage or 0 for _, _, _, damage in self.placements), default=0)
+        for defense_type, radius, angle, damage in self.placements:
             x = SCREEN_WIDTH // 2 + radius * math.cos(angle)
             y = SCREEN_HEIGHT // 2 + radius * math.sin(angle)
             
-            if defense_type == 'LaserTurret':
-                color = (*RED, 100)
-            elif defense_type == 'ResourceCollector':
-                color = (*GREEN, 100)
-            else:
-                color = (*BLUE, 100)
+            spec = get_catalog().defense_by_name.get(defense_type)
+            # Defenses that deal damage are shaded by their share of the session's best performer
+            alpha = 100
+            if damage and max_damage:
+                alpha = 60 + round(160 * damage / max_damage)
+            color = (*(spec.color if spec else BLUE), alpha)
                 
             pygame.draw.circle(heatmap, color, (int(x), int(y)), 30)
+            if damage:
+                label = self.font_small.render(str(damage), True, (255, 255, 255))
+                heatmap.blit(label, (int(x) - label.get_width() // 2, int(y) - label.get_height() // 2))
             
         return heatmap
         
     def plot_resource_graph(self):
         try:
-            self.cursor.execute("""
-            SELECT resources_collected, date FROM game_sessions 
-            ORDER BY date DESC LIMIT 10
-            """)
-            resources_data = self.cursor.fetchall()
+            resources_data = [(session[5], session[1]) for session in self.sessions]
         
             graph = pygame.Surface((600, 350), pygame.SRCALPHA)
             graph.fill((0, 0, 0, 150))
@@ -145,13 +269,111 @@ class StatsDisplay:
             error_graph.blit(error_text, (50, 150))
             return error_graph
         
+    def plot_session_curves(self):
+        graph = pygame.Surface((600, 270), pygame.SRCALPHA)
+        graph.fill((0, 0, 0, 150))
+        left, top, width, height = 70, 40, CURVE_WIDTH, 160
+        pygame.draw.line(graph, WHITE, (left, top + height), (left + width, top + height), 2)
+        pygame.draw.line(graph, WHITE, (left, top + height), (left, top), 2)
+
+        session_label = f"Session {self.sessions[0][0]}" if self.sessions else "Session"
+        graph.blit(self.font_small.render(f"{session_label} over time (each curve scaled to its peak)", True, WHITE),
+                   (left, 10))
+
+        if not self.timeseries:
+            no_data = self.font_small.render("No time series recorded for this session", True, (255, 0, 0))
+            graph.blit(no_data, (left + width // 2 - no_data.get_width() // 2, top + height // 2))
+            return graph
+
+        duration_ms = max(interval_ms * len(maxs) for interval_ms, _, maxs in self.timeseries.values())
+
+        def x_at(i, interval_ms):
+            return left + (i + 0.5) * interval_ms / duration_ms * width
+
+        # Wave starts as faint vertical lines
+        if 'wave' in self.timeseries:
+            interval_ms, _, waves = self.timeseries['wave']
+            for i in range(1, len(waves)):
+                if waves[i] > waves[i - 1]:
+                    x = x_at(i, interval_ms)
+                    pygame.draw.line(graph, (70, 70, 110), (x, top), (x, top + height), 1)
+
+        # Coarser levels carry each bucket's min and max; both are drawn so short spikes still show
+        for row, (series, label, color) in enumerate(CURVE_SERIES):
+            if series not in self.timeseries:
+                continue
+            interval_ms, mins, maxs = self.timeseries[series]
+            peak = max(max(maxs), 1)
+            for values in ((maxs,) if mins is maxs else (mins, maxs)):
+                points = [(x_at(i, interval_ms), top + height - value / peak * height)
+                          for i, value in enumerate(values)]
+                if len(points) > 1:
+                    pygame.draw.lines(graph, color, False, points, 2)
+            legend = self.font_small.render(f"{label} (peak {peak})", True, color)
+            graph.blit(legend, (left + (row % 2) * 250, top + height + 10 + (row // 2) * 20))
+
+        graph.blit(self.font_small.render("0s", True, WHITE), (left - 10, top + height + 55))
+        end_label = self.font_small.render(f"{duration_ms / 1000:.0f}s", True, WHITE)
+        graph.blit(end_label, (left + width - end_label.get_width(), top + height + 55))
+        return graph
+
+    def plot_frame_time_by_wave(self):
+        graph = pygame.Surface((600, 400), pygame.SRCALPHA)
+        graph.fill((0, 0, 0, 150))
+        rows = self.wave_perf
+
+        if not rows:
+            no_data_text = self.font_small.render("No performance data recorded yet", True, (255, 0, 0))
+            graph.blit(no_data_text, (300 - no_data_text.get_width() // 2, 180))
+            return graph
+
+        sessions = {}
+        for session_id, wave, p95_ms in rows:
+            sessions.setdefault(session_id, []).append((wave, p95_ms))
+
+        max_wave = max(max(wave for _, wave, _ in rows), 1)
+        max_ms = max(max(p95_ms for _, _, p95_ms in rows), 1000 / 60) * 1.2
+
+        pygame.draw.line(graph, WHITE, (70, 290), (570, 290), 2)
+        pygame.draw.line(graph, WHITE, (70, 290), (70, 40), 2)
+
+        for i in range(5):
+            y_pos = 290 - (i * 250 / 4)
+            marker_text = self.font_small.render(f"{max_ms * i / 4:.0f}", True, WHITE)
+            graph.blit(marker_text, (60 - marker_text.get_width(), y_pos - 8))
+            pygame.draw.line(graph, (100, 100, 100), (65, y_pos), (570, y_pos), 1)
+
+        budget_y = 290 - (1000 / 60) / max_ms * 250
+        pygame.draw.line(graph, RED, (70, budget_y), (570, budget_y), 1)
+        budget_text = self.font_small.render("60 FPS budget", True, RED)
+        graph.blit(budget_text, (570 - budget_text.get_width(), budget_y - 18))
+
+        for wave in range(max_wave + 1):
+            x_pos = 70 + wave * 500 / max_wave
+            wave_text = self.font_small.render(str(wave), True, WHITE)
+            graph.blit(wave_text, (x_pos - wave_text.get_width() // 2, 295))
+
+        x_label = self.font_small.render("Wave", True, WHITE)
+        graph.blit(x_label, (300, 318))
+        y_label_text = self.font_small.render("p95 frame time (ms)", True, WHITE)
+        graph.blit(pygame.transform.rotate(y_label_text, 90), (5, 90))
+
+        line_colors = [CYAN, YELLOW, GREEN, PURPLE, (255, 150, 50)]
+        for i, (session_id, points) in enumerate(sorted(sessions.items(), reverse=True)):
+            color = line_colors[i % len(line_colors)]
+            coords = [(70 + wave * 500 / max_wave, 290 - p95_ms / max_ms * 250) for wave, p95_ms in points]
+            if len(coords) > 1:
+                pygame.draw.lines(graph, color, False, coords, 2)
+            for coord in coords:
+                pygame.draw.circle(graph, color, (int(coord[0]), int(coord[1])), 3)
+
+            label = self.font_small.render(f"Session {session_id}", True, color)
+            graph.blit(label, (80 + i * 100, 345))
+
+        return graph
+        
     def display_enemy_analysis(self):
-        self.cursor.execute("""
-        SELECT enemy_type, AVG(survival_time), COUNT(*) 
-        FROM enemy_data 
-        GROUP BY enemy_type
-        """)
-        enemy_stats = self.cursor.fetchall()
+        enemy_stats = self.enemy_analysis
         
         graph = pygame.Surface((600, 300), pygame.SRCALPHA)
         graph.fill((*BLACK, 150))
@@ -179,117 +401,201 @@ class StatsDisplay:
                 
         return graph
         
+    def session_detail_surface(self, session):
+        # Built once per session and kept in an LRU, so moving the selection back and forth costs nothing
+        detail = self.session_details.get(session[0])
+        if detail is not None:
+            return detail
+
+        session_id, date, duration, waves, score, enemies, accuracy = session
+        with self.tracer.span("query session detail", "query", session=session_id):
+            placements, enemy_totals = self.load_session_detail(session_id)
+
+        detail = pygame.Surface((360, 420), pygame.SRCALPHA)
+        detail.fill((30, 30, 60, 180))
+        pygame.draw.rect(detail, (100, 100, 220), (0, 0, 360, 420), 2, 10)
+
+        lines = [
+            (f"Session {session_id}", (220, 220, 255)),
+            (date, WHITE),
+            (f"{duration / 1000:.1f}s, {waves} waves, score {score}", WHITE),
+            (f"{enemies} enemies defeated, {accuracy * 100:.1f}% accuracy", WHITE),
+        ]
+        for i, (text, color) in enumerate(lines):
+            detail.blit(self.font_small.render(text, True, color), (15, 12 + i * 24))
+
+        # Orbits drawn at a third of the real radius around a small planet
+        center = (100, 230)
+        pygame.draw.circle(detail, (50, 50, 200), center, 16)
+        for defense_type, radius, angle, damage in placements:
+            spec = get_catalog().defense_by_name.get(defense_type)
+            x = center[0] + radius / 3 * math.cos(angle)
+            y = center[1] + radius / 3 * math.sin(angle)
+            pygame.draw.circle(detail, spec.color if spec else BLUE, (int(x), int(y)), 5)
+
+        detail.blit(self.font_small.render("Enemy survival", True, (200, 200, 255)), (215, 120))
+        for i, (enemy_type, avg_time, count) in enumerate(enemy_totals[:8]):
+            text = self.font_small.render(f"{enemy_type}: {avg_time / 1000:.1f}s", True, WHITE)
+            detail.blit(text, (215, 146 + i * 24))
+        if not enemy_totals:
+            detail.blit(self.font_small.render("none recorded", True, (150, 150, 150)), (215, 146))
+
+        self.session_details.put(session_id, detail)
+        return detail
+
+    def open_browser(self):
+        if self.browser is None:
+            self.browser = SessionPager(self.db_path)
+            self.browser_selected = 0
+
+    def move_browser_selection(self, step):
+        rows = self.browser.rows
+        selected = self.browser_selected + step
+        if selected >= len(rows):
+            if self.browser.next_page():
+                selected = 0
+            else:
+                selected = len(rows) - 1
+        elif selected < 0:
+            if self.browser.previous_page():
+                selected = len(self.browser.rows) - 1
+            else:
+                selected = 0
+        self.browser_selected = selected
+
+    def draw_session_browser(self, surface):
+        self.open_browser()
+        rows = self.browser.rows
+        if not rows:
+            no_data = self.font_medium.render("No game data available", True, (255, 100, 100))
+            surface.blit(no_data, (SCREEN_WIDTH // 2 - no_data.get_width() // 2, 200))
+            return
+
+        self.browser_selected = min(self.browser_selected, len(rows) - 1)
+        for i, (session_id, date, _, waves, score, _, _) in enumerate(rows):
+            y = 125 + i * 28
+            if i == self.browser_selected:
+                pygame.draw.rect(surface, (60, 60, 120), (20, y - 3, 380, 26), 0, 5)
+            text = self.font_small.render(f"#{session_id}  {date}  W{waves}  {score}", True, WHITE)
+            surface.blit(text, (30, y))
+
+        page_text = self.font_small.render(f"Page {self.browser.page_number}", True, (150, 150, 200))
+        surface.blit(page_text, (30, 125 + self.browser.page_size * 28))
+        surface.blit(self.session_detail_surface(rows[self.browser_selected]), (420, 120))
+
+    def render_page(self, surface, page, footer=None):
+        background_color = (5, 5, 20)
+        title_color = (220, 220, 255)
+        highlight_color = (100, 100, 220)
+
+        surface.fill(background_color)
+    
+        header_bar = pygame.Surface((SCREEN_WIDTH, 80), pygame.SRCALPHA)
+        header_bar.fill((20, 20, 40, 180))
+        surface.blit(header_bar, (0, 0))
+    
+        title = self.font_large.render("Orbital Defense Statistics", True, title_color)
+        surface.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 20))
+    
+        footer_bar = pygame.Surface((SCREEN_WIDTH, 40), pygame.SRCALPHA)
+        footer_bar.fill((20, 20, 40, 180))
+        surface.blit(footer_bar, (0, SCREEN_HEIGHT - 40))
+    
+        if footer is None and page == BROWSER_PAGE:
+            footer = "UP/DOWN select, PGUP/PGDN page, HOME newest, ENTER open, LEFT/RIGHT pages, ESC exit"
+        elif footer is None:
+            footer = f"Page {page+1}/{len(PAGE_TITLES)} - Press LEFT/RIGHT to navigate, ESC to exit"
+        nav_text = self.font_small.render(footer, True, (255, 255, 255))
+        surface.blit(nav_text, (SCREEN_WIDTH // 2 - nav_text.get_width() // 2, SCREEN_HEIGHT - 30))
+    
+        page_title_text = self.font_medium.render(PAGE_TITLES[page], True, highlight_color)
+        surface.blit(page_title_text, (SCREEN_WIDTH // 2 - page_title_text.get_width() // 2, 80))
+    
+        if page == 0:
+            if self.sessions:
+                latest = self.sessions[0]
+            
+                panel = pygame.Surface((500, 350), pygame.SRCALPHA)
+                panel.fill((30, 30, 60, 180))
+                pygame.draw.rect(panel, highlight_color, (0, 0, 500, 350), 2, 10)
+                surface.blit(panel, (SCREEN_WIDTH // 2 - 250, 120))
+            
+                stats = [
+                    ("Date", f"{latest[1]}"),
+                    ("Duration", f"{latest[2]/1000:.1f} seconds"),
+                    ("Waves Completed", f"{latest[3]}"),
+                    ("Score", f"{latest[4]}"),
+                    ("Resources Collected", f"{latest[5]}"),
+                    ("Enemies Defeated", f"{latest[6]}"),
+                    ("Accuracy", f"{latest[7]*100:.1f}%")
+                ]
+            
+                for i, (label, value) in enumerate(stats):
+                    label_text = self.font_small.render(f"{label}:", True, (200, 200, 255))
+                    value_text = self.font_small.render(value, True, (255, 255, 255))
+                
+                    surface.blit(label_text, (SCREEN_WIDTH // 2 - 220, 150 + i * 40))
+                    surface.blit(value_text, (SCREEN_WIDTH // 2 + 20, 150 + i * 40))
+            else:
+                no_data = self.font_medium.render("No game data available", True, (255, 100, 100))
+                surface.blit(no_data, (SCREEN_WIDTH // 2 - no_data.get_width() // 2, 200))
+            
+        elif page == 1:
+            if self.placements:
+                heatmap = self.generate_heatmap()
+                surface.blit(heatmap, (0, 0))
+            
+                pygame.draw.circle(surface, (50, 50, 200), (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2), 50)
+                pygame.draw.circle(surface, (100, 100, 255), (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2), 50, 2)
+            
+                defenses = get_catalog().defenses
+                legend_height = 50 + len(defenses) * 25
+                legend_panel = pygame.Surface((200, legend_height), pygame.SRCALPHA)
+                legend_panel.fill((20, 20, 40, 200))
+                pygame.draw.rect(legend_panel, (100, 100, 150), (0, 0, 200, legend_height), 2, 5)
+                surface.blit(legend_panel, (SCREEN_WIDTH - 220, 120))
+            
+                legend_title = self.font_small.render("Legend", True, (200, 200, 255))
+                surface.blit(legend_title, (SCREEN_WIDTH - 190, 125))
+            
+                for i, spec in enumerate(defenses):
+                    pygame.draw.circle(surface, spec.color, (SCREEN_WIDTH - 200, 155 + i * 25), 8)
+                    label_color = tuple(min(255, c + 100) for c in spec.color)
+                    label = self.font_small.render(f"{spec.title}s", True, label_color)
+                    surface.blit(label, (SCREEN_WIDTH - 180, 150 + i * 25))
+            else:
+                no_data = self.font_medium.render("No placement data available", True, (255, 100, 100))
+                surface.blit(no_data, (SCREEN_WIDTH // 2 - no_data.get_width() // 2, 200))
+            
+        elif page == 2:
+            resource_graph = self.plot_resource_graph()
+            surface.blit(resource_graph, (SCREEN_WIDTH // 2 - 300, 120))
+            surface.blit(self.plot_session_curves(), (SCREEN_WIDTH // 2 - 300, 480))
+            
+        elif page == 3:
+            if self.enemy_data:
+                enemy_graph = self.display_enemy_analysis()
+                surface.blit(enemy_graph, (SCREEN_WIDTH // 2 - 300, 120))
+            else:
+                no_data = self.font_medium.render("No enemy data available", True, (255, 100, 100))
+                surface.blit(no_data, (SCREEN_WIDTH // 2 - no_data.get_width() // 2, 200))
+
+        elif page == 4:
+            frame_graph = self.plot_frame_time_by_wave()
+            surface.blit(frame_graph, (SCREEN_WIDTH // 2 - 300, 120))
+
+        elif page == BROWSER_PAGE:
+            self.draw_session_browser(surface)
+
     def render_stats_dashboard(self):
         self.load_data()
     
         running = True
         current_page = 0
-        total_pages = 4
-    
-        background_color = (5, 5, 20)
-        title_color = (220, 220, 255)
-        highlight_color = (100, 100, 220)
+        total_pages = len(PAGE_TITLES)
     
         while running:
-            self.screen.fill(background_color)
-        
-            header_bar = pygame.Surface((SCREEN_WIDTH, 80), pygame.SRCALPHA)
-            header_bar.fill((20, 20, 40, 180))
-            self.screen.blit(header_bar, (0, 0))
-        
-            title = self.font_large.render("Orbital Defense Statistics", True, title_color)
-            self.screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 20))
-        
-            footer_bar = pygame.Surface((SCREEN_WIDTH, 40), pygame.SRCALPHA)
-            footer_bar.fill((20, 20, 40, 180))
-            self.screen.blit(footer_bar, (0, SCREEN_HEIGHT - 40))
-        
-            nav_text = self.font_small.render(
-                f"Page {current_page+1}/{total_pages} - Press LEFT/RIGHT to navigate, ESC to exit", 
-                True, (255, 255, 255))
-            self.screen.blit(nav_text, (SCREEN_WIDTH // 2 - nav_text.get_width() // 2, SCREEN_HEIGHT - 30))
-        
-            if current_page == 0:
-                page_title = "Game Summary"
-            elif current_page == 1:
-                page_title = "Defense Placement Heatmap"
-            elif current_page == 2:
-                page_title = "Resource Collection History"
-            elif current_page == 3:
-                page_title = "Enemy Survival Analysis"
-            
-            page_title_text = self.font_medium.render(page_title, True, highlight_color)
-            self.screen.blit(page_title_text, (SCREEN_WIDTH // 2 - page_title_text.get_width() // 2, 80))
-        
-            if current_page == 0:
-                if self.sessions:
-                    latest = self.sessions[0]
-                
-                    panel = pygame.Surface((500, 350), pygame.SRCALPHA)
-                    panel.fill((30, 30, 60, 180))
-                    pygame.draw.rect(panel, highlight_color, (0, 0, 500, 350), 2, 10)
-                    self.screen.blit(panel, (SCREEN_WIDTH // 2 - 250, 120))
-                
-                    stats = [
-                        ("Date", f"{latest[1]}"),
-                        ("Duration", f"{latest[2]/1000:.1f} seconds"),
-                        ("Waves Completed", f"{latest[3]}"),
-                        ("Score", f"{latest[4]}"),
-                        ("Resources Collected", f"{latest[5]}"),
-                        ("Enemies Defeated", f"{latest[6]}"),
-                        ("Accuracy", f"{latest[7]*100:.1f}%")
-                    ]
-                
-                    for i, (label, value) in enumerate(stats):
-                        label_text = self.font_small.render(f"{label}:", True, (200, 200, 255))
-                        value_text = self.font_small.render(value, True, (255, 255, 255))
-                    
-                        self.screen.blit(label_text, (SCREEN_WIDTH // 2 - 220, 150 + i * 40))
-                        self.screen.blit(value_text, (SCREEN_WIDTH // 2 + 20, 150 + i * 40))
-                else:
-                    no_data = self.font_medium.render("No game data available", True, (255, 100, 100))
-                    self.screen.blit(no_data, (SCREEN_WIDTH // 2 - no_data.get_width() // 2, 200))
-                
-            elif current_page == 1:
-                if self.placements:
-                    heatmap = self.generate_heatmap()
-                    self.screen.blit(heatmap, (0, 0))
-                
-                    pygame.draw.circle(self.screen, (50, 50, 200), (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2), 50)
-                    pygame.draw.circle(self.screen, (100, 100, 255), (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2), 50, 2)
-                
-                    legend_panel = pygame.Surface((200, 100), pygame.SRCALPHA)
-                    legend_panel.fill((20, 20, 40, 200))
-                    pygame.draw.rect(legend_panel, (100, 100, 150), (0, 0, 200, 100), 2, 5)
-                    self.screen.blit(legend_panel, (SCREEN_WIDTH - 220, 120))
-                
-                    legend_title = self.font_small.render("Legend", True, (200, 200, 255))
-                    self.screen.blit(legend_title, (SCREEN_WIDTH - 190, 125))
-                
-                    pygame.draw.circle(self.screen, (255, 0, 0), (SCREEN_WIDTH - 200, 155), 8)
-                    pygame.draw.circle(self.screen, (0, 255, 0), (SCREEN_WIDTH - 200, 180), 8)
-                
-                    red_label = self.font_small.render("Laser Turrets", True, (255, 100, 100))
-                    green_label = self.font_small.render("Resource Collectors", True, (100, 255, 100))
-                
-                    self.screen.blit(red_label, (SCREEN_WIDTH - 180, 150))
-                    self.screen.blit(green_label, (SCREEN_WIDTH - 180, 175))
-                else:
-                    no_data = self.font_medium.render("No placement data available", True, (255, 100, 100))
-                    self.screen.blit(no_data, (SCREEN_WIDTH // 2 - no_data.get_width() // 2, 200))
-                
-            elif current_page == 2:
-                resource_graph = self.plot_resource_graph()
-                self.screen.blit(resource_graph, (SCREEN_WIDTH // 2 - 300, 120))
-                
-            elif current_page == 3:
-                if self.enemy_data:
-                    enemy_graph = self.display_enemy_analysis()
-                    self.screen.blit(enemy_graph, (SCREEN_WIDTH // 2 - 300, 120))
-                else:
-                    no_data = self.font_medium.render("No enemy data available", True, (255, 100, 100))
-                    self.screen.blit(no_data, (SCREEN_WIDTH // 2 - no_data.get_width() // 2, 200))
-                
+            self.render_page(self.screen, current_page)
             pygame.display.flip()
         
             for event in pygame.event.get():
@@ -302,5 +608,24 @@ class StatsDisplay:
                         current_page = (current_page - 1) % total_pages
                     elif event.key == pygame.K_RIGHT:
                         current_page = (current_page + 1) % total_pages
-                        
+                    elif current_page == BROWSER_PAGE and self.browser is not None and self.browser.rows:
+                        if event.key == pygame.K_DOWN:
+                            self.move_browser_selection(1)
+                        elif event.key == pygame.K_UP:
+                            self.move_browser_selection(-1)
+                        elif event.key == pygame.K_PAGEDOWN:
+                            if self.browser.next_page():
+                                self.browser_selected = 0
+                        elif event.key == pygame.K_PAGEUP:
+                            self.browser.previous_page()
+                        elif event.key == pygame.K_HOME:
+                            self.browser.first_page()
+                            self.browser_selected = 0
+                        elif event.key == pygame.K_RETURN:
+                            # The other pages then show this session instead of the latest one
+                            self.load_data(self.browser.rows[self.browser_selected][0])
+                            current_page = 0
+
+        if self.browser is not None:
+            self.browser.close()
         pygame.quit()
\ No newline at end of file
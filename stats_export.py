@@ -0,0 +1,121 @@
+import os
+import csv
+import glob
+import gzip
+import argparse
+import sqlite3
+from config import STATS_DB_PATH
+
+EXPORT_TABLES = ['game_sessions', 'defense_placements', 'enemy_data']
+SESSION_CSV_PATTERN = 'data/game_session_*.csv'
+SESSION_CSV_COLUMNS = ['Date', 'Duration (ms)', 'Waves Completed', 'Score', 'Resources Collected',
+                       'Enemies Defeated', 'Accuracy']
+
+class StatsExporter:
+    def __init__(self, db_path=STATS_DB_PATH, chunk_size=5000):
+        self.db_path = db_path
+        self.chunk_size = chunk_size
+
+    def connect(self):
+        return sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True)
+
+    def iter_chunks(self, conn, table):
+        query = f'SELECT * FROM {table}'
+        if table == 'game_sessions':
+            # A session still being played (or never finished) has only its spilled enemy rows so far
+            session_columns = {row[1] for row in conn.execute("PRAGMA table_info(game_sessions)")}
+            if 'complete' in session_columns:
+                query += ' WHERE complete = 1'
+        cursor = conn.execute(query)
+        columns = [description[0] for description in cursor.description]
+        yield columns
+        while True:
+            rows = cursor.fetchmany(self.chunk_size)
+            if not rows:
+                break
+            yield rows
+
+    def write_csv_gz(self, chunks, path):
+        count = 0
+        with gzip.open(path, 'wt', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(next(chunks))
+            for rows in chunks:
+                writer.writerows(rows)
+                count += len(rows)
+        return count
+
+    def export_tables(self, out_dir, tables=EXPORT_TABLES):
+        os.makedirs(out_dir, exist_ok=True)
+        counts = {}
+        conn = self.connect()
+        try:
+            for table in tables:
+                path = os.path.join(out_dir, f'{table}.csv.gz')
+                counts[table] = self.write_csv_gz(self.iter_chunks(conn, table), path)
+        finally:
+            conn.close()
+        return counts
+
+    def iter_session_csvs(self, pattern=SESSION_CSV_PATTERN):
+        for path in sorted(glob.glob(pattern)):
+            with open(path, newline='') as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                yield path, dict(row for row in reader if len(row) == 2)
+
+    def consolidate_session_csvs(self, out_dir, pattern=SESSION_CSV_PATTERN, remove=False):
+        os.makedirs(out_dir, exist_ok=True)
+        path = os.path.join(out_dir, 'game_session_summaries.csv.gz')
+        columns = SESSION_CSV_COLUMNS
+        # Appended to, never rewritten: once --remove-consolidated has deleted the per-game files this is
+        # the only copy of their summaries. Files already in it from an earlier run are not added twice.
+        is_new = not os.path.exists(path)
+        already = set()
+        if not is_new:
+            with gzip.open(path, 'rt', newline='') as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                already = {row[0] for row in reader if row}
+        consolidated = []
+        count = 0
+        with gzip.open(path, 'at', newline='') as f:
+            writer = csv.writer(f)
+            if is_new:
+                writer.writerow(['Source'] + columns)
+            for source, metrics in self.iter_session_csvs(pattern):
+                if os.path.basename(source) not in already:
+                    writer.writerow([os.path.basename(source)] + [metrics.get(column, '') for column in columns])
+                    count += 1
+                if remove:
+                    consolidated.append(source)
+
+        # Only delete the originals once the archive has been fully written and closed
+        for source in consolidated:
+            os.remove(source)
+        return path, count, len(consolidated)
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream the stats database out to compressed CSV files")
+    parser.add_argument('--db', default=STATS_DB_PATH)
+    parser.add_argument('--out', default='data/export')
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--tables', nargs='+', choices=EXPORT_TABLES, default=EXPORT_TABLES)
+    parser.add_argument('--consolidate-sessions', action='store_true',
+                        help="merge the per-game data/game_session_*.csv files into one compressed file")
+    parser.add_argument('--remove-consolidated', action='store_true',
+                        help="delete the per-game CSV files after consolidating them")
+    args = parser.parse_args()
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+
+    exporter = StatsExporter(args.db, args.chunk_size)
+    for table, count in exporter.export_tables(args.out, args.tables).items():
+        print(f"{table}: {count} rows -> {os.path.join(args.out, table + '.csv.gz')}")
+
+    if args.consolidate_sessions:
+        path, count, removed = exporter.consolidate_session_csvs(args.out, remove=args.remove_consolidated)
+        print(f"Consolidated {count} session CSVs -> {path}" + (f" ({removed} files removed)" if removed else ""))
+
+if __name__ == "__main__":
+    main()
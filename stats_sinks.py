@@ -0,0 +1,381 @@
+import os
+import csv
+import json
+import sqlite3
+from datetime import datetime
+from config import STATS_DB_PATH
+from tracer import get_tracer
+
+class SQLiteStatsSink:
+    def __init__(self, db_path=STATS_DB_PATH, csv_dir='data'):
+        self.db_path = db_path
+        self.csv_dir = csv_dir
+        self.session_id = None
+        self._conn = None
+
+    # The data directory and database are only created once something is actually written
+    @property
+    def conn(self):
+        if self._conn is None:
+            self.init_db()
+        return self._conn
+
+    @property
+    def cursor(self):
+        if self._conn is None:
+            self.init_db()
+        return self._cursor
+
+    def init_db(self):
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path)
+        self._cursor = self._conn.cursor()
+        cursor = self._cursor
+
+        # Only takes effect on a new, empty database; lets db_maintenance reclaim space without a full VACUUM
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS game_sessions (
+            id INTEGER PRIMARY KEY,
+            date TEXT,
+            duration INTEGER,
+            waves_completed INTEGER,
+            score INTEGER,
+            resources_collected INTEGER,
+            enemies_defeated INTEGER,
+            accuracy REAL,
+            complete INTEGER DEFAULT 1
+        )
+        ''')
+
+        # Sessions from before enemy rows were spilled mid-game were only ever written once finished
+        session_columns = {row[1] for row in cursor.execute("PRAGMA table_info(game_sessions)")}
+        if 'complete' not in session_columns:
+            cursor.execute("ALTER TABLE game_sessions ADD COLUMN complete INTEGER DEFAULT 1")
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS defense_placements (
+            session_id INTEGER,
+            defense_type TEXT,
+            orbital_radius REAL,
+            angle REAL,
+            upgrade_level INTEGER,
+            damage_dealt INTEGER,
+            shots_fired INTEGER DEFAULT 0,
+            shots_hit INTEGER DEFAULT 0,
+            FOREIGN KEY (session_id) REFERENCES game_sessions(id)
+        )
+        ''')
+
+        # Databases created before per-defense attribution lack the shot columns
+        placement_columns = {row[1] for row in cursor.execute("PRAGMA table_info(defense_placements)")}
+        for column in ('shots_fired', 'shots_hit'):
+            if column not in placement_columns:
+                cursor.execute(f"ALTER TABLE defense_placements ADD COLUMN {column} INTEGER DEFAULT 0")
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS enemy_data (
+            session_id INTEGER,
+            enemy_type TEXT,
+            survival_time INTEGER,
+            damage_dealt INTEGER,
+            penetration_depth REAL,
+            FOREIGN KEY (session_id) REFERENCES game_sessions(id)
+        )
+        ''')
+
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_game_sessions_date ON game_sessions (date, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_defense_placements_session ON defense_placements (session_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_enemy_data_session ON enemy_data (session_id)")
+
+        # Sessions archived by db_maintenance keep per-type totals here instead of their enemy_data rows
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS enemy_rollups (
+            session_id INTEGER,
+            enemy_type TEXT,
+            enemy_count INTEGER,
+            total_survival_time INTEGER,
+            total_damage_dealt INTEGER,
+            total_penetration_depth REAL,
+            PRIMARY KEY (session_id, enemy_type),
+            FOREIGN KEY (session_id) REFERENCES game_sessions(id)
+        )
+        ''')
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS archived_sessions (
+            session_id INTEGER PRIMARY KEY,
+            archived_at TEXT,
+            FOREIGN KEY (session_id) REFERENCES game_sessions(id)
+        )
+        ''')
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS session_perf (
+            session_id INTEGER PRIMARY KEY,
+            frames INTEGER,
+            histogram TEXT,
+            p50_ms REAL,
+            p95_ms REAL,
+            max_frame_ms REAL,
+            peak_enemies INTEGER,
+            peak_projectiles INTEGER,
+            gc_collections INTEGER,
+            gc_pause_ms REAL,
+            FOREIGN KEY (session_id) REFERENCES game_sessions(id)
+        )
+        ''')
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS wave_perf (
+            session_id INTEGER,
+            wave INTEGER,
+            frames INTEGER,
+            histogram TEXT,
+            p50_ms REAL,
+            p95_ms REAL,
+            max_frame_ms REAL,
+            peak_enemies INTEGER,
+            peak_projectiles INTEGER,
+            gc_collections INTEGER,
+            gc_pause_ms REAL,
+            PRIMARY KEY (session_id, wave),
+            FOREIGN KEY (session_id) REFERENCES game_sessions(id)
+        )
+        ''')
+
+        # One row per session, series and downsampling level; data is a zlib-compressed delta encoding
+        # (see timeseries.py) so a whole session's curve costs a few kilobytes
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS session_timeseries (
+            session_id INTEGER,
+            series TEXT,
+            level INTEGER,
+            interval_ms REAL,
+            count INTEGER,
+            data BLOB,
+            PRIMARY KEY (session_id, series, level),
+            FOREIGN KEY (session_id) REFERENCES game_sessions(id)
+        )
+        ''')
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS optimized_layouts (
+            id INTEGER PRIMARY KEY,
+            date TEXT,
+            generation INTEGER,
+            fitness REAL,
+            seeds TEXT,
+            layout TEXT
+        )
+        ''')
+
+        self._conn.commit()
+
+    # Enemy rows spilled mid-game need a session id, so the row goes in early and stays marked incomplete
+    # until save_session fills it in; readers skip it in the meantime, and for good if the game never finishes
+    def _ensure_session_row(self):
+        if self.session_id is None:
+            self.cursor.execute('''
+            INSERT INTO game_sessions (date, duration, waves_completed, score, resources_collected, enemies_defeated,
+                accuracy, complete)
+            VALUES (?, 0, 0, 0, 0, 0, 0, 0)
+            ''', (datetime.now().strftime('%Y-%m-%d %H:%M:%S'),))
+            self.session_id = self.cursor.lastrowid
+        return self.session_id
+
+    def _insert_enemy_rows(self, rows):
+        with get_tracer().span("write enemy_data", "db", rows=len(rows)):
+            session_id = self._ensure_session_row()
+            self.cursor.executemany('''
+            INSERT INTO enemy_data (session_id, enemy_type, survival_time, damage_dealt, penetration_depth)
+            VALUES (?, ?, ?, ?, ?)
+            ''', [(session_id, enemy_type, survival_time, round(damage_dealt), penetration_depth)
+                  for enemy_type, survival_time, penetration_depth, damage_dealt in rows])
+
+    def write_enemy_data(self, rows):
+        try:
+            self._insert_enemy_rows(rows)
+            self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"Database error while writing enemy data: {e}")
+
+    def iter_enemy_data(self):
+        if self.session_id is not None:
+            yield from self.conn.execute('''
+            SELECT enemy_type, survival_time, penetration_depth, damage_dealt FROM enemy_data WHERE session_id = ?
+            ''', (self.session_id,))
+
+    def save_session(self, summary, placements, enemy_rows=()):
+        # Kept until the commit succeeds, so a failed save can still write them to the emergency backup
+        placements = list(placements)
+        previous_session_id = self.session_id
+        try:
+            # The last enemy rows, the session and its placements go in as one transaction
+            if enemy_rows:
+                self._insert_enemy_rows(enemy_rows)
+
+            session_values = (summary['date'], summary['duration'], summary['waves_completed'], summary['score'],
+                              summary['resources_collected'], summary['enemies_defeated'], summary['accuracy'])
+
+            if self.session_id is None:
+                self.cursor.execute('''
+                INSERT INTO game_sessions (date, duration, waves_completed, score, resources_collected, enemies_defeated,
+                    accuracy, complete)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 1)
+                ''', session_values)
+                self.session_id = self.cursor.lastrowid
+            else:
+                self.cursor.execute('''
+                UPDATE game_sessions SET date = ?, duration = ?, waves_completed = ?, score = ?,
+                    resources_collected = ?, enemies_defeated = ?, accuracy = ?, complete = 1
+                WHERE id = ?
+                ''', session_values + (self.session_id,))
+
+            session_id = self.session_id
+
+            self.cursor.executemany('''
+            INSERT INTO defense_placements (session_id, defense_type, orbital_radius, angle, upgrade_level,
+                damage_dealt, shots_fired, shots_hit)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [(session_id, defense_type, orbital_radius, angle, upgrade_level, round(damage_dealt), shots_fired, shots_hit)
+                  for defense_type, orbital_radius, angle, upgrade_level, shots_fired, shots_hit, damage_dealt
+                  in placements])
+
+            self.conn.commit()
+
+            os.makedirs(self.csv_dir, exist_ok=True)
+            date_str = summary['date']
+            with open(os.path.join(self.csv_dir, f'game_session_{date_str.replace(":", "-").replace(" ", "_")}.csv'),
+                      'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['Metric', 'Value'])
+                writer.writerow(['Date', date_str])
+                writer.writerow(['Duration (ms)', summary['duration']])
+                writer.writerow(['Waves Completed', summary['waves_completed']])
+                writer.writerow(['Score', summary['score']])
+                writer.writerow(['Resources Collected', summary['resources_collected']])
+                writer.writerow(['Enemies Defeated', summary['enemies_defeated']])
+                writer.writerow(['Accuracy', summary['accuracy']])
+
+        except sqlite3.Error as e:
+            print(f"Database error while saving stats: {e}")
+            # Nothing from the failed transaction may be committed later by save_perf or save_timeseries
+            if self._conn is not None:
+                try:
+                    self._conn.rollback()
+                except sqlite3.Error:
+                    pass
+            self.session_id = previous_session_id
+            try:
+                os.makedirs(self.csv_dir, exist_ok=True)
+                with open(os.path.join(self.csv_dir, f'emergency_backup_{datetime.now().strftime("%Y%m%d%H%M%S")}.csv'),
+                          'w', newline='') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(['Emergency backup due to database error'])
+                    writer.writerow(['Score', summary['score']])
+                    writer.writerow(['Waves', summary['waves_completed']])
+                    writer.writerow(['Resources', summary['resources_collected']])
+                    writer.writerow([])
+                    writer.writerow(['Unsaved Enemy Data'])
+                    writer.writerow(['Enemy Type', 'Survival Time (ms)', 'Penetration Depth', 'Damage Dealt'])
+                    writer.writerows(enemy_rows)
+                    writer.writerow([])
+                    writer.writerow(['Defense Placements'])
+                    writer.writerow(['Type', 'Orbital Radius', 'Angle', 'Upgrade Level', 'Shots Fired', 'Shots Hit',
+                                     'Damage Dealt'])
+                    writer.writerows(placements)
+            except Exception as ex:
+                print(f"Failed to create emergency backup: {ex}")
+
+    def save_perf(self, session_row, wave_rows):
+        if self.session_id is None:
+            return
+        columns = ('frames', 'histogram', 'p50_ms', 'p95_ms', 'max_frame_ms', 'peak_enemies', 'peak_projectiles',
+                   'gc_collections', 'gc_pause_ms')
+        try:
+            self.cursor.execute('''
+            INSERT OR REPLACE INTO session_perf (session_id, frames, histogram, p50_ms, p95_ms, max_frame_ms,
+                peak_enemies, peak_projectiles, gc_collections, gc_pause_ms)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (self.session_id,) + tuple(session_row[c] for c in columns))
+            self.cursor.executemany('''
+            INSERT OR REPLACE INTO wave_perf (session_id, wave, frames, histogram, p50_ms, p95_ms, max_frame_ms,
+                peak_enemies, peak_projectiles, gc_collections, gc_pause_ms)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [(self.session_id, row['wave']) + tuple(row[c] for c in columns) for row in wave_rows])
+            self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"Database error while saving performance metrics: {e}")
+
+    def save_timeseries(self, timeseries):
+        if self.session_id is None or not len(timeseries):
+            return
+        try:
+            self.cursor.executemany('''
+            INSERT OR REPLACE INTO session_timeseries (session_id, series, level, interval_ms, count, data)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ''', [(self.session_id,) + row for row in timeseries.rows()])
+            self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"Database error while saving time series: {e}")
+
+    def save_optimized_layouts(self, layouts, generation, seeds):
+        try:
+            date_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self.conn.executemany('''
+            INSERT INTO optimized_layouts (date, generation, fitness, seeds, layout)
+            VALUES (?, ?, ?, ?, ?)
+            ''', [(date_str, generation, fitness, json.dumps(seeds), json.dumps(layout))
+                  for fitness, layout in layouts])
+            self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"Database error while saving optimized layouts: {e}")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+class NullStatsSink:
+    def write_enemy_data(self, rows):
+        pass
+
+    def iter_enemy_data(self):
+        return iter(())
+
+    def save_session(self, summary, placements, enemy_rows=()):
+        pass
+
+    def save_perf(self, session_row, wave_rows):
+        pass
+
+    def save_timeseries(self, timeseries):
+        pass
+
+class MemoryStatsSink:
+    def __init__(self):
+        self.sessions = []
+        self.enemy_counts = {}
+        self.enemy_survival_totals = {}
+
+    def write_enemy_data(self, rows):
+        # Only per-type aggregates are kept so long-running hosts stay bounded
+        for enemy_type, survival_time, _, _ in rows:
+            self.enemy_counts[enemy_type] = self.enemy_counts.get(enemy_type, 0) + 1
+            self.enemy_survival_totals[enemy_type] = self.enemy_survival_totals.get(enemy_type, 0) + survival_time
+
+    def iter_enemy_data(self):
+        return iter(())
+
+    def save_session(self, summary, placements, enemy_rows=()):
+        self.write_enemy_data(enemy_rows)
+        self.sessions.append(dict(summary, placements=list(placements)))
+
+    def save_perf(self, session_row, wave_rows):
+        if self.sessions:
+            self.sessions[-1]['perf'] = dict(session_row, waves=wave_rows)
+
+    def save_timeseries(self, timeseries):
+        pass
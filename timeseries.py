@@ -0,0 +1,77 @@
+import sys
+import zlib
+from array import array
+from itertools import accumulate
+from config import TIMESERIES_INTERVAL_MS
+
+SERIES = ('resources', 'health', 'enemies', 'score', 'wave')
+# Each level keeps the min and max of this many points of the level below, down to a few dozen points
+LEVEL_FACTOR = 8
+MIN_LEVEL_POINTS = 32
+
+def encode_values(values):
+    # Stored as the first value followed by the differences between neighbours, as little-endian 64-bit
+    # integers; game curves mostly hold still, so the deltas are nearly all zero and compress to very little
+    deltas = array('q', [b - a for a, b in zip([0] + values[:-1], values)])
+    if sys.byteorder != 'little':
+        deltas.byteswap()
+    return zlib.compress(deltas.tobytes(), 9)
+
+def decode_values(data):
+    deltas = array('q')
+    deltas.frombytes(zlib.decompress(data))
+    if sys.byteorder != 'little':
+        deltas.byteswap()
+    return list(accumulate(deltas))
+
+def downsample(mins, maxs, factor=LEVEL_FACTOR):
+    return ([min(mins[i:i + factor]) for i in range(0, len(mins), factor)],
+            [max(maxs[i:i + factor]) for i in range(0, len(maxs), factor)])
+
+def encode_level(mins, maxs, level):
+    # Level 0 is the samples themselves; coarser levels store every bucket's mins, then every bucket's maxes
+    return encode_values(list(mins) if level == 0 else list(mins) + list(maxs))
+
+def decode_level(data, level, count):
+    values = decode_values(data)
+    if level == 0:
+        return values, values
+    return values[:count], values[count:]
+
+class SessionTimeSeries:
+    # Samples the game's curves on the simulation clock into integer columns
+    def __init__(self, interval_ms=TIMESERIES_INTERVAL_MS):
+        self.interval_ms = interval_ms
+        self.next_time = 0
+        self.columns = {name: array('q') for name in SERIES}
+
+    def __len__(self):
+        return len(self.columns[SERIES[0]])
+
+    def sample(self, *values):
+        # values in SERIES order; the caller samples once the game clock reaches next_time
+        for name, value in zip(SERIES, values):
+            self.columns[name].append(round(value))
+        # Stays on the interval grid rather than counting from this tick, so samples don't drift
+        self.next_time += self.interval_ms
+
+    def rows(self):
+        # (series, level, interval_ms, count, data) for every precomputed level of every series
+        rows = []
+        for name in SERIES:
+            mins = maxs = self.columns[name].tolist()
+            level = 0
+            interval = self.interval_ms
+            while True:
+                rows.append((name, level, interval, len(mins), encode_level(mins, maxs, level)))
+                if len(mins) <= MIN_LEVEL_POINTS:
+                    break
+                mins, maxs = downsample(mins, maxs)
+                level += 1
+                interval *= LEVEL_FACTOR
+        return rows
+
+    def clear(self):
+        for column in self.columns.values():
+            del column[:]
+        self.next_time = 0
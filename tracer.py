@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import atexit
+import threading
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'start')
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.complete(self.name, self.start, self.cat, self.args)
+        return False
+
+class Tracer:
+    enabled = True
+
+    def __init__(self, path, flush_every=512):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.flush_every = flush_every
+        self.file = open(path, 'w')
+        self.lock = threading.Lock()
+        self.pending = []
+        self.events_written = 0
+        self.origin = time.perf_counter_ns()
+        self.pid = os.getpid()
+        # JSON array form of the trace-event format: viewers accept it even if the closing bracket is
+        # missing, so a crashed session still leaves a usable trace
+        self.file.write('[\n')
+        atexit.register(self.close)
+
+    def now(self):
+        return time.perf_counter_ns()
+
+    def _ts(self, ns):
+        # Trace timestamps are microseconds; three decimals keep full nanosecond resolution
+        return round((ns - self.origin) / 1000, 3)
+
+    def _emit(self, event):
+        event['pid'] = self.pid
+        event['tid'] = threading.get_ident()
+        line = json.dumps(event, separators=(',', ':'))
+        with self.lock:
+            if self.file is None:
+                return
+            self.pending.append(line)
+            if len(self.pending) >= self.flush_every:
+                self._flush()
+
+    def _flush(self):
+        if self.pending:
+            prefix = ',\n' if self.events_written else ''
+            self.file.write(prefix + ',\n'.join(self.pending))
+            self.events_written += len(self.pending)
+            self.pending = []
+
+    def span(self, name, cat='sim', **args):
+        return _Span(self, name, cat, args)
+
+    def complete(self, name, start_ns, cat='sim', args=None, end_ns=None):
+        end_ns = end_ns if end_ns is not None else time.perf_counter_ns()
+        event = {'name': name, 'cat': cat, 'ph': 'X', 'ts': self._ts(start_ns), 'dur': round((end_ns - start_ns) / 1000, 3)}
+        if args:
+            event['args'] = args
+        self._emit(event)
+
+    def instant(self, name, cat='sim', **args):
+        event = {'name': name, 'cat': cat, 'ph': 'i', 's': 't', 'ts': self._ts(time.perf_counter_ns())}
+        if args:
+            event['args'] = args
+        self._emit(event)
+
+    def counter(self, name, **values):
+        self._emit({'name': name, 'ph': 'C', 'ts': self._ts(time.perf_counter_ns()), 'args': values})
+
+    def close(self):
+        with self.lock:
+            if self.file is None:
+                return
+            self._flush()
+            self.file.write('\n]\n')
+            self.file.close()
+            self.file = None
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+class NullTracer:
+    enabled = False
+    _span = _NullSpan()
+
+    def now(self):
+        return 0
+
+    def span(self, name, cat='sim', **args):
+        return self._span
+
+    def complete(self, name, start_ns, cat='sim', args=None, end_ns=None):
+        pass
+
+    def instant(self, name, cat='sim', **args):
+        pass
+
+    def counter(self, name, **values):
+        pass
+
+    def close(self):
+        pass
+
+_tracer = NullTracer()
+
+def get_tracer():
+    return _tracer
+
+def set_tracer(tracer):
+    global _tracer
+    _tracer = tracer
+    return tracer
@@ -0,0 +1,251 @@
+import pygame
+from config import WHITE, RED, GREEN, YELLOW, PURPLE
+
+class Widget:
+    # Drawn from a cached surface. bind() picks out the values the widget shows and compose() builds the surface
+    # from them alone, so it only runs again when one of those values changes; otherwise drawing is one blit.
+    def __init__(self, ui):
+        self.ui = ui
+        self.surface = None
+        self.bound = None
+
+    def visible(self, state):
+        return True
+
+    def bind(self, state, size):
+        return size
+
+    def compose(self, bound):
+        raise NotImplementedError
+
+    def place(self, state, size):
+        return (0, 0)
+
+    def draw(self, screen, state):
+        size = screen.get_size()
+        bound = self.bind(state, size)
+        if self.surface is None or bound != self.bound:
+            self.surface = self.compose(bound)
+            self.bound = bound
+        screen.blit(self.surface, self.place(state, size))
+
+class HudBar(Widget):
+    def bind(self, ui, size):
+        requested = ui.time_scale
+        speed_color = WHITE if requested is None or ui.achieved_speed >= requested * 0.95 else YELLOW
+        speed = f"SPEED {'MAX' if requested is None else f'{requested}x'} ({ui.achieved_speed:.1f}x)"
+        governor = self.ui.game_controller.governor
+        quality = governor.quality['name'].upper() if governor is not None and governor.level > 0 else None
+        return (size[0], int(ui.health), int(ui.resources), ui.wave, ui.enemy_count, ui.enemies_in_wave, ui.score,
+                speed, speed_color, quality)
+
+    def compose(self, bound):
+        width, health, resources, wave, enemy_count, enemy_total, score, speed, speed_color, quality = bound
+        font = self.ui.font_small
+        bar = pygame.Surface((width, 60), pygame.SRCALPHA)
+        bar.fill((5, 5, 20, 220))
+
+        stats_x = 20
+        stats_y = 10
+        health_percent = health / 100
+        health_width = 120
+        health_height = 10
+        health_color = (0, 230, 0) if health_percent > 0.5 else (230, 230, 0) if health_percent > 0.25 else (230, 0, 0)
+        bar.blit(font.render(f"{health}", True, health_color), (stats_x, stats_y - 2))
+        pygame.draw.rect(bar, (30, 30, 40), (stats_x + 30, stats_y, health_width, health_height), 0, 3)
+        pygame.draw.rect(bar, health_color, (stats_x + 30, stats_y, int(health_width * max(0, health_percent)),
+                                             health_height), 0, 3)
+        pygame.draw.rect(bar, (100, 100, 120), (stats_x + 30, stats_y, health_width, health_height), 1, 3)
+
+        resource_y = stats_y + 22
+        pygame.draw.circle(bar, GREEN, (stats_x + 8, resource_y + 4), 6)
+        bar.blit(font.render(f"{resources}", True, WHITE), (stats_x + 20, resource_y))
+
+        center_x = width // 2 - 40
+        bar.blit(font.render(f"WAVE {wave}", True, WHITE), (center_x, stats_y))
+        pygame.draw.circle(bar, PURPLE, (center_x + 5, resource_y + 2), 6)
+        bar.blit(font.render(f"{enemy_count}/{enemy_total}", True, PURPLE), (center_x + 20, resource_y))
+
+        bar.blit(font.render(f"SCORE: {score}", True, WHITE), (width - 120, stats_y))
+        speed_text = font.render(speed, True, speed_color)
+        bar.blit(speed_text, (width - speed_text.get_width() - 15, resource_y))
+        if quality is not None:
+            quality_text = font.render(f"QUALITY {quality}", True, YELLOW)
+            bar.blit(quality_text, (width - speed_text.get_width() - quality_text.get_width() - 30, resource_y))
+        return bar
+
+class DefenseDock(Widget):
+    def visible(self, ui):
+        return not ui.wave_in_progress
+
+    def bind(self, ui, size):
+        return (size[0], tuple(self.ui.game_controller.catalog.defenses), ui.selected_defense_type)
+
+    def compose(self, bound):
+        width, defenses, selected_spec = bound
+        dock = pygame.Surface((width, 60), pygame.SRCALPHA)
+        dock.fill((5, 5, 20, 220))
+        button_width = 120
+        button_height = 40
+        button_gap = 30
+        button_y = 10
+        first_button_x = width // 2 - (len(defenses) * button_width + (len(defenses) - 1) * button_gap) // 2
+
+        for i, spec in enumerate(defenses):
+            button_x = first_button_x + i * (button_width + button_gap)
+            selected = selected_spec is spec
+            button_color = spec.button.get('selected_fill' if selected else 'fill', (30, 30, 80))
+            border_color = spec.button.get('selected_border', WHITE) if selected else spec.color
+            border_width = 3 if selected else 2
+            pygame.draw.rect(dock, button_color, (button_x, button_y, button_width, button_height), 0, 6)
+            pygame.draw.rect(dock, border_color, (button_x, button_y, button_width, button_height), border_width, 6)
+            self.ui.draw_defense_icon(dock, spec, button_x + 20, button_y + button_height // 2)
+            dock.blit(self.ui.font_small.render(spec.label, True, WHITE), (button_x + 45, button_y + 8))
+            dock.blit(self.ui.font_small.render(f"${spec.cost}", True, spec.button.get('cost_color', WHITE)),
+                      (button_x + 45, button_y + 23))
+        return dock
+
+    def place(self, ui, size):
+        return (0, size[1] - 60)
+
+class Banner(Widget):
+    # Fixed text, so it is composed once; top is measured from the top edge, or from the bottom when negative
+    def __init__(self, ui, text, color, top, alpha, when):
+        super().__init__(ui)
+        self.text = text
+        self.color = color
+        self.top = top
+        self.alpha = alpha
+        self.when = when
+
+    def visible(self, ui):
+        return self.when(ui)
+
+    def bind(self, ui, size):
+        return self.text
+
+    def compose(self, text):
+        rendered = self.ui.font_medium.render(text, True, self.color)
+        banner = pygame.Surface((rendered.get_width() + 30, 40), pygame.SRCALPHA)
+        pygame.draw.rect(banner, (0, 0, 0, self.alpha), banner.get_rect(), 0, 10)
+        pygame.draw.rect(banner, self.color, banner.get_rect(), 1, 10)
+        banner.blit(rendered, (15, 5))
+        return banner
+
+    def place(self, ui, size):
+        return (size[0] // 2 - self.surface.get_width() // 2, self.top if self.top >= 0 else size[1] + self.top)
+
+class AnalyticsPanel(Widget):
+    # The controller hands over a new summary a few times a second and the same object in between
+    def visible(self, ui):
+        return ui.analytics is not None
+
+    def bind(self, ui, size):
+        return ui.analytics
+
+    def compose(self, summary):
+        lines = [
+            (f"Kills/sec: {summary['kills_per_sec']:.2f}", WHITE),
+            (f"Income/sec: {summary['income_per_sec']:.1f}", GREEN),
+            (f"Accuracy (last {summary['recent_shots']}): {summary['accuracy'] * 100:.0f}%", WHITE),
+            ("DPS by defense:", YELLOW),
+        ]
+        lines += [(f"  {name}: {dps:.1f}", WHITE) for name, dps in sorted(summary['dps'].items())] or [("  -", WHITE)]
+        lines.append((f"Damage taken ({summary['window_sec']:.0f}s):", RED))
+        lines += [(f"  {name}: {amount:.0f}", WHITE)
+                  for name, amount in sorted(summary['damage_taken'].items())] or [("  -", WHITE)]
+        return text_panel(self.ui, "Live Analytics", lines, 230)
+
+    def place(self, ui, size):
+        return (10, 70)
+
+class HelpOverlay(Widget):
+    def bind(self, state, size):
+        return tuple(spec.title for spec in self.ui.game_controller.catalog.defenses)
+
+    def compose(self, titles):
+        controls = [f"{i + 1} - {title}" for i, title in enumerate(titles)]
+        controls += [
+            "P - Toggle Placement",
+            "LMB - Place Defense",
+            "Space - Start Wave",
+            "[ / ] - Game Speed",
+            "A - Live Analytics",
+            "Arrows / RMB drag - Pan",
+            "Wheel / + - - Zoom",
+            "Home - Reset View",
+            "H - Toggle Help",
+            "Esc - Quit"
+        ]
+        return text_panel(self.ui, "Controls", [(control, WHITE) for control in controls], 220)
+
+    def place(self, state, size):
+        return (size[0] - 230, 70)
+
+class DefenseTooltip(Widget):
+    # state is (lines, mouse position); only the text is bound, moving the mouse just moves the blit
+    def bind(self, state, size):
+        return state[0]
+
+    def compose(self, lines):
+        texts = [self.ui.font_small.render(line, True, YELLOW if i == 0 else WHITE) for i, line in enumerate(lines)]
+        width = max(text.get_width() for text in texts) + 20
+        height = len(texts) * 20 + 12
+        tooltip = pygame.Surface((width, height), pygame.SRCALPHA)
+        tooltip.fill((5, 5, 20, 230))
+        pygame.draw.rect(tooltip, WHITE, (0, 0, width, height), 1, 6)
+        for i, text in enumerate(texts):
+            tooltip.blit(text, (10, 6 + i * 20))
+        return tooltip
+
+    def place(self, state, size):
+        pos = state[1]
+        return (min(pos[0] + 16, size[0] - self.surface.get_width() - 5),
+                min(pos[1] + 16, size[1] - self.surface.get_height() - 5))
+
+class GameOverPanel(Widget):
+    # state is the final (score, waves completed)
+    def bind(self, state, size):
+        return (size, state)
+
+    def compose(self, bound):
+        (width, height), (score, waves) = bound
+        # The backdrop gradient is one pixel wide and stretched, rather than drawn a line per row
+        column = pygame.Surface((1, height))
+        for y in range(height):
+            column.set_at((0, y), (5, 5, max(5, int(30 - y * 0.1))))
+        screen = pygame.transform.scale(column, (width, height))
+
+        box_width, box_height = 400, 300
+        box_x = width // 2 - box_width // 2
+        box_y = height // 2 - box_height // 2
+        panel = pygame.Surface((box_width, box_height), pygame.SRCALPHA)
+        panel.fill((10, 10, 40, 220))
+        pygame.draw.rect(panel, (100, 100, 150), (0, 0, box_width, box_height), 2, 15)
+        screen.blit(panel, (box_x, box_y))
+
+        for text, y in ((self.ui.font_large.render("GAME OVER", True, RED), box_y + 30),
+                        (self.ui.font_medium.render(f"Final Score: {score}", True, WHITE), box_y + 100),
+                        (self.ui.font_medium.render(f"Waves Completed: {waves}", True, WHITE), box_y + 150)):
+            screen.blit(text, (width // 2 - text.get_width() // 2, y))
+
+        continue_box_width, continue_box_height = 300, 50
+        continue_box_x = width // 2 - continue_box_width // 2
+        continue_box_y = box_y + box_height - 70
+        pygame.draw.rect(screen, (40, 40, 80), (continue_box_x, continue_box_y, continue_box_width, continue_box_height),
+                         0, 10)
+        pygame.draw.rect(screen, (100, 100, 150),
+                         (continue_box_x, continue_box_y, continue_box_width, continue_box_height), 2, 10)
+        continue_text = self.ui.font_small.render("Press Any Key to Continue (ESC to Quit)", True, WHITE)
+        screen.blit(continue_text, (width // 2 - continue_text.get_width() // 2, continue_box_y + 15))
+        return screen
+
+def text_panel(ui, title, lines, width):
+    height = 50 + len(lines) * 20
+    panel = pygame.Surface((width, height), pygame.SRCALPHA)
+    panel.fill((5, 5, 20, 230))
+    pygame.draw.rect(panel, WHITE, (0, 0, width, height), 1, 8)
+    panel.blit(ui.font_medium.render(title, True, WHITE), (10, 10))
+    for i, (line, color) in enumerate(lines):
+        panel.blit(ui.font_small.render(line, True, color), (15, 45 + i * 20))
+    return panel
@@ -1,14 +1,16 @@
 import random
 import math
-import pygame
-from config import SCREEN_WIDTH, SCREEN_HEIGHT
-from enemies import BasicEnemy, FastEnemy
+from config import WORLD_WIDTH, WORLD_HEIGHT, wall_clock_ms
+from catalog import get_catalog
+from enemies import create_enemy
 
 class WaveManager:
-    def __init__(self):
+    def __init__(self, rng=None, clock=wall_clock_ms):
+        self.rng = rng or random
+        self.clock = clock
         self.current_wave = 0
         self.difficulty_level = 1.0
-        self.enemy_types = [BasicEnemy, FastEnemy]
+        self.enemy_types = get_catalog().enemies
         self.spawn_rate = 1.0
         self.enemies_in_wave = 0
         self.enemies_spawned = 0
@@ -16,12 +18,12 @@ class WaveManager:
         self.wave_active = False
         self.wave_outcomes = []
         
-    def start_wave(self):
+    def start_wave(self, current_time=None):
         self.current_wave += 1
         self.enemies_in_wave = self._calculate_wave_size()
         self.enemies_spawned = 0
         self.wave_active = True
-        self.last_spawn_time = pygame.time.get_ticks()
+        self.last_spawn_time = self.clock() if current_time is None else current_time
         return self.current_wave
         
     def spawn_enemies(self, current_time):
@@ -29,13 +31,13 @@ class WaveManager:
             return None
             
         if current_time - self.last_spawn_time >= 1000 / self.spawn_rate:
-            angle = random.uniform(0, 2 * math.pi)
-            radius = max(SCREEN_WIDTH, SCREEN_HEIGHT)
-            x = SCREEN_WIDTH // 2 + math.cos(angle) * radius
-            y = SCREEN_HEIGHT // 2 + math.sin(angle) * radius
+            angle = self.rng.uniform(0, 2 * math.pi)
+            radius = max(WORLD_WIDTH, WORLD_HEIGHT)
+            x = WORLD_WIDTH // 2 + math.cos(angle) * radius
+            y = WORLD_HEIGHT // 2 + math.sin(angle) * radius
             
             enemy_type = self._choose_enemy_type()
-            enemy = enemy_type([x, y])
+            enemy = create_enemy(enemy_type, [x, y], self.rng, current_time)
             
             self.enemies_spawned += 1
             self.last_spawn_time = current_time
@@ -50,11 +52,11 @@ class WaveManager:
         return int(5 + self.current_wave * 1.5)
         
     def _choose_enemy_type(self):
-        if self.current_wave < 3:
-            return BasicEnemy
-        else:
-            weights = [100 - min(80, self.current_wave * 10), min(80, self.current_wave * 10)]
-            return random.choices(self.enemy_types, weights=weights, k=1)[0]
+        eligible = [spec for spec in self.enemy_types if spec.min_wave <= self.current_wave] or self.enemy_types[:1]
+        if len(eligible) == 1:
+            return eligible[0]
+        weights = [spec.spawn_weight(self.current_wave) for spec in eligible]
+        return self.rng.choices(eligible, weights=weights, k=1)[0]
             
     def increase_difficulty(self):
         self.difficulty_level += 0.1